@@ -8,6 +8,7 @@
 """
 This provides a set of useful generic types for the gdsMill interface.
 """
+import sys
 import math
 import copy
 import numpy as np
@@ -23,6 +24,8 @@ class geometry:
     A specific path, shape, or text geometry. Base class for shared
     items.
     """
+    __slots__ = ("width", "height", "lpp", "layerNumber", "layerPurpose", "boundary")
+
     def __init__(self, lpp=None):
         """ By default, everything has no size. """
         self.width = 0
@@ -164,6 +167,11 @@ class instance(geometry):
     An instance of a module with a specified location, rotation,
     spice pins, and spice nets
     """
+    # There are many instances of the same modules (e.g. bitcells), so
+    # they have no dictionary and share the pins of their module
+    __slots__ = ("name", "mod", "gds", "rotate", "offset", "mirror", "connected",
+                 "spice_pins", "connections")
+
     def __init__(self, name, mod, offset=[0, 0], mirror="R0", rotate=0):
         """Initializes an instance to represent a module"""
         super().__init__()
@@ -179,14 +187,10 @@ class instance(geometry):
         # track if the instance's spice pin connections have been made
         self.connected = False
 
-        # deepcopy because this instance needs to
-        # change attributes in these spice objects
-        self.spice_pins = copy.deepcopy(self.mod.pins)
-        self.spice_nets = copy.deepcopy(self.mod.nets)
-        for pin in self.spice_pins.values():
-            pin.set_inst(self)
-        for net in self.spice_nets.values():
-            net.set_inst(self)
+        # The pins are the (read only) pins of the module and the
+        # connections are the nets of the parent module in the same order
+        self.spice_pins = self.mod.pins
+        self.connections = []
 
         if OPTS.netlist_only:
             self.width = 0
@@ -302,17 +306,21 @@ class instance(geometry):
         debug.check(len(self.spice_pins) == len(nets_list),
             "must provide list of nets the same length as pin list\
              when connecting an instance")
-        for pin in self.spice_pins.values():
-            net = nets_list.pop(0)
-            pin.set_inst_net(net)
-            net.connect_pin(pin)
+        self.connections = list(nets_list)
         self.connected = True
 
     def get_connections(self):
-        conns = []
-        for pin in self.spice_pins.values():
-            conns.append(pin.inst_net.name)
-        return conns
+        return [net.name for net in self.connections]
+
+    def get_size(self):
+        """
+        Return the bytes used by the instance itself (not the module,
+        pins and nets it shares with others).
+        """
+        size = sys.getsizeof(self) + sys.getsizeof(self.connections)
+        for value in [self.offset, self.boundary] + self.boundary:
+            size += sys.getsizeof(value)
+        return size
 
     def calculate_transform(self, node):
         #set up the rotation matrix
@@ -449,6 +457,88 @@ class instance(geometry):
         return "( inst: " + self.name + " @" + str(self.offset) + " mod=" + self.mod.cell_name + " " + self.mirror + " R=" + str(self.rotate) + ")"
 
 
+class instance_array():
+    """
+    A group of instances (e.g. the cells of a bitcell array) that are
+    written to GDS as array references. The instances are still used
+    for the netlist, the pins and the shapes like any other instance.
+    """
+
+    def __init__(self, insts):
+        self.insts = list(insts)
+
+    def gds_write_file(self, new_layout):
+        """
+        Writes the instances of the same module and orientation that are
+        placed on a regular grid as one array reference. The rows of an
+        irregular grid are written as separate arrays and any remaining
+        instances as single references.
+        """
+        groups = {}
+        for inst in self.insts:
+            groups.setdefault((id(inst.mod), inst.mirror, inst.rotate), []).append(inst)
+
+        grid = tech.drc["grid"]
+        for insts in groups.values():
+            debug.info(4, "writing instance array of {0}: {1} instances".format(insts[0].mod.cell_name, len(insts)))
+            insts[0].mod.gds_write_file(insts[0].gds)
+
+            # The offsets are snapped to the grid so the pitches are exact in grid units
+            points = {}
+            for inst in insts:
+                points[int(round(inst.offset.x / grid)), int(round(inst.offset.y / grid))] = inst
+            xs = sorted(set(x for (x, y) in points))
+            ys = sorted(set(y for (x, y) in points))
+            if len(points) < len(insts):
+                # Overlapping instances aren't an array
+                rows = []
+                singles = insts
+            elif len(points) == len(xs) * len(ys) and self.is_regular(xs) and self.is_regular(ys):
+                rows = [(xs, ys)]
+                singles = []
+            else:
+                rows = []
+                singles = []
+                for y in ys:
+                    row_xs = sorted(x for (x, row_y) in points if row_y == y)
+                    if len(row_xs) > 1 and self.is_regular(row_xs):
+                        rows.append((row_xs, [y]))
+                    else:
+                        singles.extend(points[x, y] for x in row_xs)
+
+            for (row_xs, row_ys) in rows:
+                if len(row_xs) * len(row_ys) == 1:
+                    singles.append(points[row_xs[0], row_ys[0]])
+                    continue
+                first = points[row_xs[0], row_ys[0]]
+                # A single column or row still needs a pitch for the other direction
+                column_pitch = (row_xs[1] - row_xs[0]) * grid if len(row_xs) > 1 else first.mod.width
+                row_pitch = (row_ys[1] - row_ys[0]) * grid if len(row_ys) > 1 else first.mod.height
+                new_layout.addInstanceArray(first.gds,
+                                            first.mod.cell_name,
+                                            offsetInMicrons=first.offset,
+                                            mirror=first.mirror,
+                                            rotate=first.rotate,
+                                            columns=len(row_xs),
+                                            rows=len(row_ys),
+                                            columnPitch=(column_pitch, 0),
+                                            rowPitch=(0, row_pitch))
+            for inst in singles:
+                inst.gds_write_file(new_layout)
+
+    def is_regular(self, values):
+        """ Return whether the sorted values are evenly spaced """
+        return all(values[i + 1] - values[i] == values[1] - values[0] for i in range(len(values) - 1))
+
+    def __str__(self):
+        """ override print function output """
+        return "inst_array: {} instances".format(len(self.insts))
+
+    def __repr__(self):
+        """ override print function output """
+        return "( inst_array: {} instances )".format(len(self.insts))
+
+
 class path(geometry):
     """Represents a Path"""
 
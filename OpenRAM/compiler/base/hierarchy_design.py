@@ -49,7 +49,6 @@ class hierarchy_design(spice, layout):
 
     def DRC_LVS(self, final_verification=False, force_check=False):
         """Checks both DRC and LVS for a module"""
-        from openram import verify
 
         # No layout to check
         if OPTS.netlist_only:
@@ -61,24 +60,42 @@ class hierarchy_design(spice, layout):
             return
         # Do not run if disabled in options.
         elif (OPTS.inline_lvsdrc or force_check or final_verification):
+            from openram.verify import check_queue
 
             tempspice = "{}.sp".format(self.name)
-            self.sp_write("{0}{1}".format(OPTS.openram_temp, tempspice), lvs=True)
             tempgds = "{}.gds".format(self.name)
+            # The inline checks of the modules run in the background while the
+            # generation continues
+            if not (force_check or final_verification) and check_queue.use_check_queue():
+                temp_path = check_queue.get_check_path(self.cell_name)
+                self.sp_write("{0}{1}".format(temp_path, tempspice), lvs=True)
+                self.gds_write("{0}{1}".format(temp_path, tempgds))
+                check_queue.submit_drc_lvs(self, temp_path, tempgds, tempspice)
+                return
+            # Report the errors of the submodules first
+            check_queue.wait_for_drc_lvs()
+
+            self.sp_write("{0}{1}".format(OPTS.openram_temp, tempspice), lvs=True)
             self.gds_write("{0}{1}".format(OPTS.openram_temp, tempgds))
             # Final verification option does not allow nets to be connected by label.
-            self.drc_errors = verify.run_drc(self.cell_name, tempgds, tempspice, extract=True, final_verification=final_verification)
-            self.lvs_errors = verify.run_lvs(self.cell_name, tempgds, tempspice, final_verification=final_verification)
+            (self.drc_errors, self.lvs_errors) = check_queue.run_drc_lvs(self.cell_name,
+                                                                         tempgds,
+                                                                         tempspice,
+                                                                         final_verification=final_verification)
 
             # force_check is used to determine decoder height and other things, so we shouldn't fail
             # if that flag is set
             if OPTS.inline_lvsdrc and not force_check:
-                debug.check(self.drc_errors == 0,
-                            "DRC failed for {0} with {1} error(s)".format(self.cell_name,
-                                                                          self.drc_errors))
-                debug.check(self.lvs_errors == 0,
-                            "LVS failed for {0} with {1} errors(s)".format(self.cell_name,
-                                                                           self.lvs_errors))
+                self.check_drc_lvs_errors()
+
+    def check_drc_lvs_errors(self):
+        """ Fail if the last DRC or LVS of the module found errors """
+        debug.check(self.drc_errors == 0,
+                    "DRC failed for {0} with {1} error(s)".format(self.cell_name,
+                                                                  self.drc_errors))
+        debug.check(self.lvs_errors == 0,
+                    "LVS failed for {0} with {1} errors(s)".format(self.cell_name,
+                                                                   self.lvs_errors))
 
     def DRC(self, final_verification=False):
         """Checks DRC for a module"""
@@ -195,6 +212,24 @@ class hierarchy_design(spice, layout):
                 if inp != out: # do not add self loops
                     graph.add_edge(pin_dict[inp], pin_dict[out], self)
 
+    def print_instance_stats(self, level=2):
+        """ Print the number of instances in the hierarchy and their memory use. """
+        num_insts = 0
+        size = 0
+        mods = [self]
+        visited = set([id(self)])
+        for mod in mods:
+            for inst in mod.insts:
+                num_insts += 1
+                size += inst.get_size()
+                if id(inst.mod) not in visited:
+                    visited.add(id(inst.mod))
+                    mods.append(inst.mod)
+        debug.info(level, "Instances: {0} in {1} modules using {2} bytes ({3:.0f} bytes per instance)".format(num_insts,
+                                                                                                             len(mods),
+                                                                                                             size,
+                                                                                                             size / max(num_insts, 1)))
+
     def __str__(self):
         """ override print function output """
         pins = ",".join(list(self.pins))
@@ -20,6 +20,7 @@ from openram.tech import layer_stacks as tech_layer_stacks
 from openram.tech import active_stack as tech_active_stack
 from openram.sram_factory import factory
 from openram import OPTS
+from openram import profiling
 from .vector import vector
 from .pin_layout import pin_layout
 from .utils import round_to_grid, ceil
@@ -55,6 +56,8 @@ class layout():
         self.bbox = None # The ll, ur coords
         # Holds module/cell layout instances
         self.insts = []
+        # Groups of the instances that are written as GDS arrays
+        self.inst_arrays = []
         # Set of names to check for duplicates
         self.inst_names = set()
         # Holds all other objects (labels, geometries, etc)
@@ -475,6 +478,14 @@ class layout():
         # debug.info(4, "instance list: " + ",".join(x.name for x in self.insts))
         return self.insts[-1]
 
+    def add_inst_array(self, insts):
+        """
+        Write the (already placed) instances as GDS array references where
+        they are on a regular grid instead of one reference per instance.
+        """
+        self.inst_arrays.append(geometry.instance_array(insts))
+        return self.inst_arrays[-1]
+
     def get_inst(self, name):
         """ Retrieve an instance by name """
         for inst in self.insts:
@@ -1433,8 +1444,19 @@ class layout():
         # Visited means that we already prepared self.gds for this subtree
         if self.name in self.visited:
             return
+        # The instances of an array are written together where the first of them is
+        inst_arrays = {}
+        for inst_array in self.inst_arrays:
+            for inst in inst_array.insts:
+                inst_arrays[id(inst)] = inst_array
+        written_arrays = set()
         for i in self.insts:
-            i.gds_write_file(gds_layout)
+            inst_array = inst_arrays.get(id(i))
+            if not inst_array:
+                i.gds_write_file(gds_layout)
+            elif id(inst_array) not in written_arrays:
+                written_arrays.add(id(inst_array))
+                inst_array.gds_write_file(gds_layout)
         for i in self.objs:
             i.gds_write_file(gds_layout)
         for pin_name in self.pin_map.keys():
@@ -1470,9 +1492,8 @@ class layout():
 
         self.visited.append(self.name)
 
-    def gds_write(self, gds_name):
-        """Write the entire gds of the object to the file."""
-        debug.info(3, "Writing to {}".format(gds_name))
+    def gds_prepare(self):
+        """Create the entire gds of the object in memory (self.gds)."""
 
         # If we already wrote a GDS, we need to reset and traverse it again in
         # case we made changes.
@@ -1480,7 +1501,6 @@ class layout():
             debug.info(3, "Creating layout structure {}".format(self.name))
             self.gds = gdsMill.VlsiLayout(name=self.name, units=GDS["unit"])
 
-        writer = gdsMill.Gds2writer(self.gds)
         # MRG: 3/2/18 We don't want to clear the visited flag since
         # this would result in duplicates of all instances being placed in self.gds
         # which may have been previously processed!
@@ -1490,6 +1510,14 @@ class layout():
         # recursively create all the remaining objects
         self.gds_write_file(self.gds)
 
+    @profiling.traced("gds_write", "writer")
+    def gds_write(self, gds_name):
+        """Write the entire gds of the object to the file."""
+        debug.info(3, "Writing to {}".format(gds_name))
+
+        self.gds_prepare()
+
+        writer = gdsMill.Gds2writer(self.gds)
         # populates the xyTree data structure for gds
         # self.gds.prepareForWrite()
         writer.writeToFile(gds_name)
@@ -9,10 +9,12 @@ import os
 import re
 import math
 import textwrap as tr
+import numpy as np
 from pprint import pformat
 from openram import debug
 from openram import tech
 from openram import OPTS
+from openram import profiling
 from collections import OrderedDict
 from .delay_data import delay_data
 from .wire_spice_model import wire_spice_model
@@ -20,6 +22,57 @@ from .power_data import power_data
 from .logical_effort import convert_relative_c_to_farad, convert_farad_to_relative_c
 
 
+def wrap_words(words, width=70):
+    """
+    Split the words into lines of at most width characters like
+    textwrap.wrap, which is slow for the long lists of pins and nets.
+    """
+    lines = []
+    line = []
+    length = -1
+    for word in words:
+        if not word or len(word) > width:
+            # textwrap splits long words over the lines
+            return tr.wrap(" ".join(words), width)
+        if line and length + 1 + len(word) > width:
+            lines.append(" ".join(line))
+            line = []
+            length = -1
+        line.append(word)
+        length += 1 + len(word)
+    if line:
+        lines.append(" ".join(line))
+    return lines
+
+
+class spice_writer():
+    """
+    Buffers the many small strings of a netlist and writes them to the
+    file in large chunks.
+    """
+
+    def __init__(self, spname, chunk_size=1 << 20):
+        self.spfile = open(spname, 'w')
+        self.chunk_size = chunk_size
+        self.buffer = []
+        self.size = 0
+
+    def write(self, text):
+        self.buffer.append(text)
+        self.size += len(text)
+        if self.size >= self.chunk_size:
+            self.flush()
+
+    def flush(self):
+        self.spfile.write("".join(self.buffer))
+        self.buffer = []
+        self.size = 0
+
+    def close(self):
+        self.flush()
+        self.spfile.close()
+
+
 class spice():
     """
     This provides a set of useful generic types for hierarchy
@@ -283,19 +336,20 @@ class spice():
             nets_match = nets_match and self.check_net_in_spice(net)
         return nets_match
 
-    def contains(self, mod, modlist):
-        for x in modlist:
-            if x.name == mod.name:
-                return True
-        return False
-
     def sp_write_file(self, sp, usedMODS, lvs=False, trim=False):
         """
         Recursive spice subcircuit write;
         Writes the spice subcircuit from the library or the dynamically generated one.
         Trim netlist is intended ONLY for bitcell arrays.
+        usedMODS is the set of the names of the modules already written.
         """
+        self.sp_write_files([(sp, lvs, trim)], usedMODS)
 
+    def sp_write_files(self, netlists, usedMODS):
+        """
+        Recursive spice subcircuit write of several (file, lvs, trim)
+        netlists in one traversal of the hierarchy.
+        """
         if self.no_instances:
             return
         elif not self.spice:
@@ -303,28 +357,16 @@ class spice():
 
             # recursively write the modules
             for mod in self.mods:
-                if self.contains(mod, usedMODS):
+                if mod.name in usedMODS:
                     continue
-                usedMODS.append(mod)
-                mod.sp_write_file(sp, usedMODS, lvs, trim)
+                usedMODS.add(mod.name)
+                mod.sp_write_files(netlists, usedMODS)
 
             if len(self.insts) == 0:
                 return
             if len(self.pins) == 0:
                 return
 
-            # write out the first spice line (the subcircuit)
-            wrapped_pins = "\n+ ".join(tr.wrap(" ".join(list(self.pins))))
-            sp.write("\n.SUBCKT {0}\n+ {1}\n".format(self.cell_name,
-                                                     wrapped_pins))
-
-            # Also write pins as comments
-            for pin in self.pins.values():
-                sp.write("* {1:6}: {0} \n".format(pin.name, pin.type))
-
-            for line in self.comments:
-                sp.write("* {}\n".format(line))
-
             # every instance must be connected with the connect_inst function
             # TODO: may run into empty pin lists edge case, not sure yet
             connected = True
@@ -335,6 +377,18 @@ class spice():
                 connected = False
             debug.check(connected, "{0} : Not all instance spice pins are connected.".format(self.cell_name))
 
+            # write out the first spice line (the subcircuit)
+            # and the pins and comments which are the same for all netlists
+            header = ["\n.SUBCKT {0}\n+ {1}\n".format(self.cell_name,
+                                                       "\n+ ".join(wrap_words(list(self.pins))))]
+            for pin in self.pins.values():
+                header.append("* {1:6}: {0} \n".format(pin.name, pin.type))
+            for line in self.comments:
+                header.append("* {}\n".format(line))
+            header = "".join(header)
+            for (sp, lvs, trim) in netlists:
+                sp.write(header)
+
             for inst in self.insts:
                 # we don't need to output connections of empty instances.
                 # these are wires and paths
@@ -345,54 +399,66 @@ class spice():
                 if inst.mod.no_instances:
                     continue
 
-                # If this is a trimmed netlist, skip it by adding comment char
-                if trim and inst.name in self.trim_insts:
-                    sp.write("* ")
-
-                if lvs and hasattr(inst.mod, "lvs_device"):
-                    sp.write(inst.mod.lvs_device.format(inst.name,
-                                                        " ".join(inst.get_connections())))
-                    sp.write("\n")
-                elif hasattr(inst.mod, "spice_device"):
-                    sp.write(inst.mod.spice_device.format(inst.name,
-                                                          " ".join(inst.get_connections())))
-                    sp.write("\n")
-                else:
-                    if trim and inst.name in self.trim_insts:
-                        wrapped_connections = "\n*+ ".join(tr.wrap(" ".join(inst.get_connections())))
-                        sp.write("X{0}\n*+ {1}\n*+ {2}\n".format(inst.name,
-                                                                 wrapped_connections,
-                                                                 inst.mod.cell_name))
-                    else:
-                        wrapped_connections = "\n+ ".join(tr.wrap(" ".join(inst.get_connections())))
-                        sp.write("X{0}\n+ {1}\n+ {2}\n".format(inst.name,
-                                                               wrapped_connections,
-                                                               inst.mod.cell_name))
+                connections = inst.get_connections()
+                wrapped_connections = None
+                for (sp, lvs, trim) in netlists:
+                    # If this is a trimmed netlist, skip it by adding comment char
+                    trimmed = trim and inst.name in self.trim_insts
 
-            sp.write(".ENDS {0}\n".format(self.cell_name))
+                    if lvs and hasattr(inst.mod, "lvs_device"):
+                        line = inst.mod.lvs_device.format(inst.name, " ".join(connections)) + "\n"
+                    elif hasattr(inst.mod, "spice_device"):
+                        line = inst.mod.spice_device.format(inst.name, " ".join(connections)) + "\n"
+                    else:
+                        if wrapped_connections is None:
+                            wrapped_connections = wrap_words(connections)
+                        prefix = "*+ " if trimmed else "+ "
+                        line = "X{0}\n{1}{2}\n{1}{3}\n".format(inst.name,
+                                                             prefix,
+                                                             ("\n" + prefix).join(wrapped_connections),
+                                                             inst.mod.cell_name)
+                    if trimmed:
+                        line = "* " + line
+                    sp.write(line)
+
+            for (sp, lvs, trim) in netlists:
+                sp.write(".ENDS {0}\n".format(self.cell_name))
 
         else:
             # If spice is a hard module, output the spice file contents.
             # Including the file path makes the unit test fail for other users.
             # if os.path.isfile(self.sp_file):
             #    sp.write("\n* {0}\n".format(self.sp_file))
-            if lvs and hasattr(self, "lvs"):
-                sp.write("\n".join(self.lvs))
-            else:
-                sp.write("\n".join(self.spice))
-
-            sp.write("\n")
+            for (sp, lvs, trim) in netlists:
+                if lvs and hasattr(self, "lvs"):
+                    sp.write("\n".join(self.lvs))
+                else:
+                    sp.write("\n".join(self.spice))
+                sp.write("\n")
 
+    def sp_header(self, lvs=False, trim=False):
+        """ Return the comment lines at the start of the spice file. """
+        return "*FIRST LINE IS A COMMENT\n"
 
     def sp_write(self, spname, lvs=False, trim=False):
         """Writes the spice to files"""
-        debug.info(3, "Writing to {0}".format(spname))
-        spfile = open(spname, 'w')
-        spfile.write("*FIRST LINE IS A COMMENT\n")
-        usedMODS = list()
-        self.sp_write_file(spfile, usedMODS, lvs=lvs, trim=trim)
-        del usedMODS
-        spfile.close()
+        self.sp_write_all([(spname, lvs, trim)])
+
+    @profiling.traced("sp_write", "writer")
+    def sp_write_all(self, netlists):
+        """
+        Writes the spice to several (file name, lvs, trim) files
+        with one traversal of the hierarchy.
+        """
+        writers = []
+        for (spname, lvs, trim) in netlists:
+            debug.info(3, "Writing to {0}".format(spname))
+            writer = spice_writer(spname)
+            writer.write(self.sp_header(lvs, trim))
+            writers.append((writer, lvs, trim))
+        self.sp_write_files(writers, set())
+        for (writer, lvs, trim) in writers:
+            writer.close()
 
     def cacti_delay(self, corner, inrisetime, c_load, cacti_params):
         """Generalization of how Cacti determines the delay of a gate"""
@@ -515,18 +581,22 @@ class spice():
                  vs1,           # threshold voltage
                  vs2,           # threshold voltage
                  rise):         # whether input rises or fall
+        """
+        The rise time and time constant can also be NumPy arrays to
+        evaluate several loads and slews at once.
+        """
 
-        if inputramptime == 0 and vs1 == vs2:
+        if np.all(inputramptime == 0) and vs1 == vs2:
             return tf * (-math.log(vs1) if vs1 < 1 else math.log(vs1))
 
         a = inputramptime / tf
         if rise == True:
             b = 0.5
-            td = tf * math.sqrt(math.log(vs1)*math.log(vs1) + 2*a*b*(1.0 - vs1)) + tf*(math.log(vs1) - math.log(vs2))
+            td = tf * np.sqrt(math.log(vs1)*math.log(vs1) + 2*a*b*(1.0 - vs1)) + tf*(math.log(vs1) - math.log(vs2))
 
         else:
             b = 0.4
-            td = tf * math.sqrt(math.log(1.0 - vs1)*math.log(1.0 - vs1) + 2*a*b*(vs1)) + tf*(math.log(1.0 - vs1) - math.log(1.0 - vs2))
+            td = tf * np.sqrt(math.log(1.0 - vs1)*math.log(1.0 - vs1) + 2*a*b*(vs1)) + tf*(math.log(1.0 - vs1) - math.log(1.0 - vs2))
 
         return td
 
@@ -738,9 +808,10 @@ class pin_spice():
     A class to represent a spice netlist pin.
     mod is the parent module that created this pin.
     mod_net is the net object of this pin's parent module. It must have the same name as the pin.
-    inst is the instance this pin is a part of, if any.
-    inst_net is the net object from mod's nets which connects to this pin.
+    The pins are shared by all the instances of the module. The nets an
+    instance connects them to are in the connections of the instance.
     """
+    __slots__ = ("name", "type", "mod", "mod_net", "_hash")
 
     valid_pin_types = ["INOUT", "INPUT", "OUTPUT", "POWER", "GROUND", "BIAS"]
 
@@ -749,8 +820,6 @@ class pin_spice():
         self.set_type(type)
         self.mod = mod
         self.mod_net = None
-        self.inst = None
-        self.inst_net = None
 
         # TODO: evaluate if this makes sense... and works
         self._hash = hash(self.name)
@@ -765,17 +834,6 @@ class pin_spice():
         debug.check(net.name == self.name, "module spice net must have same name as spice pin")
         self.mod_net = net
 
-    def set_inst(self, inst):
-        self.inst = inst
-
-    def set_inst_net(self, net):
-        if self.inst_net is not None:
-            debug.error("pin {} is already connected to net {}\
-                        so it cannot also be connected to net {}\
-                        ".format(self.name, self.inst_net.name, net.name), 1)
-        debug.check(isinstance(net, net_spice), "net must be a net_spice object")
-        self.inst_net = net
-
     def __str__(self):
         """ override print function output """
         return "(pin_name={} type={})".format(self.name, self.type)
@@ -797,16 +855,9 @@ class pin_spice():
 
     def __deepcopy__(original, memo):
         """
-        This function is defined so that instances of modules can make deep
-        copies of their parent module's pins dictionary. It is only expected
-        to be called by the instance class __init__ function. Mod and mod_net
-        should not be deep copies but references to the existing mod and net
-        objects they refer to in the original. If inst is already defined this
-        function will throw an error because that means it was called on a pin
-        from an instance, which is not defined behavior.
+        Mod and mod_net should not be deep copies but references to the
+        existing mod and net objects they refer to in the original.
         """
-        debug.check(original.inst is None,
-                    "cannot make a deepcopy of a spice pin from an inst")
         pin = pin_spice(original.name, original.type, original.mod)
         if original.mod_net is not None:
             pin.set_mod_net(original.mod_net)
@@ -817,32 +868,19 @@ class net_spice():
     """
     A class to represent a spice net.
     mod is the parent module that created this net.
-    pins are all the pins connected to this net.
-    inst is the instance this net is a part of, if any.
     """
+    __slots__ = ("name", "mod", "_hash")
 
     def __init__(self, name, mod):
         self.name = name
-        self.pins = []
         self.mod = mod
-        self.inst = None
 
         # TODO: evaluate if this makes sense... and works
         self._hash = hash(self.name)
 
-    def connect_pin(self, pin):
-        debug.check(isinstance(pin, pin_spice), "pin must be a pin_spice object")
-        if pin in self.pins:
-            debug.warning("pin {} was already connected to net {} ... why was it connected again?".format(pin.name, self.name))
-        else:
-            self.pins.append(pin)
-
-    def set_inst(self, inst):
-        self.inst = inst
-
     def __str__(self):
         """ override print function output """
-        return "(net_name={} type={})".format(self.name, self.type)
+        return "(net_name={})".format(self.name)
 
     def __repr__(self):
         """ override repr function output """
@@ -862,18 +900,7 @@ class net_spice():
 
     def __deepcopy__(original, memo):
         """
-        This function is defined so that instances of modules can make deep
-        copies of their parent module's nets dictionary. It is only expected
-        to be called by the instance class __init__ function. Mod
-        should not be a deep copy but a reference to the existing mod
-        object it refers to in the original. If inst is already defined this
-        function will throw an error because that means it was called on a net
-        from an instance, which is not defined behavior.
-        """
-        debug.check(original.inst is None,
-                    "cannot make a deepcopy of a spice net from an inst")
-        net = net_spice(original.name, original.mod)
-        if original.pins != []:
-            # TODO: honestly I'm not sure if this is right but we'll see...
-            net.pins = original.pins
-        return net
+        Mod should not be a deep copy but a reference to the existing mod
+        object it refers to in the original.
+        """
+        return net_spice(original.name, original.mod)
@@ -12,6 +12,7 @@ from openram.base import vector
 from openram.base import pin_layout
 from openram.tech import layer_names
 from openram import OPTS
+from openram import profiling
 
 
 class lef:
@@ -67,6 +68,7 @@ class lef:
         from openram.verify.run_script import run_script
         (outfile, errfile, resultsfile) = run_script(self.name, "lef")
 
+    @profiling.traced("lef_write", "writer")
     def lef_write(self, lef_name):
         """ Write the entire lef of the object to the file. """
         # Can possibly use magic lef write to create the LEF
@@ -3,7 +3,7 @@
 # Copyright (c) 2016-2024 Regents of the University of California, Santa Cruz
 # All rights reserved.
 #
-import copy
+import heapq
 from collections import defaultdict
 from openram import debug
 
@@ -41,6 +41,14 @@ class timing_graph():
         node = node.lower()
         self.graph[node] = set()
 
+    def remove_rail_edges(self):
+        """ Remove the edges of vdd and gnd """
+
+        # Will require edits if separate supplies are implemented.
+        # Names are also assumed.
+        self.remove_edges('vdd')
+        self.remove_edges('gnd')
+
     def get_all_paths(self, src_node, dest_node, remove_rail_nodes=True, reduce_paths=True):
         """Traverse all paths from source to destination"""
 
@@ -48,21 +56,10 @@ class timing_graph():
         dest_node = dest_node.lower()
 
         # Remove vdd and gnd by default
-        # Will require edits if separate supplies are implemented.
         if remove_rail_nodes:
-            # Names are also assumed.
-            self.remove_edges('vdd')
-            self.remove_edges('gnd')
-
-        # Mark all the vertices as not visited
-        visited = set()
+            self.remove_rail_edges()
 
-        # Create an array to store paths
-        path = []
-        self.all_paths = []
-
-        # Call the recursive helper function to print all paths
-        self.get_all_paths_util(src_node, dest_node, visited, path)
+        self.all_paths = list(self.iterate_paths(src_node, dest_node))
         debug.info(2, "Paths found={}".format(len(self.all_paths)))
 
         if reduce_paths:
@@ -73,42 +70,189 @@ class timing_graph():
     def reduce_paths(self):
         """ Remove any path that is a subset of another path """
 
-        self.all_paths = [p1 for p1 in self.all_paths if not any(set(p1)<=set(p2) for p2 in self.all_paths if p1 is not p2)]
-
-    def get_all_paths_util(self, cur_node, dest_node, visited, path):
-        """Recursive function to find all paths in a Depth First Search manner"""
-
-        # Mark the current node as visited and store in path
-        visited.add(cur_node)
-        path.append(cur_node)
-
-        # If current vertex is same as destination, then print
-        # current path[]
-        if cur_node == dest_node:
-            self.all_paths.append(copy.deepcopy(path))
-        else:
-            # If current vertex is not destination
-            # Recur for all the vertices adjacent to this vertex
-            for node in self.graph[cur_node]:
-                if node not in visited:
-                    self.get_all_paths_util(node, dest_node, visited, path)
-
-        # Remove current vertex from path[] and mark it as unvisited
-        path.pop()
-        visited.remove(cur_node)
+        path_sets = [frozenset(p) for p in self.all_paths]
+        # Only paths with as many nodes can be a superset
+        largest_first = sorted(range(len(path_sets)), key=lambda i: -len(path_sets[i]))
+        reduced_paths = []
+        for i, p1 in enumerate(path_sets):
+            for j in largest_first:
+                if len(path_sets[j]) < len(p1):
+                    reduced_paths.append(self.all_paths[i])
+                    break
+                if i != j and p1 <= path_sets[j]:
+                    break
+            else:
+                reduced_paths.append(self.all_paths[i])
+        self.all_paths = reduced_paths
+
+    def get_fanin(self):
+        """ Return the source nodes of the edges to each node """
+
+        fanin = defaultdict(set)
+        for src_node, dest_nodes in self.graph.items():
+            for dest_node in dest_nodes:
+                fanin[dest_node].add(src_node)
+        return fanin
+
+    def get_reaching_nodes(self, dest_node):
+        """ Return the nodes which have a path to the destination """
+
+        fanin = self.get_fanin()
+        reaching = {dest_node}
+        queue = [dest_node]
+        while queue:
+            for node in fanin[queue.pop()]:
+                if node not in reaching:
+                    reaching.add(node)
+                    queue.append(node)
+        return reaching
+
+    def iterate_paths(self, src_node, dest_node):
+        """
+        Iterate over the simple paths from source to destination in a Depth
+        First Search manner. Nodes which can't reach the destination are
+        skipped, and the search uses a stack instead of recursion.
+        """
+
+        if src_node == dest_node:
+            yield [src_node]
+            return
+        reaching = self.get_reaching_nodes(dest_node)
+        if src_node not in reaching:
+            return
+
+        path = [src_node]
+        visited = {src_node}
+        stack = [iter(self.graph[src_node])]
+        while stack:
+            for node in stack[-1]:
+                if node == dest_node:
+                    yield path + [node]
+                elif node in reaching and node not in visited:
+                    path.append(node)
+                    visited.add(node)
+                    stack.append(iter(self.graph[node]))
+                    break
+            else:
+                # All the adjacent nodes are done
+                stack.pop()
+                visited.remove(path.pop())
+
+    def get_dag(self, src_node, dest_node):
+        """
+        Return the nodes of the paths from source to destination in
+        topological order and their edges. The edges which close a cycle
+        (e.g. the feedback of a latch) are left out so the result is a DAG.
+        """
+
+        reaching = self.get_reaching_nodes(dest_node)
+        if src_node not in reaching:
+            return ([], {})
+
+        dag = {}
+        post_order = []
+        # Nodes on the stack are active, and edges to them close a cycle
+        active = {src_node}
+        dag[src_node] = []
+        stack = [(src_node, iter(self.graph[src_node]))]
+        while stack:
+            (cur_node, dest_nodes) = stack[-1]
+            for node in dest_nodes:
+                if node not in reaching or node in active:
+                    continue
+                dag[cur_node].append(node)
+                if node not in dag:
+                    dag[node] = []
+                    active.add(node)
+                    if node != dest_node:
+                        stack.append((node, iter(self.graph[node])))
+                        break
+                    active.remove(node)
+                    post_order.append(node)
+            else:
+                stack.pop()
+                active.remove(cur_node)
+                post_order.append(cur_node)
+
+        post_order.reverse()
+        return (post_order, dag)
+
+    def get_edge_weight(self, src_node, dest_node, edge_weight):
+        if edge_weight:
+            return edge_weight(src_node, dest_node, self.edge_mods[(src_node, dest_node)])
+        return 1
+
+    def get_critical_path(self, src_node, dest_node, edge_weight=None, remove_rail_nodes=True):
+        """
+        Return the longest path from source to destination and its weight.
+        edge_weight(src, dest, edge_mod) is the weight of each edge, and
+        by default the path with the most stages is returned.
+        """
+
+        paths = self.get_worst_paths(src_node, dest_node, 1, edge_weight, remove_rail_nodes)
+        if len(paths) == 0:
+            return ([], 0)
+        return paths[0]
+
+    def get_worst_paths(self, src_node, dest_node, k, edge_weight=None, remove_rail_nodes=True):
+        """
+        Return the k longest paths from source to destination with their
+        weights, longest first. The longest remaining weight to the
+        destination is computed in reverse topological order, so each
+        path is found by expanding only its own nodes instead of all paths.
+        """
 
-    def get_timing(self, path, corner, slew, load, params):
-        """Returns the analytical delays in the input path"""
+        src_node = src_node.lower()
+        dest_node = dest_node.lower()
+        if remove_rail_nodes:
+            self.remove_rail_edges()
 
-        if len(path) == 0:
+        (order, dag) = self.get_dag(src_node, dest_node)
+        if len(order) == 0:
             return []
 
-        delays = []
-        cur_slew = slew
+        # Longest weight from each node to the destination
+        weights = {}
+        tail = {dest_node: 0}
+        for node in reversed(order):
+            for next_node in dag[node]:
+                weights[(node, next_node)] = self.get_edge_weight(node, next_node, edge_weight)
+                if next_node in tail:
+                    tail[node] = max(tail.get(node, float("-inf")),
+                                     weights[(node, next_node)] + tail[next_node])
+
+        # Best first search of the partial paths. Partial paths are linked
+        # to their prefix so they share the memory of the common nodes.
+        paths = []
+        count = 0
+        queue = [(-tail[src_node], count, 0, (src_node, None))]
+        while queue and len(paths) < k:
+            (neg_weight, _, prefix_weight, partial_path) = heapq.heappop(queue)
+            node = partial_path[0]
+            if node == dest_node:
+                path = []
+                while partial_path:
+                    path.append(partial_path[0])
+                    partial_path = partial_path[1]
+                path.reverse()
+                paths.append((path, prefix_weight))
+                continue
+            for next_node in dag[node]:
+                if next_node not in tail:
+                    continue
+                count += 1
+                next_weight = prefix_weight + weights[(node, next_node)]
+                heapq.heappush(queue, (-(next_weight + tail[next_node]),
+                                       count,
+                                       next_weight,
+                                       (next_node, partial_path)))
+        return paths
+
+    def get_stage_loads(self, path, params):
+        """Returns the capacitance of the other mods connected to the output of each stage"""
+
+        stage_loads = []
         for i in range(len(path) - 1):
-
-            path_edge_mod = self.edge_mods[(path[i], path[i + 1])]
-
             # On the output of the current stage, get COUT from all other mods connected
             cout = 0
             for node in self.graph[path[i + 1]]:
@@ -120,6 +264,27 @@ class timing_graph():
                 else:
                     debug.error("Undefined model_name for analytical timing: {}".format(params["model_name"]),
                                 return_value=1)
+            stage_loads.append(cout)
+        return stage_loads
+
+    def get_timing(self, path, corner, slew, load, params):
+        """
+        Returns the analytical delays in the input path. The slew and load
+        can be NumPy arrays to get the delays of a whole table at once, in
+        which case the fan-out of the stages is only computed once.
+        """
+
+        if len(path) == 0:
+            return []
+
+        stage_loads = self.get_stage_loads(path, params)
+
+        delays = []
+        cur_slew = slew
+        for i in range(len(path) - 1):
+
+            path_edge_mod = self.edge_mods[(path[i], path[i + 1])]
+            cout = stage_loads[i]
 
             # If at the last output, include the final output load
             if i == len(path) - 2:
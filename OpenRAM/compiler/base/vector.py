@@ -18,6 +18,8 @@ class vector():
     concise vector operations, output, and other more complex
     data structures like lists.
     """
+    __slots__ = ("x", "y", "_hash")
+
     def __init__(self, x, y=0):
         """ init function support two init method"""
         # will take single input as a coordinate
@@ -163,7 +165,7 @@ class vector():
     def __eq__(self, other):
         """Override the default Equals behavior"""
         if isinstance(other, self.__class__):
-            return self.__dict__ == other.__dict__
+            return self.x == other.x and self.y == other.y
         return False
 
     def __ne__(self, other):
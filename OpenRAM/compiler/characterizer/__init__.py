@@ -6,6 +6,8 @@
 # All rights reserved.
 #
 import os
+import sys
+import importlib
 from openram import debug
 from .. import globals
 OPTS = globals.OPTS
@@ -14,8 +16,6 @@ get_tool = globals.get_tool
 from .lib import *
 from .delay import *
 from .elmore import *
-from .linear_regression import *
-from .neural_network import *
 from .setup_hold import *
 from .functional import *
 from .simulation import *
@@ -24,6 +24,21 @@ from .model_check import *
 from .analytical_util import *
 from .fake_sram import *
 
+# The regression models import sklearn, which is slow, so they are only
+# imported when they are first used
+lazy_models = ["linear_regression", "neural_network"]
+
+
+def __getattr__(name):
+    if name in lazy_models:
+        module = importlib.import_module("." + name, __name__)
+        # Importing the module set the package attribute to the module,
+        # so replace it with the model class like "import *" did
+        model = getattr(module, name)
+        setattr(sys.modules[__name__], name, model)
+        return model
+    raise AttributeError("module {0} has no attribute {1}".format(__name__, name))
+
 debug.info(1, "Initializing characterizer...")
 OPTS.spice_exe = ""
 
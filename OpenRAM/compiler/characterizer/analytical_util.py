@@ -266,6 +266,19 @@ def scale_data_and_transform(data):
                 scaled_data[i].append((feature_list[i]-min_val)/(max_val-min_val))
     return scaled_data
 
+def scale_data_array(data, maxs, mins):
+    """
+    Max/min scale a NumPy array of points (one per row) like
+    scale_data_and_transform. Features with a single value are scaled to 0.
+    """
+    ranges = maxs - mins
+    scaled = (data - mins) / np.where(ranges == 0, 1, ranges)
+    return np.where(ranges == 0, 0.0, scaled)
+
+def unscale_data_array(data, cur_max, cur_min):
+    """ Undo the max/min scaling of a NumPy array. """
+    return data * (cur_max - cur_min) + cur_min
+
 def scale_input_datapoint(point, file_path):
     """
     Input data has no output and needs to be scaled like the model inputs during
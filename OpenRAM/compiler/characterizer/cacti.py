@@ -6,6 +6,7 @@
 # All rights reserved.
 #
 import math
+import numpy as np
 from openram import debug
 from openram import tech
 from openram import OPTS
@@ -67,19 +68,18 @@ class cacti(simulation):
         port_data = self.get_empty_measure_data_dict()
         power = self.analytical_power(load_slews)
         debug.info(1, 'Slew (ns), Load (fF), Delay(ns), Slew(ns)')
-        max_delay = 0.0
-        for load,slew in load_slews:
-            # Calculate delay based on slew and load
-            # Calculations expect Farad, input is Femto-Farad
-            load_farad = load*1e-15
-            #load_farad = 0.052275e-12
-            slew = 0
-            path_delays = self.graph.get_timing(bl_path, self.corner, slew, load_farad, self.params)
-            total_delay = self.sum_delays(path_delays)
-
-            delay_ns = total_delay.delay/1e-9
-            slew_ns = total_delay.slew/1e-9
-            max_delay = max(max_delay, total_delay.delay)
+        # Calculate the delays of all the loads at once
+        # Calculations expect Farad, input is Femto-Farad
+        loads_farad = np.array([load for load, slew in load_slews]) * 1e-15
+        slew = 0
+        path_delays = self.graph.get_timing(bl_path, self.corner, slew, loads_farad, self.params)
+        total_delay = self.sum_delays(path_delays)
+        delays = np.broadcast_to(total_delay.delay, loads_farad.shape).tolist()
+        out_slews = np.broadcast_to(total_delay.slew, loads_farad.shape).tolist()
+        max_delay = max([0.0] + delays)
+        for (load, _), delay, out_slew in zip(load_slews, delays, out_slews):
+            delay_ns = delay/1e-9
+            slew_ns = out_slew/1e-9
             debug.info(1,'{}, {}, {}, {}'.format(slew,
                                                  load,
                                                  delay_ns,
@@ -90,9 +90,9 @@ class cacti(simulation):
                     if "power" in mname:
                         port_data[port][mname].append(power.dynamic)
                     elif "delay" in mname and port in self.read_ports:
-                        port_data[port][mname].append(total_delay.delay / 1e-9)
+                        port_data[port][mname].append(delay / 1e-9)
                     elif "slew" in mname and port in self.read_ports:
-                        port_data[port][mname].append(total_delay.slew / 1e-9)
+                        port_data[port][mname].append(out_slew / 1e-9)
 
         # Margin for error in period. Calculated by averaging required margin for a small and large
         # memory. FIXME: margin is quite large, should be looked into.
@@ -17,35 +17,81 @@ def relative_compare(value1, value2, error_tolerance=0.001):
     return (abs(value1 - value2) / abs(max(value1, value2)) <= error_tolerance)
 
 
-def parse_spice_list(filename, key):
-    """Parses a hspice output.lis file for a key value"""
+# Parsed spice output files so that each simulation output is only read once.
+# This is cleared by stimuli.run_sim before the output files are written again.
+spice_list_cache = {}
+
+
+def clear_spice_list_cache():
+    """ Forget the parsed spice outputs of the previous simulation. """
+    spice_list_cache.clear()
 
-    lower_key = key.lower()
+
+def get_spice_list_filename(filename):
+    """ Return the spice output file name of the current simulator. """
 
     if OPTS.spice_name == "xa" :
         # customsim has a different output file name
-        full_filename="{0}xa.meas".format(OPTS.openram_temp)
+        return "{0}xa.meas".format(OPTS.openram_temp)
     elif OPTS.spice_name == "spectre":
-        full_filename = os.path.join(OPTS.openram_temp, "delay_stim.measure")
+        return os.path.join(OPTS.openram_temp, "delay_stim.measure")
     elif OPTS.spice_name in ["Xyce", "xyce"]:
-        full_filename = os.path.join(OPTS.openram_temp, "spice_stdout.log")
+        return os.path.join(OPTS.openram_temp, "spice_stdout.log")
     else:
         # ngspice/hspice using a .lis file
-        full_filename = "{0}{1}.lis".format(OPTS.openram_temp, filename)
+        return "{0}{1}.lis".format(OPTS.openram_temp, filename)
 
-    try:
-        f = open(full_filename, "r")
-    except IOError:
-        debug.error("Unable to open spice output file: {0}".format(full_filename),1)
-        debug.archive()
-
-    contents = f.read().lower()
-    f.close()
-    # val = re.search(r"{0}\s*=\s*(-?\d+.?\d*\S*)\s+.*".format(key), contents)
-    val = re.search(r"{0}\s*=\s*(-?\d+.?\d*[e]?[-+]?[0-9]*\S*)\s+.*".format(lower_key), contents)
-    if val != None:
-        debug.info(4, "Key = " + lower_key + " Val = " + val.group(1))
-        return convert_to_float(val.group(1))
+
+def read_spice_list(full_filename):
+    """
+    Read a spice output file and find all "name = value" measurements in a
+    single pass. The result is cached until the next simulation.
+    """
+
+    if full_filename not in spice_list_cache:
+        try:
+            f = open(full_filename, "r")
+        except IOError:
+            debug.error("Unable to open spice output file: {0}".format(full_filename),1)
+            debug.archive()
+
+        contents = f.read().lower()
+        f.close()
+        measures = re.findall(r"(\S+?)\s*=\s*(-?\d+.?\d*[e]?[-+]?[0-9]*\S*)\s", contents)
+        spice_list_cache[full_filename] = (contents, measures, {})
+    return spice_list_cache[full_filename]
+
+
+def set_spice_list(full_filename, contents, measures):
+    """ Use the output of a previous identical simulation as the spice output file. """
+    spice_list_cache[full_filename] = (contents, measures, {})
+
+
+def parse_spice_list(filename, key):
+    """Parses a hspice output.lis file for a key value"""
+
+    lower_key = key.lower()
+    full_filename = get_spice_list_filename(filename)
+    contents, measures, values = read_spice_list(full_filename)
+
+    if lower_key not in values:
+        # Like searching the file for the key, use the first measurement whose
+        # name ends with the key
+        for name, value in measures:
+            if name.endswith(lower_key):
+                break
+        else:
+            # Search the whole output in case the measurement wasn't separated
+            # from others
+            # val = re.search(r"{0}\s*=\s*(-?\d+.?\d*\S*)\s+.*".format(key), contents)
+            val = re.search(r"{0}\s*=\s*(-?\d+.?\d*[e]?[-+]?[0-9]*\S*)\s+.*".format(lower_key), contents)
+            value = val.group(1) if val != None else None
+        values[lower_key] = value
+
+    value = values[lower_key]
+    if value != None:
+        debug.info(4, "Key = " + lower_key + " Val = " + value)
+        return convert_to_float(value)
     else:
         return "Failed"
 
@@ -6,6 +6,8 @@
 # All rights reserved.
 #
 import math
+import multiprocessing
+import os
 import shutil
 from openram import debug
 from openram import tech
@@ -15,6 +17,7 @@ from .trim_spice import *
 from .charutils import *
 from .simulation import simulation
 from .measurements import *
+from . import sim_cache
 from os import path
 import re
 
@@ -833,7 +836,7 @@ class delay(simulation):
 
         self.write_delay_stimulus()
 
-        self.stim.run_sim(self.delay_stim_sp)
+        self.stim.run_cached_sim(self.delay_stim_sp, use_raw_file=OPTS.use_raw_file)
 
         return self.check_measurements()
 
@@ -1007,7 +1010,7 @@ class delay(simulation):
 
         debug.info(1, "Performing leakage power simulations.")
         self.write_power_stimulus(trim=False)
-        self.stim.run_sim(self.power_stim_sp)
+        self.stim.run_cached_sim(self.power_stim_sp)
         leakage_power=parse_spice_list("timing", "leakage_power")
         debug.check(leakage_power!="Failed", "Could not measure leakage power.")
         debug.info(1, "Leakage power of full array is {0} mW".format(leakage_power * 1e3))
@@ -1015,7 +1018,7 @@ class delay(simulation):
         # sys.exit(1)
 
         self.write_power_stimulus(trim=True)
-        self.stim.run_sim(self.power_stim_sp)
+        self.stim.run_cached_sim(self.power_stim_sp)
         trim_leakage_power=parse_spice_list("timing", "leakage_power")
         debug.check(trim_leakage_power!="Failed", "Could not measure leakage power.")
         debug.info(1, "Leakage power of trimmed array is {0} mW".format(trim_leakage_power * 1e3))
@@ -1105,6 +1108,12 @@ class delay(simulation):
         # Write ports are assumed non-critical to timing, so the first available is used
         self.targ_write_ports = [self.write_ports[0]]
         self.targ_read_ports = [port]
+
+        # Try several periods at once if there are threads to spare. Worker
+        # processes (e.g. of parallel corners) can't create their own workers.
+        if OPTS.num_threads > 1 and not multiprocessing.current_process().daemon:
+            return self.find_min_period_one_port_parallel(feasible_delays, port, lb_period, ub_period, target_period)
+
         while True:
             time_out -= 1
             if (time_out <= 0):
@@ -1129,6 +1138,61 @@ class delay(simulation):
             target_period = 0.5 * (ub_period + lb_period)
             # key=input("press return to continue")
 
+    def find_min_period_one_port_parallel(self, feasible_delays, port, lb_period, ub_period, target_period):
+        """
+        Speculative version of find_min_period_one_port. Each round simulates
+        OPTS.num_threads periods between the bounds in worker processes, each
+        with its own temp directory, so the bounds shrink by a factor of
+        OPTS.num_threads + 1 per round instead of 2.
+        """
+
+        num_workers = OPTS.num_threads
+        temp_dir = OPTS.openram_temp
+        # Like the serial search, the first round also tries the given target
+        step = (ub_period - lb_period) / num_workers
+        periods = [target_period] + [lb_period + step * (i + 1) for i in range(num_workers - 1)]
+        time_out = 25
+
+        global min_period_delay
+        min_period_delay = self
+        # The workers include the trimmed netlist of this temp directory
+        sim_cache.parent_temp_paths.append(temp_dir)
+        try:
+            context = multiprocessing.get_context("fork")
+            with context.Pool(processes=num_workers) as pool:
+                while True:
+                    time_out -= 1
+                    if (time_out <= 0):
+                        debug.error("Timed out, could not converge on minimum period.", 2)
+
+                    debug.info(1, "MinPeriod Search Port {3}: {0}ns (ub: {1} lb: {2})".format(periods,
+                                                                                              ub_period,
+                                                                                              lb_period,
+                                                                                              port))
+                    args = [(period, feasible_delays, "{0}period{1}/".format(temp_dir, i))
+                            for i, period in enumerate(periods)]
+                    results = pool.map(try_period_worker, args, chunksize=1)
+
+                    # The smallest feasible period is the new upper bound and
+                    # the largest infeasible period below it is the new lower bound
+                    for period, success in zip(periods, results):
+                        if success and period < ub_period:
+                            ub_period = period
+                    for period, success in zip(periods, results):
+                        if not success and lb_period < period < ub_period:
+                            lb_period = period
+
+                    if relative_compare(ub_period, lb_period, error_tolerance=0.05):
+                        # ub_period is always feasible.
+                        return ub_period
+
+                    # Update targets
+                    step = (ub_period - lb_period) / (num_workers + 1)
+                    periods = [lb_period + step * (i + 1) for i in range(num_workers)]
+        finally:
+            min_period_delay = None
+            sim_cache.parent_temp_paths.remove(temp_dir)
+
     def try_period(self, feasible_delays):
         """
         This tries to simulate a period and checks if the result
@@ -1578,3 +1642,20 @@ class delay(simulation):
                 if self.sram.num_wmasks:
                     for bit in range(self.sram.num_wmasks):
                         self.stim.gen_pwl("WMASK{0}_{1}".format(port, bit), self.cycle_times, self.wmask_values[port][bit], self.period, self.slew, 0.05)
+
+
+# The delay characterizer used by the min period search workers. It is set
+# before the worker processes are forked so that they inherit it.
+min_period_delay = None
+
+
+def try_period_worker(args):
+    """ Try one period of min_period_delay in its own temp directory. """
+    (period, feasible_delays, temp_dir) = args
+    OPTS.openram_temp = temp_dir
+    os.makedirs(OPTS.openram_temp, exist_ok=True)
+    if OPTS.spice_name == "ngspice":
+        os.environ["NGSPICE_INPUT_DIR"] = "{0}".format(OPTS.openram_temp)
+    min_period_delay.output_path = temp_dir
+    min_period_delay.period = period
+    return min_period_delay.try_period(feasible_delays)
@@ -5,6 +5,7 @@
 # (acting for and on behalf of Oklahoma State University)
 # All rights reserved.
 #
+import numpy as np
 from openram import debug
 from openram import OPTS
 from .simulation import simulation
@@ -62,27 +63,29 @@ class elmore(simulation):
         port_data = self.get_empty_measure_data_dict()
         power = self.analytical_power(load_slews)
         debug.info(1, 'Slew, Load, Delay(ns), Slew(ns)')
-        max_delay = 0.0
-        for load,slew in load_slews:
-            # Calculate delay based on slew and load
-            path_delays = self.graph.get_timing(bl_path, self.corner, slew, load, self.params)
-
-            total_delay = self.sum_delays(path_delays)
-            max_delay = max(max_delay, total_delay.delay)
+        # Calculate the delays of all the slews and loads at once
+        loads = np.array([load for load, slew in load_slews])
+        slews = np.array([slew for load, slew in load_slews])
+        path_delays = self.graph.get_timing(bl_path, self.corner, slews, loads, self.params)
+        total_delay = self.sum_delays(path_delays)
+        delays = np.broadcast_to(total_delay.delay, loads.shape).tolist()
+        out_slews = np.broadcast_to(total_delay.slew, loads.shape).tolist()
+        max_delay = max([0.0] + delays)
+        for (load, slew), delay, out_slew in zip(load_slews, delays, out_slews):
             debug.info(1,
                        '{}, {}, {}, {}'.format(slew,
                                                load,
-                                               total_delay.delay / 1e3,
-                                               total_delay.slew / 1e3))
+                                               delay / 1e3,
+                                               out_slew / 1e3))
             # Delay is only calculated on a single port and replicated for now.
             for port in self.all_ports:
                 for mname in self.delay_meas_names + self.power_meas_names:
                     if "power" in mname:
                         port_data[port][mname].append(power.dynamic)
                     elif "delay" in mname and port in self.read_ports:
-                        port_data[port][mname].append(total_delay.delay / 1e3)
+                        port_data[port][mname].append(delay / 1e3)
                     elif "slew" in mname and port in self.read_ports:
-                        port_data[port][mname].append(total_delay.slew / 1e3)
+                        port_data[port][mname].append(out_slew / 1e3)
 
         # Margin for error in period. Calculated by averaging required margin for a small and large
         # memory. FIXME: margin is quite large, should be looked into.
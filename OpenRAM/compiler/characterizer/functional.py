@@ -18,6 +18,7 @@ from .stimuli import *
 from .charutils import *
 from .simulation import simulation
 from .measurements import voltage_at_measure
+from .raw_file import get_raw_file
 
 
 class functional(simulation):
@@ -123,7 +124,7 @@ class functional(simulation):
         self.write_functional_stimulus()
 
     def run(self):
-        self.stim.run_sim(self.stim_sp)
+        self.stim.run_sim(self.stim_sp, use_raw_file=OPTS.use_raw_file)
 
         # read dout values from SPICE simulation. If the values do not fall within the noise margins, return the error.
         (success, error) = self.read_stim_results()
@@ -289,14 +290,33 @@ class functional(simulation):
                                 self.t_current + self.period,
                                 int(self.t_current / self.period)])
 
+    def read_raw_values(self, raw):
+        """ Sample each dout bit at the times of all of its measurements at once. """
+        measure_times = {}
+        for (measure_name, meas) in self.measures.items():
+            (meas_name, targ_name, time_at) = meas.measure_values[meas.get_measure_name(port=0)]
+            measure_times.setdefault(targ_name, []).append((measure_name, time_at * 1e-9))
+
+        values = {}
+        for (targ_name, times) in measure_times.items():
+            voltages = raw.get_values_at(targ_name, [x[1] for x in times])
+            values.update(zip([x[0] for x in times], voltages.tolist()))
+        return values
+
     def read_stim_results(self):
-        # Extract dout values from spice timing.lis
+        # Extract dout values from the raw file or spice timing.lis
+        raw = get_raw_file()
+        if raw:
+            raw_values = self.read_raw_values(raw)
         for (word, dout_port, eo_period, cycle) in self.read_check:
             sp_read_value = ""
             for bit in range(self.word_size + self.num_spare_cols):
                 measure_name = "v{0}_{1}ck{2}".format(dout_port.lower(), bit, cycle)
                 # value = parse_spice_list("timing", measure_name)
-                value = self.measures[measure_name].retrieve_measure(port=0)
+                if raw:
+                    value = raw_values[measure_name]
+                else:
+                    value = self.measures[measure_name].retrieve_measure(port=0)
                 # FIXME: Ignore the spare columns for now
                 if bit >= self.word_size:
                     value = 0
@@ -7,6 +7,7 @@
 #
 import os, sys, re
 import time
+import multiprocessing
 import datetime
 import numpy as np
 from openram import debug
@@ -16,6 +17,7 @@ from openram import OPTS
 from .setup_hold import *
 from .delay import *
 from .charutils import *
+from . import sim_cache
 
 
 class lib:
@@ -106,6 +108,7 @@ class lib:
 
         if OPTS.use_specified_corners == None:
             # Nominal corner
+            nom_corner = (nom_process, nom_supply, nom_temperature)
             corner_tuples = set()
             if OPTS.only_use_config_corners:
                 if OPTS.nominal_corner_only:
@@ -116,7 +119,6 @@ class lib:
                         for t in self.temperatures:
                             corner_tuples.add((p, v, t))
             else:
-                nom_corner = (nom_process, nom_supply, nom_temperature)
                 corner_tuples.add(nom_corner)
                 if not OPTS.nominal_corner_only:
                     # Temperature corners
@@ -129,8 +131,11 @@ class lib:
                     corner_tuples.add((min_process, nom_supply, nom_temperature))
                     corner_tuples.add((max_process, nom_supply, nom_temperature))
             # Enforce that nominal corner is the first to be characterized
-            self.add_corner(*nom_corner)
-            corner_tuples.remove(nom_corner)
+            if nom_corner in corner_tuples:
+                self.add_corner(*nom_corner)
+                corner_tuples.remove(nom_corner)
+            # Sort the rest so the corner (and datasheet) order is deterministic
+            corner_tuples = sorted(corner_tuples)
         else:
             corner_tuples = OPTS.use_specified_corners
 
@@ -153,23 +158,77 @@ class lib:
     def characterize_corners(self):
         """ Characterize the list of corners. """
         debug.info(1,"Characterizing corners: " + str(self.corners))
+        if OPTS.num_threads > 1 and len(self.corners) > 1:
+            corner_results = self.characterize_corners_parallel()
+        else:
+            corner_results = map(self.characterize_corner, range(len(self.corners)))
+
+        # The datasheet info is always merged in corner order so that
+        # the output doesn't depend on which worker finished first.
         is_first_corner = True
-        for (self.corner,lib_name) in zip(self.corners,self.lib_files):
-            run_start = time.time()
-            debug.info(1,"Corner: " + str(self.corner))
-            (self.process, self.voltage, self.temperature) = self.corner
-            self.lib = open(lib_name, "w")
-            debug.info(1,"Writing to {0}".format(lib_name))
-            self.corner_name = lib_name.replace(self.out_dir,"").replace(".lib","")
-            self.characterize()
-            self.lib.close()
-            if self.pred_time == None:
-                total_time = time.time()-run_start
-            else:
-                total_time = self.pred_time
-            self.parse_info(self.corner,lib_name, is_first_corner, total_time)
+        for (self.corner, lib_name, results) in zip(self.corners, self.lib_files, corner_results):
+            (self.char_sram_results, self.char_port_results, self.times, total_time) = results
+            self.parse_info(self.corner, lib_name, is_first_corner, total_time)
             is_first_corner = False
 
+    def characterize_corners_parallel(self):
+        """
+        Characterize the corners concurrently in a pool of worker processes.
+        Each worker uses its own temp directory so the simulator files of
+        different corners don't collide. Returns the per-corner results in
+        corner order.
+        """
+        num_workers = min(OPTS.num_threads, len(self.corners))
+        debug.info(1, "Characterizing {0} corners with {1} workers".format(len(self.corners),
+                                                                          num_workers))
+        # The setup/hold times are only characterized for the first corner
+        # (see compute_setup_hold), so do it once before forking the workers.
+        (self.process, self.voltage, self.temperature) = self.corner = self.corners[0]
+        self.compute_setup_hold()
+
+        global corner_lib
+        corner_lib = self
+        # A worker characterizes several corners, so the temp directory of
+        # each corner is made from this one
+        temp_dir = OPTS.openram_temp
+        corner_args = [(i, "{0}corner{1}/".format(temp_dir, i)) for i in range(len(self.corners))]
+        # The workers include the netlist of this temp directory
+        sim_cache.parent_temp_paths.append(temp_dir)
+        try:
+            context = multiprocessing.get_context("fork")
+            with context.Pool(processes=num_workers) as pool:
+                # Results are returned in the order of the corner indices
+                corner_results = pool.map(characterize_corner_worker,
+                                          corner_args,
+                                          chunksize=1)
+        finally:
+            corner_lib = None
+            sim_cache.parent_temp_paths.remove(temp_dir)
+        return corner_results
+
+    def characterize_corner(self, corner_index):
+        """
+        Characterize a single corner and write its lib file.
+        Returns the results needed to write the datasheet info.
+        """
+        run_start = time.time()
+        self.corner = self.corners[corner_index]
+        lib_name = self.lib_files[corner_index]
+        debug.info(1,"Corner: " + str(self.corner))
+        (self.process, self.voltage, self.temperature) = self.corner
+        self.lib = open(lib_name, "w")
+        debug.info(1,"Writing to {0}".format(lib_name))
+        self.corner_name = lib_name.replace(self.out_dir,"").replace(".lib","")
+        sim_cache.reset_sim_cache_stats()
+        self.characterize()
+        sim_cache.report_sim_cache_stats(self.corner_name)
+        self.lib.close()
+        if self.pred_time == None:
+            total_time = time.time()-run_start
+        else:
+            total_time = self.pred_time
+        return (self.char_sram_results, self.char_port_results, self.times, total_time)
+
     def characterize(self):
         """ Characterize the current corner. """
 
@@ -892,3 +951,18 @@ class lib:
             datasheet.write("{0},{1},".format('read_rise_power_{}'.format(port), read1_power))
             #FIXME: should be read_fall_power
             datasheet.write("{0},{1},".format('read_fall_power_{}'.format(port), read0_power))
+
+
+# The lib instance being characterized by the corner workers. The workers are
+# forked so they inherit the SRAM design instead of pickling it.
+corner_lib = None
+
+
+def characterize_corner_worker(args):
+    """ Characterize one corner of corner_lib in its own temp directory. """
+    (corner_index, temp_dir) = args
+    OPTS.openram_temp = temp_dir
+    os.makedirs(OPTS.openram_temp, exist_ok=True)
+    if OPTS.spice_name == "ngspice":
+        os.environ["NGSPICE_INPUT_DIR"] = "{0}".format(OPTS.openram_temp)
+    return corner_lib.characterize_corner(corner_index)
@@ -10,6 +10,7 @@ from openram import debug
 from openram.tech import drc, parameter, spice
 from .stimuli import *
 from .charutils import *
+from .raw_file import get_raw_file
 
 
 class spice_measurement(ABC):
@@ -22,25 +23,46 @@ class spice_measurement(ABC):
         # Some meta values used externally. variables are added here for consistency accross the objects
         self.meta_str = None
         self.meta_add_delay = False
+        # The values of the last written measurement of each port to
+        # evaluate it against a raw file
+        self.measure_values = {}
 
     @abstractmethod
     def measure_function(self):
         return None
 
+    @abstractmethod
+    def evaluate_function(self):
+        return None
+
+    @abstractmethod
+    def get_signal_names(self):
+        return None
+
     @abstractmethod
     def get_measure_values(self):
         return None
 
     def write_measure(self, stim_obj, input_tuple):
         measure_vals = self.get_measure_values(*input_tuple)
+        self.measure_values[measure_vals[0].lower()] = measure_vals
         self.measure_function(stim_obj, *measure_vals)
+        stim_obj.add_saved_signals(self.get_signal_names(*measure_vals))
+
+    def get_measure_name(self, port=None):
+        if port is not None:
+            return "{0}{1}".format(self.name.lower(), port)
+        else:
+            return self.name.lower()
 
     def retrieve_measure(self, port=None):
         self.port_error_check(port)
-        if port is not None:
-            value = parse_spice_list("timing", "{0}{1}".format(self.name.lower(), port))
+        meas_name = self.get_measure_name(port)
+        raw = get_raw_file()
+        if raw and meas_name in self.measure_values:
+            value = self.evaluate_function(raw, *self.measure_values[meas_name])
         else:
-            value = parse_spice_list("timing", "{0}".format(self.name.lower()))
+            value = parse_spice_list("timing", meas_name)
         if type(value)!=float or self.measure_scale is None:
             return value
         else:
@@ -82,6 +104,18 @@ class delay_measure(spice_measurement):
                                                  targ_dir,
                                                  targ_td))
 
+    def evaluate_function(self, raw, meas_name, trig_name, targ_name, trig_val, targ_val, trig_dir, targ_dir, trig_td, targ_td):
+        """ Computes the delay from the waveforms of a raw file """
+        trig_time = raw.get_crossing_time(trig_name, trig_val, trig_dir, trig_td * 1e-9)
+        targ_time = raw.get_crossing_time(targ_name, targ_val, targ_dir, targ_td * 1e-9)
+        if trig_time is None or targ_time is None:
+            return "Failed"
+        return targ_time - trig_time
+
+    def get_signal_names(self, meas_name, trig_name, targ_name, trig_val, targ_val, trig_dir, targ_dir, trig_td, targ_td):
+        """ Returns the signals of the measurement to save in a raw file """
+        return ["v({})".format(trig_name), "v({})".format(targ_name)]
+
     def set_meas_constants(self, trig_name, targ_name, trig_dir_str, targ_dir_str, trig_vdd, targ_vdd):
         """Set the constants for this measurement: signal names, directions, and trigger scales"""
         self.trig_dir_str = trig_dir_str
@@ -156,6 +190,15 @@ class power_measure(spice_measurement):
                                                                                  t_initial,
                                                                                  t_final))
 
+    def evaluate_function(self, raw, meas_name, t_initial, t_final):
+        """ Computes the avg power from the waveforms of a raw file """
+        power = -1 * raw.get_signal("vdd") * raw.get_signal("i(vvdd)")
+        return raw.get_average(power, t_initial * 1e-9, t_final * 1e-9)
+
+    def get_signal_names(self, meas_name, t_initial, t_final):
+        """ Returns the signals of the measurement to save in a raw file """
+        return ["v(vdd)", "i(vvdd)"]
+
     def set_meas_constants(self, power_type):
         """Sets values useful for power simulations. This value is only meta related to the lib file (rise/fall)"""
         # Not needed for power simulation
@@ -188,6 +231,17 @@ class voltage_when_measure(spice_measurement):
                                                 trig_dir,
                                                 trig_td))
 
+    def evaluate_function(self, raw, meas_name, trig_name, targ_name, trig_val, trig_dir, trig_td):
+        """ Finds the voltage from the waveforms of a raw file """
+        trig_time = raw.get_crossing_time(trig_name, trig_val, trig_dir, trig_td * 1e-9)
+        if trig_time is None:
+            return "Failed"
+        return float(raw.get_values_at(targ_name, [trig_time])[0])
+
+    def get_signal_names(self, meas_name, trig_name, targ_name, trig_val, trig_dir, trig_td):
+        """ Returns the signals of the measurement to save in a raw file """
+        return ["v({})".format(trig_name), "v({})".format(targ_name)]
+
     def set_meas_constants(self, trig_name, targ_name, trig_dir_str, trig_vdd):
         """Sets values useful for power simulations. This value is only meta related to the lib file (rise/fall)"""
         self.trig_dir_str = trig_dir_str
@@ -226,6 +280,14 @@ class voltage_at_measure(spice_measurement):
                                                 targ_name,
                                                 time_at))
 
+    def evaluate_function(self, raw, meas_name, targ_name, time_at):
+        """ Finds the voltage at time from the waveforms of a raw file """
+        return float(raw.get_values_at(targ_name, [time_at * 1e-9])[0])
+
+    def get_signal_names(self, meas_name, targ_name, time_at):
+        """ Returns the signals of the measurement to save in a raw file """
+        return ["v({})".format(targ_name)]
+
     def set_meas_constants(self, targ_name):
         """Sets values useful for power simulations. This value is only meta related to the lib file (rise/fall)"""
         self.targ_name_no_port = targ_name
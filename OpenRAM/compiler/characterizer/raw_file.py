@@ -0,0 +1,201 @@
+# See LICENSE for licensing information.
+#
+# Copyright (c) 2016-2024 Regents of the University of California and The Board
+# of Regents for the Oklahoma Agricultural and Mechanical College
+# (acting for and on behalf of Oklahoma State University)
+# All rights reserved.
+#
+"""
+This reads the waveforms of a simulation from the binary raw file written
+by ngspice or Xyce. The data is memory mapped, so only the signals that are
+measured are read, and the measurements are computed from the waveforms
+with NumPy instead of .meas statements in the simulator.
+"""
+
+import os
+import numpy as np
+from openram import debug
+from openram import OPTS
+
+# The raw file of the last simulation if it wrote one
+raw_file_name = None
+# The opened raw file of the last simulation
+last_raw_file = None
+
+
+def get_raw_filename():
+    """ Return the raw file name of the current simulator. """
+    return "{0}timing.raw".format(OPTS.openram_temp)
+
+
+def set_raw_file(filename):
+    """ Use the raw file for the measurements of the last simulation. """
+    global raw_file_name
+    clear_raw_file()
+    raw_file_name = filename
+
+
+def clear_raw_file():
+    """ Forget the raw file of the previous simulation before it is overwritten. """
+    global raw_file_name, last_raw_file
+    raw_file_name = None
+    last_raw_file = None
+
+
+def get_raw_file():
+    """ Return the raw file of the last simulation or None if it didn't write one. """
+    global last_raw_file
+    if raw_file_name and not last_raw_file:
+        last_raw_file = raw_file(raw_file_name)
+    return last_raw_file
+
+
+class raw_file():
+    """
+    The transient waveforms of a binary raw file. Times are in seconds.
+    """
+
+    def __init__(self, filename):
+        self.filename = filename
+        self.read_header()
+        self.time = np.asarray(self.data[:, 0].real)
+
+    def read_header(self):
+        """
+        Read the plots of the file and memory map the data of the transient
+        analysis (or the last plot if there isn't one).
+        """
+        file_size = os.path.getsize(self.filename)
+        plots = []
+        with open(self.filename, "rb") as f:
+            while f.tell() < file_size:
+                plot = self.read_plot_header(f)
+                dtype = np.dtype("<c16" if "complex" in plot["flags"] else "<f8")
+                # A simulation that stopped early has fewer points than the header
+                num_points = min(plot["num_points"],
+                                 (file_size - plot["offset"]) // (dtype.itemsize * len(plot["variables"])))
+                plot["dtype"] = dtype
+                plot["num_points"] = num_points
+                plots.append(plot)
+                f.seek(plot["offset"] + num_points * dtype.itemsize * len(plot["variables"]))
+
+        debug.check(len(plots) > 0, "No plots in raw file {0}".format(self.filename))
+        transient_plots = [x for x in plots if x["plotname"].lower().startswith("transient")]
+        plot = (transient_plots or plots)[-1]
+
+        self.plotname = plot["plotname"]
+        self.variables = plot["variables"]
+        self.data = np.memmap(self.filename,
+                              dtype=plot["dtype"],
+                              mode="r",
+                              offset=plot["offset"],
+                              shape=(plot["num_points"], len(self.variables)))
+
+        # The signals are found by their lower case names like v(dout0_0) or
+        # i(vvdd) and voltages also by the net name
+        self.signal_index = {}
+        for (index, name) in enumerate(self.variables):
+            name = name.lower()
+            self.signal_index[name] = index
+            if name.startswith("v(") and name.endswith(")"):
+                self.signal_index.setdefault(name[2:-1], index)
+            elif name.endswith("#branch"):
+                # Older ngspice versions name the currents of the sources this way
+                self.signal_index.setdefault("i({})".format(name[:-len("#branch")]), index)
+
+    def read_plot_header(self, f):
+        """ Read the header of a plot up to its binary data. """
+        plot = {"plotname": "", "flags": "real", "num_points": 0, "variables": []}
+        num_variables = 0
+        while True:
+            line = f.readline()
+            if not line:
+                debug.error("No binary data in raw file {0}".format(self.filename), 1)
+            line = line.decode("ascii", errors="replace").strip()
+            (key, _, value) = line.partition(":")
+            key = key.lower()
+            value = value.strip()
+            if key == "plotname":
+                plot["plotname"] = value
+            elif key == "flags":
+                plot["flags"] = value.lower()
+            elif key == "no. variables":
+                num_variables = int(value)
+            elif key == "no. points":
+                plot["num_points"] = int(value)
+            elif key == "variables":
+                # Each variable is "index name type" on its own line and the
+                # first variable can be on the same line
+                variable_lines = [value] if value else []
+                while len(variable_lines) < num_variables:
+                    variable_lines.append(f.readline().decode("ascii", errors="replace").strip())
+                plot["variables"] = [x.split()[1] for x in variable_lines]
+            elif key == "binary":
+                plot["offset"] = f.tell()
+                return plot
+            elif key == "values":
+                debug.error("Only binary raw files are supported: {0}".format(self.filename), 1)
+
+    def has_signal(self, name):
+        return name.lower() in self.signal_index
+
+    def get_signal(self, name):
+        """ Return the waveform of a signal like dout0_0, v(dout0_0) or i(vvdd). """
+        lower_name = name.lower()
+        if lower_name not in self.signal_index:
+            debug.error("Signal {0} is not in raw file {1}".format(name, self.filename), 1)
+        return np.asarray(self.data[:, self.signal_index[lower_name]].real)
+
+    def get_values_at(self, name, times):
+        """ Return the values of a signal at each of the times. """
+        return np.interp(np.asarray(times, dtype=float), self.time, self.get_signal(name))
+
+    def get_crossing_times(self, name, value, direction="CROSS", start_time=0):
+        """
+        Return the times after start_time when a signal crosses the value in
+        the direction (RISE, FALL or CROSS).
+        """
+        return self.find_crossing_times(self.get_signal(name), value, direction, start_time)
+
+    def find_crossing_times(self, values, value, direction="CROSS", start_time=0):
+        # Only search from the sample before the start time
+        first = max(np.searchsorted(self.time, start_time) - 1, 0)
+        time = self.time[first:]
+        values = values[first:] - value
+        before = values[:-1]
+        after = values[1:]
+        rising = (before < 0) & (after >= 0)
+        falling = (before > 0) & (after <= 0)
+        direction = direction.upper()
+        if direction == "RISE":
+            crossings = rising
+        elif direction == "FALL":
+            crossings = falling
+        elif direction == "CROSS":
+            crossings = rising | falling
+        else:
+            debug.error("Unrecognised crossing direction={}".format(direction), 1)
+        index = np.flatnonzero(crossings)
+        # Interpolate the time of each crossing between the samples
+        crossing_times = time[index] + (time[index + 1] - time[index]) * before[index] / (before[index] - after[index])
+        return crossing_times[crossing_times >= start_time]
+
+    def get_crossing_time(self, name, value, direction="CROSS", start_time=0, number=1):
+        """
+        Return the time of the number-th crossing like the RISE=number or
+        FALL=number of a .meas statement or None if there isn't one.
+        """
+        crossing_times = self.get_crossing_times(name, value, direction, start_time)
+        if len(crossing_times) < number:
+            return None
+        return float(crossing_times[number - 1])
+
+    def get_average(self, values, start_time, end_time):
+        """ Return the average of a waveform between the times. """
+        inside = (self.time > start_time) & (self.time < end_time)
+        time = np.concatenate(([start_time], self.time[inside], [end_time]))
+        values = np.concatenate((np.interp([start_time], self.time, values),
+                                 values[inside],
+                                 np.interp([end_time], self.time, values)))
+        area = np.sum((values[1:] + values[:-1]) * np.diff(time)) / 2
+        return float(area / (end_time - start_time))
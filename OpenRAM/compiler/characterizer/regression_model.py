@@ -5,7 +5,11 @@
 # (acting for and on behalf of Oklahoma State University)
 # All rights reserved.
 #
+import os
+import sys
 import math
+import pickle
+import hashlib
 from openram import debug
 from openram import OPTS
 from .analytical_util import *
@@ -43,6 +47,10 @@ else:
 
 data_path = data_dir + '/' + data_file
 
+# The trained models and the scaling of their data indexed by the model
+# file name so that each model is only trained once
+trained_models = {}
+
 class regression_model(simulation):
 
     def __init__(self, sram, spfile, corner):
@@ -71,13 +79,17 @@ class regression_model(simulation):
         self.create_measurement_names()
         models = self.train_models()
 
+        # Predict all the slews and loads at once
+        model_inputs = np.asarray([model_inputs + [slew, load] for load, slew in load_slews])
+        predictions = self.get_predictions(model_inputs, models)
+
         # Set delay/power for slews and loads
         port_data = self.get_empty_measure_data_dict()
         debug.info(1, 'Slew, Load, Port, Delay(ns), Slew(ns)')
         max_delay = 0.0
-        for load, slew in load_slews:
+        for i, (load, slew) in enumerate(load_slews):
             # List returned with value order being delay, power, leakage, slew
-            sram_vals = self.get_predictions(model_inputs+[slew, load], models)
+            sram_vals = {dname: predictions[dname][i] for dname in self.output_names}
             # Delay is only calculated on a single port and replicated for now.
             for port in self.all_ports:
                 port_data[port]['delay_lh'].append(sram_vals['rise_delay'])
@@ -113,41 +125,96 @@ class regression_model(simulation):
 
     def get_predictions(self, model_inputs, models):
         """
-        Generate a model and prediction for LIB output
+        Predict each LIB output for all the rows of model inputs
         """
 
-        #Scaled the inputs using first data file as a reference
-        scaled_inputs = np.asarray([scale_input_datapoint(model_inputs, data_path)])
+        # Scale the inputs like the training data
+        scaled_inputs = scale_data_array(model_inputs,
+                                         self.data_maxs[:self.num_inputs],
+                                         self.data_mins[:self.num_inputs])
 
         predictions = {}
-        out_pos = 0
-        for dname in self.output_names:
-            m = models[dname]
-
-            scaled_pred = self.model_prediction(m, scaled_inputs)
-            pred = unscale_data(scaled_pred.tolist(), data_path, pos=self.num_inputs+out_pos)
+        for out_pos, dname in enumerate(self.output_names):
+            scaled_pred = np.ravel(self.model_prediction(models[dname], scaled_inputs))
+            pos = self.num_inputs + out_pos
+            pred = unscale_data_array(scaled_pred, self.data_maxs[pos], self.data_mins[pos])
             debug.info(2,"Unscaled Prediction = {}".format(pred))
-            predictions[dname] = pred[0]
-            out_pos+=1
+            predictions[dname] = pred.tolist()
         return predictions
 
+    def get_model_filename(self):
+        """
+        The models are named by their type, the sklearn version and the
+        hash of the training data, the model parameters and the training
+        code so that they are retrained when any of them changes.
+        """
+        import sklearn
+        key = hashlib.sha256()
+        with open(data_path, "rb") as f:
+            key.update(f.read())
+        key.update(repr(sorted(self.get_model().get_params().items())).encode())
+        for source_file in [__file__, sys.modules[type(self).__module__].__file__]:
+            with open(source_file, "rb") as f:
+                key.update(f.read())
+        model_dir = OPTS.model_cache_path
+        if not model_dir:
+            model_dir = os.path.join(OPTS.output_path, "model_cache")
+        return os.path.join(model_dir, "{0}_{1}_{2}_{3}.pickle".format(type(self).__name__,
+                                                                       sklearn.__version__,
+                                                                       self.num_inputs,
+                                                                       key.hexdigest()))
+
     def train_models(self):
         """
-        Generate and return models
+        Generate and return models. The models of a data set are only trained
+        once per run and, with OPTS.use_model_cache, are saved with their
+        data scaling for the later runs.
         """
-        self.output_names = get_data_names(data_path)[self.num_inputs:]
-        data = get_scaled_data(data_path)
+        model_filename = self.get_model_filename()
+        if model_filename not in trained_models and OPTS.use_model_cache:
+            try:
+                with open(model_filename, "rb") as f:
+                    trained_models[model_filename] = pickle.load(f)
+                debug.info(1, "Loaded regression models from {}".format(model_filename))
+            except (OSError, EOFError, AttributeError, pickle.UnpicklingError):
+                pass
+        if model_filename not in trained_models:
+            trained_models[model_filename] = self.fit_models()
+            if OPTS.use_model_cache:
+                self.save_models(model_filename, trained_models[model_filename])
+
+        (self.output_names, self.data_maxs, self.data_mins, models) = trained_models[model_filename]
+        return models
+
+    def fit_models(self):
+        """
+        Train a model for each output with the scaled data.
+        """
+        output_names = get_data_names(data_path)[self.num_inputs:]
+        # Data is changed from lists of features to points
+        data = np.asarray(get_data(data_path)).T
+        data_maxs = data.max(axis=0)
+        data_mins = data.min(axis=0)
+        data = scale_data_array(data, data_maxs, data_mins)
         features, labels = data[:, :self.num_inputs], data[:,self.num_inputs:]
 
-        output_num = 0
         models = {}
-        for o_name in self.output_names:
+        for output_num, o_name in enumerate(output_names):
             output_label = labels[:,output_num]
-            model = self.generate_model(features, output_label)
-            models[o_name] = model
-            output_num+=1
+            models[o_name] = self.generate_model(features, output_label)
 
-        return models
+        return (output_names, data_maxs, data_mins, models)
+
+    def save_models(self, model_filename, trained):
+        """ Save the trained models to reuse them in later runs. """
+        os.makedirs(os.path.dirname(model_filename), exist_ok=True)
+        # Write a new file and rename it so that concurrent runs never
+        # read a partial file
+        temp_filename = "{0}.{1}".format(model_filename, os.getpid())
+        with open(temp_filename, "wb") as f:
+            pickle.dump(trained, f)
+        os.replace(temp_filename, model_filename)
+        debug.info(1, "Saved regression models to {}".format(model_filename))
 
     def score_model(self):
         num_inputs = 9 #FIXME - should be defined somewhere else
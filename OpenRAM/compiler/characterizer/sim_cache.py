@@ -0,0 +1,178 @@
+# See LICENSE for licensing information.
+#
+# Copyright (c) 2016-2024 Regents of the University of California and The Board
+# of Regents for the Oklahoma Agricultural and Mechanical College
+# (acting for and on behalf of Oklahoma State University)
+# All rights reserved.
+#
+"""
+This is a persistent on-disk cache of the parsed simulation outputs. A
+simulation is identified by a hash of its stimulus, the files the stimulus
+includes, the simulator and the corner, so an identical simulation of a
+later run can reuse the measurements instead of invoking the simulator.
+"""
+
+import os
+import re
+import gzip
+import json
+import hashlib
+from openram import debug
+from openram import OPTS
+
+# The hashes of the included files indexed by name, size and modification
+# time so that the device models are only read once
+file_hash_cache = {}
+
+# Lookups of the current process
+sim_cache_hits = 0
+sim_cache_misses = 0
+
+# The temp directories of the parent processes (e.g. of the min period
+# search) whose files the workers include, like the trimmed netlist
+parent_temp_paths = []
+
+include_regex = re.compile(r"^\s*\.(?:include|lib)\s+\"?([^\"\s]+)\"?", re.IGNORECASE | re.MULTILINE)
+
+
+def get_sim_cache_path():
+    """ Return the directory of the simulation cache. """
+    if OPTS.sim_cache_path:
+        path = OPTS.sim_cache_path
+    else:
+        path = os.path.join(OPTS.output_path, "sim_cache")
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def get_temp_paths():
+    """ Return the temp directories of this process and its parents, the longest first. """
+    return sorted(set([OPTS.openram_temp] + parent_temp_paths), key=len, reverse=True)
+
+
+def normalize_temp_paths(contents):
+    """ Remove the temp directories, which differ between runs, from the contents. """
+    for temp_path in get_temp_paths():
+        contents = contents.replace(temp_path, "$OPENRAM_TEMP/")
+    return contents
+
+
+def hash_file(filename):
+    """ Return the hash of an included file. """
+    stat = os.stat(filename)
+    index = (filename, stat.st_size, stat.st_mtime_ns)
+    if index not in file_hash_cache:
+        with open(filename, "r") as f:
+            contents = f.read()
+        if any(filename.startswith(x) for x in get_temp_paths()):
+            contents = normalize_temp_paths(contents)
+        file_hash_cache[index] = hashlib.sha256(contents.encode()).hexdigest()
+    return file_hash_cache[index]
+
+
+def get_simulator_id():
+    """
+    Return the simulator and its executable so that an upgrade of the
+    simulator invalidates the cached measurements.
+    """
+    simulator = [OPTS.spice_name, OPTS.spice_exe]
+    if OPTS.spice_exe and os.path.isfile(OPTS.spice_exe):
+        stat = os.stat(OPTS.spice_exe)
+        simulator += [stat.st_size, stat.st_mtime_ns]
+    return str(simulator)
+
+
+def get_sim_key(stim_file, corner):
+    """
+    Return the key of a simulation from the stimulus file, the contents of
+    the files it includes (e.g. the netlist and measures), the simulator
+    and the corner.
+    """
+    with open(stim_file, "r") as f:
+        contents = f.read()
+    key = hashlib.sha256()
+    key.update(str((get_simulator_id(), corner)).encode())
+    key.update(normalize_temp_paths(contents).encode())
+    for filename in include_regex.findall(contents):
+        if os.path.isfile(filename):
+            key.update(hash_file(filename).encode())
+    return key.hexdigest()
+
+
+def get_sim_entry_filename(key):
+    return os.path.join(get_sim_cache_path(), "{}.json.gz".format(key))
+
+
+def load_sim_entry(key):
+    """
+    Return the cached simulator output of the key or None if the
+    simulation hasn't been run before.
+    """
+    global sim_cache_hits, sim_cache_misses
+
+    entry_filename = get_sim_entry_filename(key)
+    try:
+        with gzip.open(entry_filename, "rt") as f:
+            entry = json.load(f)
+        # Mark the entry as recently used for the eviction
+        os.utime(entry_filename)
+    except (OSError, ValueError):
+        sim_cache_misses += 1
+        debug.info(2, "Simulation cache miss: {}".format(key))
+        return None
+
+    sim_cache_hits += 1
+    debug.info(2, "Simulation cache hit: {}".format(key))
+    return (entry["contents"], [tuple(x) for x in entry["measures"]])
+
+
+def store_sim_entry(key, contents, measures):
+    """ Save the simulator output of the key and evict the old entries. """
+    entry_filename = get_sim_entry_filename(key)
+    # Write a new file and rename it so that concurrent workers never
+    # read a partial entry
+    temp_filename = "{0}.{1}".format(entry_filename, os.getpid())
+    with gzip.open(temp_filename, "wt") as f:
+        json.dump({"contents": contents, "measures": measures}, f)
+    os.replace(temp_filename, entry_filename)
+    evict_sim_entries()
+
+
+def evict_sim_entries():
+    """ Remove the least recently used entries until the cache fits its size limit. """
+    path = get_sim_cache_path()
+    entries = []
+    total_size = 0
+    for name in os.listdir(path):
+        try:
+            stat = os.stat(os.path.join(path, name))
+        except OSError:
+            # Removed by another worker
+            continue
+        entries.append((stat.st_mtime_ns, stat.st_size, name))
+        total_size += stat.st_size
+
+    max_size = OPTS.sim_cache_size * 1024 * 1024
+    for (mtime, size, name) in sorted(entries):
+        if total_size <= max_size:
+            break
+        try:
+            os.remove(os.path.join(path, name))
+        except OSError:
+            pass
+        total_size -= size
+        debug.info(2, "Simulation cache evicted: {}".format(name))
+
+
+def reset_sim_cache_stats():
+    global sim_cache_hits, sim_cache_misses
+    sim_cache_hits = 0
+    sim_cache_misses = 0
+
+
+def report_sim_cache_stats(name):
+    """ Print the cache hits and misses since the last reset. """
+    if OPTS.use_sim_cache:
+        debug.info(1, "Simulation cache for {0}: {1} hits, {2} misses".format(name,
+                                                                           sim_cache_hits,
+                                                                           sim_cache_misses))
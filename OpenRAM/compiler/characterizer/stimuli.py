@@ -17,6 +17,10 @@ import numpy as np
 from openram import debug
 from openram import tech
 from openram import OPTS
+from openram import profiling
+from .charutils import clear_spice_list_cache, get_spice_list_filename, read_spice_list, set_spice_list
+from . import sim_cache
+from . import raw_file
 
 
 class stimuli():
@@ -32,6 +36,9 @@ class stimuli():
 
         self.sf = stim_file
         self.mf = meas_file
+        # The signals of the measurements, which are the only ones saved in
+        # a raw file
+        self.saved_signals = []
 
         (self.process, self.voltage, self.temperature) = corner
         found = False
@@ -226,6 +233,12 @@ class stimuli():
         # measure_string=".meas tran {0} AVG v({1}) FROM={2}n TO={3}n\n\n".format(meas_name.lower(), dout, t_initial, t_final)
         self.mf.write(measure_string)
 
+    def add_saved_signals(self, signals):
+        """ Save the signals of a measurement in the raw file. """
+        for signal in signals:
+            if signal not in self.saved_signals:
+                self.saved_signals.append(signal)
+
     def write_control(self, end_time, runlvl=4):
         """ Write the control cards to run and end the simulation """
 
@@ -297,6 +310,11 @@ class stimuli():
                 self.sf.write("*.probe V(*)\n")
                 self.sf.write("*.plot V(*)\n")
 
+        # Only write the measured signals to the raw file instead of every
+        # node of the hierarchy at every time step
+        if OPTS.use_raw_file and OPTS.spice_name == "ngspice" and self.saved_signals:
+            self.sf.write(".save {}\n".format(" ".join(self.saved_signals)))
+
         # end the stimulus file
         self.sf.write(".end\n\n")
 
@@ -338,12 +356,44 @@ class stimuli():
         else:
             self.sf.write("*V{0} {0} {1} {2}\n".format(self.gnd_name, gnd_node_name, 0.0))
 
-    def run_sim(self, name):
-        """ Run hspice in batch mode and output rawfile to parse. """
+    def run_cached_sim(self, name, output="timing", use_raw_file=False):
+        """
+        Run the simulation unless an identical one is in the simulation
+        cache, in which case its output is used for the measurements.
+        """
+        # The cache only has the measurements of the text output
+        if not OPTS.use_sim_cache or use_raw_file:
+            self.run_sim(name, use_raw_file)
+            return
+
+        temp_stim = "{0}{1}".format(OPTS.openram_temp, name)
+        key = sim_cache.get_sim_key(temp_stim, (self.process, self.voltage, self.temperature))
+        output_filename = get_spice_list_filename(output)
+        entry = sim_cache.load_sim_entry(key)
+        if entry:
+            clear_spice_list_cache()
+            set_spice_list(output_filename, *entry)
+        else:
+            self.run_sim(name)
+            (contents, measures, values) = read_spice_list(output_filename)
+            sim_cache.store_sim_entry(key, contents, measures)
+
+    @profiling.traced("run_sim", "simulation")
+    def run_sim(self, name, use_raw_file=False):
+        """
+        Run hspice in batch mode and output rawfile to parse. With
+        use_raw_file, the measurements are made from the waveforms of the
+        binary raw file (ngspice and Xyce only).
+        """
         temp_stim = "{0}{1}".format(OPTS.openram_temp, name)
         import datetime
         start_time = datetime.datetime.now()
         debug.check(OPTS.spice_exe != "", "No spice simulator has been found.")
+        debug.check(not use_raw_file or OPTS.spice_name in ["ngspice", "Xyce", "xyce"],
+                    "Raw file measurements are not supported for {}.".format(OPTS.spice_name))
+        # The measurements of the previous simulation will be overwritten
+        clear_spice_list_cache()
+        raw_file.clear_raw_file()
 
         if OPTS.spice_name == "xa":
             # Output the xa configurations here. FIXME: Move this to write it once.
@@ -389,17 +439,22 @@ class stimuli():
             valid_retcode=0
         else:
             # ngspice 27+ supports threading with "set num_threads=4" in the stimulus file or a .spiceinit
-            # Measurements can't be made with a raw file set in ngspice
-            # -r {2}timing.raw
+            # Measurements can't be made with a raw file set in ngspice, so
+            # the raw file is only written when they are made from it
             ng_cfg = open("{}.spiceinit".format(OPTS.openram_temp), "w")
             ng_cfg.write("set num_threads={}\n".format(OPTS.num_sim_threads))
             ng_cfg.write("set ngbehavior=hsa\n")
             ng_cfg.write("set ng_nomodcheck\n")
             ng_cfg.close()
 
-            cmd = "{0} -b -o {2}timing.lis {1}".format(OPTS.spice_exe,
-                                                       temp_stim,
-                                                       OPTS.openram_temp)
+            if use_raw_file:
+                raw_option = "-r {0} ".format(raw_file.get_raw_filename())
+            else:
+                raw_option = ""
+            cmd = "{0} -b {3}-o {2}timing.lis {1}".format(OPTS.spice_exe,
+                                                          temp_stim,
+                                                          OPTS.openram_temp,
+                                                          raw_option)
             # for some reason, ngspice-25 returns 1 when it only has acceptable warnings
             valid_retcode=1
 
@@ -423,3 +478,5 @@ class stimuli():
             end_time = datetime.datetime.now()
             delta_time = round((end_time - start_time).total_seconds(), 1)
             debug.info(2, "*** Spice: {} seconds".format(delta_time))
+            if use_raw_file:
+                raw_file.set_raw_file(raw_file.get_raw_filename())
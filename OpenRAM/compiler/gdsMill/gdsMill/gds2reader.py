@@ -1,4 +1,6 @@
 #!/usr/bin/env python
+import gzip
+import mmap
 import struct
 from .gdsPrimitives import *
 
@@ -10,6 +12,12 @@ class Gds2reader:
 
     def __init__(self,layoutObject,debugToTerminal = 0):
         self.fileHandle = None
+        #memory map of the file and the position of the next record in it
+        self.fileBuffer = None
+        self.bufferOffset = 0
+        #the file and the offsets of its structures for loading them on demand
+        self.fileName = None
+        self.structureOffsets = {}
         self.layoutObject = layoutObject
         self.debugToTerminal=debugToTerminal
 
@@ -73,6 +81,8 @@ class Gds2reader:
 
     def readNextRecord(self):
         global offset
+        if self.fileBuffer is not None:
+            return self.readNextBufferRecord()
         recordLengthAscii = self.fileHandle.read(2) #first 2 bytes tell us the length of the record
         if len(recordLengthAscii)==0:
             return
@@ -84,6 +94,28 @@ class Gds2reader:
         record = self.fileHandle.read(recordLength[0]-2) #read the rest of it (first 2 bytes were already read)
         return record
 
+    def readNextBufferRecord(self):
+        #same as readNextRecord but slices the record out of the memory mapped file
+        global offset
+        if self.bufferOffset+2 > len(self.fileBuffer):
+            return b''
+        recordLength = struct.unpack_from(">H",self.fileBuffer,self.bufferOffset)[0]
+        offset += recordLength
+        if(self.debugToTerminal==1):
+            print("Offset: " + str(offset))  #print out the record numbers for de-bugging
+        record = self.fileBuffer[self.bufferOffset+2:self.bufferOffset+recordLength]
+        self.bufferOffset += recordLength
+        return record
+
+    def readCoordinates(self,record):
+        #decode all the XY points of a record at once, packed as XY coordinates 4 bytes each
+        values = struct.unpack(">{}i".format((len(record)-2)//4),record[2:])
+        coordinates = list(zip(values[0::2],values[1::2]))
+        if(self.debugToTerminal==1):
+            for (x,y) in coordinates:
+                print("\t\t\tXY Point: "+str(x)+","+str(y))
+        return coordinates
+
     def readHeader(self):
         self.layoutObject.info.clear()
         ##  Header
@@ -205,14 +237,7 @@ class Gds2reader:
                 if(self.debugToTerminal==1):
                     print("\t\tPurpose Layer: "+str(purposeLayer))
             elif(idBits==b'\x10\x03'):  #XY Data Points
-                numDataPoints = len(record)-2  #packed as XY coordinates 4 bytes each
-                thisBoundary.coordinates=[]
-                for index in range(2,numDataPoints+2,8):  #incorporate the 2 byte offset
-                    x=struct.unpack(">i",record[index:index+4])[0]
-                    y=struct.unpack(">i",record[index+4:index+8])[0]
-                    thisBoundary.coordinates+=[(x,y)]
-                    if(self.debugToTerminal==1):
-                        print("\t\t\tXY Point: "+str(x)+","+str(y))
+                thisBoundary.coordinates=self.readCoordinates(record)
             elif(idBits==b'\x11\x00'):  #End Of Element
                 if(self.debugToTerminal==1):
                     print("\t\tEndBoundary")
@@ -265,14 +290,7 @@ class Gds2reader:
                 if(self.debugToTerminal==1):
                     print("\t\t\tPath Width: "+str(pathWidth))
             elif(idBits==b'\x10\x03'):  #XY Data Points
-                numDataPoints = len(record)-2  #packed nas XY coordinates 4 bytes each
-                thisPath.coordinates=[]
-                for index in range(2,numDataPoints+2,8):  #incorporate the 2 byte offset
-                    x=struct.unpack(">i",record[index:index+4])[0]
-                    y=struct.unpack(">i",record[index+4:index+8])[0]
-                    thisPath.coordinates+=[(x,y)]
-                    if(self.debugToTerminal==1):
-                        print("\t\t\tXY Point: "+str(x)+","+str(y))
+                thisPath.coordinates=self.readCoordinates(record)
             elif(idBits==b'\x11\x00'):  #End Of Element
                 if(self.debugToTerminal==1):
                     print("\t\tEndPath")
@@ -354,8 +372,8 @@ class Gds2reader:
                 if(self.debugToTerminal==1):
                     print("\t\tPLEX: "+str(plex))
             elif(idBits==b'\x12\x06'):  #Reference Name
-                aName = record[2::]
-                thisAref.aName=aName
+                aName = self.stripNonASCII(record[2::])
+                thisAref.aName=aName.rstrip()
                 if(self.debugToTerminal==1):
                     print("\t\tReference Name:"+aName)
             elif(idBits==b'\x1A\x01'):  #Transformation
@@ -378,17 +396,19 @@ class Gds2reader:
                 thisAref.rotateAngle=rotateAngle
                 if(self.debugToTerminal==1):
                     print("\t\t\tRotate Angle (CCW):"+str(rotateAngle))
+            elif(idBits==b'\x13\x02'):  #Columns and Rows
+                colRow = struct.unpack(">hh",record[2:6])
+                thisAref.colRow=colRow
+                if(self.debugToTerminal==1):
+                    print("\t\t\tColumns: "+str(colRow[0])+" Rows: "+str(colRow[1]))
             elif(idBits==b'\x10\x03'):  #XY Data Points
-                index=2
-                topLeftX=struct.unpack(">i",record[index:index+4])[0]
-                topLeftY=struct.unpack(">i",record[index+4:index+8])[0]
-                rightMostX=struct.unpack(">i",record[index+8:index+12])[0]
-                bottomMostY=struct.unpack(">i",record[index+12:index+16])[0]
-                thisAref.coordinates=[(topLeftX,topLeftY),(rightMostX,topLeftY),(topLeftX,bottomMostY)]
-                if(self.debugToTerminal==1):
-                    print("\t\t\tTop Left Point: "+str(topLeftX)+","+str(topLeftY))
-                    print("\t\t\t\tArray Width: "+str(rightMostX-topLeftX))
-                    print("\t\t\t\tArray Height: "+str(topLeftY-bottomMostY))
+                #the reference point, the point past the last column and the point past the last row
+                values=struct.unpack(">6i",record[2:26])
+                thisAref.coordinates=[(values[0],values[1]),(values[2],values[3]),(values[4],values[5])]
+                if(self.debugToTerminal==1):
+                    print("\t\t\tReference Point: "+str(values[0])+","+str(values[1]))
+                    print("\t\t\t\tColumn Point: "+str(values[2])+","+str(values[3]))
+                    print("\t\t\t\tRow Point: "+str(values[4])+","+str(values[5]))
             elif(idBits==b'\x11\x00'):  #End Of Element
                 if(self.debugToTerminal==1):
                     print("\t\t\tEndAref")
@@ -531,14 +551,7 @@ class Gds2reader:
                 if(self.debugToTerminal==1):
                     print("\t\tNode Type: "+str(nodeType))
             elif(idBits==b'\x10\x03'):  #XY Data Points
-                numDataPoints = len(record)-2  #packed as XY coordinates 4 bytes each
-                thisNode.coordinates=[]
-                for index in range(2,numDataPoints+2,8):  #incorporate the 2 byte offset
-                    x=struct.unpack(">i",record[index:index+4])[0]
-                    y=struct.unpack(">i",record[index+4:index+8])[0]
-                    thisNode.coordinates+=[(x,y)]
-                    if(self.debugToTerminal==1):
-                        print("\t\t\tXY Point: "+str(x)+","+str(y))
+                thisNode.coordinates=self.readCoordinates(record)
             elif(idBits==b'\x11\x00'):  #End Of Element
                 if(self.debugToTerminal==1):
                     print("\t\t\tEndNode")
@@ -582,14 +595,7 @@ class Gds2reader:
                 if(self.debugToTerminal==1):
                     print("\t\tBox Value: "+str(boxValue))
             elif(idBits==b'\x10\x03'):  #XY Data Points that form a closed box
-                numDataPoints = len(record)-2  #packed as XY coordinates 4 bytes each
-                thisBox.coordinates=[]
-                for index in range(2,numDataPoints+2,8):  #incorporate the 2 byte offset
-                    x=struct.unpack(">i",record[index:index+4])[0]
-                    y=struct.unpack(">i",record[index+4:index+8])[0]
-                    thisBox.coordinates+=[(x,y)]
-                    if(self.debugToTerminal==1):
-                        print("\t\t\tXY Point: "+str(x)+","+str(y))
+                thisBox.coordinates=self.readCoordinates(record)
             elif(idBits==b'\x11\x00'):  #End Of Element
                 if(self.debugToTerminal==1):
                     print("\t\t\tEndBox")
@@ -669,10 +675,85 @@ class Gds2reader:
         else:
             print("There was an error parsing the GDS header.  Aborting...")
 
-    def loadFromFile(self, fileName, special_purposes={}):
+    def loadFromFile(self, fileName, special_purposes={}, structureNames=None):
+        #if structure names are given, only they and the structures they reference are read
+        if structureNames is not None:
+            self.indexFile(fileName)
+            self.loadStructures(structureNames, special_purposes)
+            return
+        self.openBuffer(fileName)
+        try:
+            self.readGds2()
+        finally:
+            self.closeBuffer()
+        self.layoutObject.initialize(special_purposes)
+
+    def openBuffer(self, fileName):
+        self.bufferOffset = 0
+        if fileName.endswith(".gz"):
+            #compressed files are decompressed into memory instead of mapped
+            self.fileHandle = gzip.open(fileName,"rb")
+            self.fileBuffer = self.fileHandle.read()
+            return
         self.fileHandle = open(fileName,"rb")
-        self.readGds2()
+        try:
+            self.fileBuffer = mmap.mmap(self.fileHandle.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            #empty files can't be mapped so read them as a stream
+            self.fileBuffer = None
+
+    def closeBuffer(self):
+        if isinstance(self.fileBuffer, mmap.mmap):
+            self.fileBuffer.close()
+        self.fileBuffer = None
         self.fileHandle.close()
+
+    def indexFile(self, fileName):
+        #find the offset of each structure without reading their elements
+        self.fileName = fileName
+        self.structureOffsets = {}
+        self.openBuffer(fileName)
+        try:
+            if not self.readHeader():
+                print("There was an error parsing the GDS header.  Aborting...")
+                return self.structureOffsets
+            while self.bufferOffset+4 <= len(self.fileBuffer):
+                recordOffset = self.bufferOffset
+                (recordLength, idBits) = struct.unpack_from(">H2s",self.fileBuffer,recordOffset)
+                if recordLength < 4:
+                    print("There was an error reading the structure list.")
+                    break
+                self.bufferOffset += recordLength
+                if idBits==b'\x05\x02':  #Begin structure
+                    structureOffset = recordOffset
+                elif idBits==b'\x06\x06':  #Structure name
+                    structName = self.stripNonASCII(self.fileBuffer[recordOffset+4:recordOffset+recordLength])
+                    self.structureOffsets[structName] = structureOffset
+                elif idBits==b'\x04\x00':  #End of library
+                    break
+        finally:
+            self.closeBuffer()
+        return self.structureOffsets
+
+    def loadStructures(self, structureNames, special_purposes={}):
+        #read the given structures of the indexed file and the structures they reference
+        self.openBuffer(self.fileName)
+        try:
+            toRead = list(structureNames)
+            while toRead:
+                structName = toRead.pop()
+                if structName in self.layoutObject.structures:
+                    continue
+                if structName not in self.structureOffsets:
+                    print("Structure "+structName+" not found in "+self.fileName)
+                    continue
+                self.bufferOffset = self.structureOffsets[structName]
+                self.readNextStructure()
+                thisStructure = self.layoutObject.structures[structName]
+                toRead += [sref.sName for sref in thisStructure.srefs]
+                toRead += [aref.aName for aref in thisStructure.arefs]
+        finally:
+            self.closeBuffer()
         self.layoutObject.initialize(special_purposes)
 
 ##############################################
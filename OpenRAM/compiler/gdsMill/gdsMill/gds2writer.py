@@ -1,4 +1,5 @@
 #!/usr/bin/env python
+import gzip
 import struct
 from .gdsPrimitives import *
 
@@ -8,6 +9,10 @@ class Gds2writer:
 
     def __init__(self,layoutObject):
         self.fileHandle = 0
+        #the records are collected here and written to the file at once
+        self.buffer = bytearray()
+        #the converted doubles (magnifications and angles are mostly the same few values)
+        self.ibmDoubles = {}
         self.layoutObject = layoutObject
         self.debugToTerminal=0  #do we dump debug data to the screen
 
@@ -51,6 +56,11 @@ class Gds2writer:
         return newFloat
 
     def ibmDataFromIeeeDouble(self,ieeeDouble):
+        if ieeeDouble not in self.ibmDoubles:
+            self.ibmDoubles[ieeeDouble] = self.convertIeeeDouble(ieeeDouble)
+        return self.ibmDoubles[ieeeDouble]
+
+    def convertIeeeDouble(self,ieeeDouble):
         asciiDouble = struct.pack('>d',ieeeDouble)
         data = struct.unpack('>q',asciiDouble)[0]
         sign = (data >> 63) & 0x01
@@ -93,8 +103,12 @@ class Gds2writer:
 
     def writeRecord(self,record):
         recordLength = len(record)+2  #make sure to include this in the length
-        recordLengthAscii=struct.pack(">h",recordLength)
-        self.fileHandle.write(recordLengthAscii+record)
+        self.buffer += struct.pack(">h",recordLength)+record
+
+    def packCoordinates(self,coordinates):
+        #encode all the XY points of a record at once, 4 bytes per coordinate
+        values = [int(value) for coordinate in coordinates for value in coordinate[0:2]]
+        return struct.pack(">{}i".format(len(values)),*values)
 
     def writeHeader(self):
         ##  Header
@@ -184,38 +198,28 @@ class Gds2writer:
         return 1
 
     def writeBoundary(self,thisBoundary):
-        idBits=b'\x08\x00'  #record Type
-        self.writeRecord(idBits)
+        #boundaries are the most common element so all of its records are packed at once
+        recordFormat = ">4s"
+        values = [b'\x00\x04\x08\x00']  #record Type
         if(thisBoundary.elementFlags!=""):
-            idBits=b'\x26\x01' # ELFLAGS
-            elementFlags = struct.pack(">h",thisBoundary.elementFlags)
-            self.writeRecord(idBits+elementFlags)
+            recordFormat += "h2sh"  # ELFLAGS
+            values += [6,b'\x26\x01',thisBoundary.elementFlags]
         if(thisBoundary.plex!=""):
-            idBits=b'\x2F\x03'  # PLEX
-            plex = struct.pack(">i",thisBoundary.plex)
-            self.writeRecord(idBits+plex)
+            recordFormat += "h2si"  # PLEX
+            values += [8,b'\x2F\x03',thisBoundary.plex]
         if(thisBoundary.drawingLayer!=""):
-            idBits=b'\x0D\x02' # drawing layer
-            drawingLayer = struct.pack(">h",thisBoundary.drawingLayer)
-            self.writeRecord(idBits+drawingLayer)
+            recordFormat += "h2sh"  # drawing layer
+            values += [6,b'\x0D\x02',thisBoundary.drawingLayer]
         if(thisBoundary.purposeLayer!=""):
-            idBits=b'\x0E\x02' # DataType
-            if type(thisBoundary.purposeLayer)!=int:
-                import pdb; pdb.set_trace()
-            dataType = struct.pack(">h",thisBoundary.purposeLayer)
-            self.writeRecord(idBits+dataType)
+            recordFormat += "h2sh"  # DataType
+            values += [6,b'\x0E\x02',thisBoundary.purposeLayer]
         if(thisBoundary.coordinates!=""):
-            idBits=b'\x10\x03' # XY Data Points
-            coordinateRecord = idBits
-            for coordinate in thisBoundary.coordinates:
-                x=struct.pack(">i",int(coordinate[0]))
-                y=struct.pack(">i",int(coordinate[1]))
-                coordinateRecord+=x
-                coordinateRecord+=y
-            self.writeRecord(coordinateRecord)
-        idBits=b'\x11\x00' #End Of Element
-        coordinateRecord = idBits
-        self.writeRecord(coordinateRecord)
+            coordinates = [int(value) for coordinate in thisBoundary.coordinates for value in coordinate[0:2]]
+            recordFormat += "h2s{}i".format(len(coordinates))  # XY Data Points
+            values += [4+4*len(coordinates),b'\x10\x03'] + coordinates
+        recordFormat += "4s"
+        values.append(b'\x00\x04\x11\x00')  #End Of Element
+        self.buffer += struct.pack(recordFormat,*values)
 
     def writePath(self,thisPath):  #writes out a path structure
         idBits=b'\x09\x00'  #record Type
@@ -250,37 +254,30 @@ class Gds2writer:
             self.writeRecord(idBits+pathWidth)
         if(thisPath.coordinates):
             idBits=b'\x10\x03' #XY Data Points
-            coordinateRecord = idBits
-            for coordinate in thisPath.coordinates:
-                x=struct.pack(">i",int(coordinate[0]))
-                y=struct.pack(">i",int(coordinate[1]))
-                coordinateRecord+=x
-                coordinateRecord+=y
-            self.writeRecord(coordinateRecord)
+            self.writeRecord(idBits+self.packCoordinates(thisPath.coordinates))
         idBits=b'\x11\x00' #End Of Element
         coordinateRecord = idBits
         self.writeRecord(coordinateRecord)
 
     def writeSref(self,thisSref):  #reads in a reference to another structure
-        idBits=b'\x0A\x00'  #record Type
-        self.writeRecord(idBits)
+        #all the records of the reference are packed at once
+        recordFormat = ">4s"
+        values = [b'\x00\x04\x0A\x00']  #record Type
         if(thisSref.elementFlags != ""):
-            idBits=b'\x26\x01' #ELFLAGS
-            elementFlags = struct.pack(">h",thisSref.elementFlags)
-            self.writeRecord(idBits+elementFlags)
+            recordFormat += "h2sh"  #ELFLAGS
+            values += [6,b'\x26\x01',thisSref.elementFlags]
         if(thisSref.plex!=""):
-            idBits=b'\x2F\x03'  #PLEX
-            plex = struct.pack(">i",thisSref.plex)
-            self.writeRecord(idBits+plex)
+            recordFormat += "h2si"  #PLEX
+            values += [8,b'\x2F\x03',thisSref.plex]
         if(thisSref.sName!=""):
-            idBits=b'\x12\x06'
             if (len(thisSref.sName) % 2 != 0):
                 sName = thisSref.sName+"\0"
             else:
                 sName = thisSref.sName
-            self.writeRecord(idBits+sName.encode())
+            sName = sName.encode()
+            recordFormat += "h2s{}s".format(len(sName))
+            values += [4+len(sName),b'\x12\x06',sName]
         if(thisSref.transFlags!=""):
-            idBits=b'\x1A\x01'
             mirrorFlag = int(thisSref.transFlags[0])<<15
             # The rotate and magnify flags specify "absolute" rotate and magnify.
             # It is unclear what that is (ignore all further rotates/mags in the
@@ -289,80 +286,64 @@ class Gds2writer:
             magnifyFlag = 0
             #rotateFlag = int(thisSref.transFlags[2])<<1
             #magnifyFlag = int(thisSref.transFlags[1])<<2
-            transFlags = struct.pack(">H",mirrorFlag|rotateFlag|magnifyFlag)
-            self.writeRecord(idBits+transFlags)
+            recordFormat += "h2sH"
+            values += [6,b'\x1A\x01',mirrorFlag|rotateFlag|magnifyFlag]
         if(thisSref.magFactor!=""):
-            idBits=b'\x1B\x05'
-            magFactor=self.ibmDataFromIeeeDouble(thisSref.magFactor)
-            self.writeRecord(idBits+magFactor)
+            recordFormat += "h2s8s"
+            values += [12,b'\x1B\x05',self.ibmDataFromIeeeDouble(thisSref.magFactor)]
         if(thisSref.rotateAngle!=""):
-            idBits=b'\x1C\x05'
-            rotateAngle=self.ibmDataFromIeeeDouble(thisSref.rotateAngle)
-            self.writeRecord(idBits+rotateAngle)
+            recordFormat += "h2s8s"
+            values += [12,b'\x1C\x05',self.ibmDataFromIeeeDouble(thisSref.rotateAngle)]
         if(thisSref.coordinates!=""):
-            idBits=b'\x10\x03' #XY Data Points
-            coordinateRecord = idBits
-            coordinate = thisSref.coordinates
-            x=struct.pack(">i",int(coordinate[0]))
-            y=struct.pack(">i",int(coordinate[1]))
-            coordinateRecord+=x
-            coordinateRecord+=y
-	    #print(thisSref.coordinates)
-            self.writeRecord(coordinateRecord)
-        idBits=b'\x11\x00' #End Of Element
-        coordinateRecord = idBits
-        self.writeRecord(coordinateRecord)
+            recordFormat += "h2sii"  #XY Data Points
+            values += [12,b'\x10\x03',int(thisSref.coordinates[0]),int(thisSref.coordinates[1])]
+        recordFormat += "4s"
+        values.append(b'\x00\x04\x11\x00')  #End Of Element
+        self.buffer += struct.pack(recordFormat,*values)
 
     def writeAref(self,thisAref):  #an array of references
-        idBits=b'\x0B\x00'  #record Type
-        self.writeRecord(idBits)
+        #all the records of the reference are packed at once
+        recordFormat = ">4s"
+        values = [b'\x00\x04\x0B\x00']  #record Type
         if(thisAref.elementFlags!=""):
-            idBits=b'\x26\x01' #ELFLAGS
-            elementFlags = struct.pack(">h",thisAref.elementFlags)
-            self.writeRecord(idBits+elementFlags)
-        if(thisAref.plex):
-            idBits=b'\x2F\x03'  #PLEX
-            plex = struct.pack(">i",thisAref.plex)
-            self.writeRecord(idBits+plex)
-        if(thisAref.aName):
-            idBits=b'\x12\x06'
+            recordFormat += "h2sh"  #ELFLAGS
+            values += [6,b'\x26\x01',thisAref.elementFlags]
+        if(thisAref.plex!=""):
+            recordFormat += "h2si"  #PLEX
+            values += [8,b'\x2F\x03',thisAref.plex]
+        if(thisAref.aName!=""):
             if (len(thisAref.aName) % 2 != 0):
                 aName = thisAref.aName+"\0"
             else:
                 aName = thisAref.aName
-            self.writeRecord(idBits+aName)
-        if(thisAref.transFlags):
-            idBits=b'\x1A\x01'
+            aName = aName.encode()
+            recordFormat += "h2s{}s".format(len(aName))
+            values += [4+len(aName),b'\x12\x06',aName]
+        if(thisAref.transFlags!=""):
             mirrorFlag = int(thisAref.transFlags[0])<<15
             # The rotate and magnify flags specify "absolute" rotate and magnify.
             # It is unclear what that is (ignore all further rotates/mags in the
             # hierarchy? But anyway, calibre doesn't support it.
             rotateFlag=0
             magnifyFlag = 0
-            #rotateFlag = int(thisAref.transFlags[2])<<1
-            #magnifyFlag = int(thisAref.transFlags[1])<<2
-            transFlags = struct.pack(">H",mirrorFlag|rotateFlag|magnifyFlag)
-            self.writeRecord(idBits+transFlags)
+            recordFormat += "h2sH"
+            values += [6,b'\x1A\x01',mirrorFlag|rotateFlag|magnifyFlag]
         if(thisAref.magFactor!=""):
-            idBits=b'\x1B\x05'
-            magFactor=self.ibmDataFromIeeeDouble(thisAref.magFactor)
-            self.writeRecord(idBits+magFactor)
+            recordFormat += "h2s8s"
+            values += [12,b'\x1B\x05',self.ibmDataFromIeeeDouble(thisAref.magFactor)]
         if(thisAref.rotateAngle!=""):
-            idBits=b'\x1C\x05'
-            rotateAngle=self.ibmDataFromIeeeDouble(thisAref.rotateAngle)
-            self.writeRecord(idBits+rotateAngle)
-        if(thisAref.coordinates):
-            idBits=b'\x10\x03' #XY Data Points
-            coordinateRecord = idBits
-            for coordinate in thisAref.coordinates:
-                x=struct.pack(">i",coordinate[0])
-                y=struct.pack(">i",coordinate[1])
-                coordinateRecord+=x
-                coordinateRecord+=y
-            self.writeRecord(coordinateRecord)
-        idBits=b'\x11\x00' #End Of Element
-        coordinateRecord = idBits
-        self.writeRecord(coordinateRecord)
+            recordFormat += "h2s8s"
+            values += [12,b'\x1C\x05',self.ibmDataFromIeeeDouble(thisAref.rotateAngle)]
+        if(thisAref.colRow!=""):
+            recordFormat += "h2shh"  #Columns and Rows
+            values += [8,b'\x13\x02',thisAref.colRow[0],thisAref.colRow[1]]
+        if(thisAref.coordinates!=""):
+            #the reference point, the point past the last column and the point past the last row
+            recordFormat += "h2s6i"  #XY Data Points
+            values += [28,b'\x10\x03']+[int(value) for coordinate in thisAref.coordinates for value in coordinate[0:2]]
+        recordFormat += "4s"
+        values.append(b'\x00\x04\x11\x00')  #End Of Element
+        self.buffer += struct.pack(recordFormat,*values)
 
     def writeText(self,thisText):
         idBits=b'\x0C\x00'  #record Type
@@ -419,13 +400,7 @@ class Gds2writer:
             self.writeRecord(idBits+transFlags)
         if(thisText.coordinates!=""):
             idBits=b'\x10\x03' #XY Data Points
-            coordinateRecord = idBits
-            for coordinate in thisText.coordinates:
-                x=struct.pack(">i",int(coordinate[0]))
-                y=struct.pack(">i",int(coordinate[1]))
-                coordinateRecord+=x
-                coordinateRecord+=y
-            self.writeRecord(coordinateRecord)
+            self.writeRecord(idBits+self.packCoordinates(thisText.coordinates))
         if(thisText.textString):
             idBits=b'\x19\x06'
             textString = thisText.textString
@@ -454,15 +429,9 @@ class Gds2writer:
             idBits=b'\x2A\x02'
             nodeType = struct.pack(">h",thisNode.nodeType)
             self.writeRecord(idBits+nodeType)
-        if(thisText.coordinates!=""):
+        if(thisNode.coordinates!=""):
             idBits=b'\x10\x03' #XY Data Points
-            coordinateRecord = idBits
-            for coordinate in thisText.coordinates:
-                x=struct.pack(">i",int(coordinate[0]))
-                y=struct.pack(">i",int(coordinate[1]))
-                coordinateRecord+=x
-                coordinateRecord+=y
-            self.writeRecord(coordinateRecord)
+            self.writeRecord(idBits+self.packCoordinates(thisNode.coordinates))
 
         idBits=b'\x11\x00' #End Of Element
         coordinateRecord = idBits
@@ -493,13 +462,7 @@ class Gds2writer:
             self.writeRecord(idBits+boxValue)
         if(thisBox.coordinates!=""):
             idBits=b'\x10\x03' #XY Data Points
-            coordinateRecord = idBits
-            for coordinate in thisBox.coordinates:
-                x=struct.pack(">i",int(coordinate[0]))
-                y=struct.pack(">i",int(coordinate[1]))
-                coordinateRecord+=x
-                coordinateRecord+=y
-            self.writeRecord(coordinateRecord)
+            self.writeRecord(idBits+self.packCoordinates(thisBox.coordinates))
 
         idBits=b'\x11\x00' #End Of Element
         coordinateRecord = idBits
@@ -560,6 +523,13 @@ class Gds2writer:
         self.writeRecord(idBits)
 
     def writeToFile(self,fileName):
-        self.fileHandle = open(fileName,"wb")
+        self.buffer = bytearray()
         self.writeGds2()
+        #files ending in .gz are compressed
+        if fileName.endswith(".gz"):
+            self.fileHandle = gzip.open(fileName,"wb",compresslevel=6)
+        else:
+            self.fileHandle = open(fileName,"wb")
+        self.fileHandle.write(self.buffer)
         self.fileHandle.close()
+        self.buffer = bytearray()
@@ -58,6 +58,12 @@ class VlsiLayout:
         # with it.  Populate via traverseTheHierarchy method.
         self.xyTree = []
 
+        # The placements of each structure in the xyTree, stacked into arrays
+        # so that a shape can be transformed to all of its placements at once
+        self.placements = None
+        # The shapes of each structure and LPP in the structure's own coordinates
+        self.shapeTables = {}
+
         # temp variables used in delegate functions
         self.tempCoordinates=None
         self.tempPassFail = True
@@ -115,6 +121,14 @@ class VlsiLayout:
                     new_sref_name = self.padText(prefix + base_sref_name)
                 sref.sName = new_sref_name
                 #print("SREF: {0} -> {1}".format(base_sref_name, new_sref_name))
+            for aref in new_structures[new_name].arefs:
+                if aref.aName[-1] == "\x00":
+                    base_aref_name = aref.aName[0:-1]
+                else:
+                    base_aref_name = aref.aName
+                # Don't do library cells
+                if not (prefix_name and base_aref_name.startswith(prefix_name)):
+                    aref.aName = self.padText(prefix + base_aref_name)
         self.structures = new_structures
 
     def rename(self,newName):
@@ -183,8 +197,13 @@ class VlsiLayout:
         for name in self.structures:
             if(len(self.structures[name].srefs)>0): #does this structure reference any others?
                 for sref in self.structures[name].srefs: #go through each reference
-                    if sref.sName in structureNames: #and compare to our list
-                        structureNames.remove(sref.sName)
+                    sName = self.padText(sref.sName) #names are padded like in a GDS file
+                    if sName in structureNames: #and compare to our list
+                        structureNames.remove(sName)
+            for aref in self.structures[name].arefs:
+                aName = self.padText(aref.aName)
+                if aName in structureNames:
+                    structureNames.remove(aName)
 
         debug.check(len(structureNames)==1,"Multiple possible root structures in the layout: {}".format(str(structureNames)))
         self.rootStructureName = structureNames[0]
@@ -233,16 +252,30 @@ class VlsiLayout:
                 # if not, return back to the caller (caller can be this function)
                 for sref in self.structures[startingStructureName].srefs:
                     # here, we are going to modify the sref coordinates based on the parent objects rotation
-                    self.traverseTheHierarchy(startingStructureName = sref.sName,
+                    self.traverseTheHierarchy(startingStructureName = self.padText(sref.sName),
                                               delegateFunction = delegateFunction,
                                               transformPath = transformPath,
                                               rotateAngle = sref.rotateAngle,
                                               transFlags = sref.transFlags,
                                               coordinates = sref.coordinates)
+            # each element of an array is placed like a reference at its lattice point
+            for aref in self.structures[startingStructureName].arefs:
+                (columns, rows) = aref.colRow
+                ((originX, originY), (columnX, columnY), (rowX, rowY)) = aref.coordinates
+                columnStep = ((columnX - originX) / columns, (columnY - originY) / columns)
+                rowStep = ((rowX - originX) / rows, (rowY - originY) / rows)
+                for column in range(columns):
+                    for row in range(rows):
+                        self.traverseTheHierarchy(startingStructureName = self.padText(aref.aName),
+                                                  delegateFunction = delegateFunction,
+                                                  transformPath = transformPath,
+                                                  rotateAngle = aref.rotateAngle,
+                                                  transFlags = aref.transFlags,
+                                                  coordinates = (originX + column * columnStep[0] + row * rowStep[0],
+                                                                 originY + column * columnStep[1] + row * rowStep[1]))
         except KeyError:
             debug.error("Could not find structure {} in GDS file.".format(startingStructureName),-1)
 
-            # MUST HANDLE AREFs HERE AS WELL
         # when we return, drop the last transform from the transformPath
         del transformPath[-1]
         return
@@ -259,7 +292,31 @@ class VlsiLayout:
             else:
                 self.processLabelPins((layerNumber, None))
 
+    def initializeFromLayout(self, layout, special_purposes={}):
+        """
+        Share the structures of another in-memory layout and initialize
+        this layout for reading. This is equivalent to writing the other
+        layout to a GDS file and loading it back with Gds2reader but it
+        avoids the file I/O and the binary encoding.
+        """
+        self.structures = dict(layout.structures)
+        # The reader finds the layers while it reads the elements so find
+        # them in the same order that the writer would write them
+        self.layerNumbersInUse = []
+        for structure in self.structures.values():
+            for elements in [structure.boundaries, structure.paths,
+                             structure.texts, structure.nodes,
+                             structure.boxes]:
+                for element in elements:
+                    if element.drawingLayer not in self.layerNumbersInUse:
+                        self.layerNumbersInUse.append(element.drawingLayer)
+        self.initialize(special_purposes)
+
     def populateCoordinateMap(self):
+        # the transformed shapes depend on the placements and the structure contents
+        self.placements = None
+        self.shapeTables = {}
+
         def addToXyTree(startingStructureName = None,transformPath = None):
             uVector = np.array([[1.0],[0.0],[0.0]]) #start with normal basis vectors
             vVector = np.array([[0.0],[1.0],[0.0]])
@@ -330,8 +387,53 @@ class VlsiLayout:
             debug.info(0,"DEBUG:  GdsMill vlsiLayout: addInstance: type {0}, nameOfLayout {1}".format(type(layoutToAdd),nameOfLayout))
             debug.info(0,"DEBUG: name={0} offset={1} mirror={2} rotate={3}".format(layoutToAdd.rootStructureName,offsetInMicrons, mirror, rotate))
 
+        StructureName = self.addStructures(layoutToAdd,nameOfLayout)
 
+        #add a reference to the new layout structure in this layout's root
+        layoutToAddSref = GdsSref()
+        layoutToAddSref.sName = StructureName
+        layoutToAddSref.coordinates = offsetInLayoutUnits
+        self.setTransformation(layoutToAddSref,mirror,rotate)
 
+        #add the sref to the root structure
+        self.structures[self.rootStructureName].srefs.append(layoutToAddSref)
+
+    def addInstanceArray(self,layoutToAdd,nameOfLayout=0,offsetInMicrons=(0,0),mirror=None,rotate=None,
+                         columns=1,rows=1,columnPitch=(0,0),rowPitch=(0,0)):
+        """
+        Method to insert a regular array of one layout (e.g. a bitcell array)
+        as a single array reference. The element in column c and row r is
+        placed at offset + c*columnPitch + r*rowPitch with the same mirror
+        and rotation as the others.
+        """
+        offsetInLayoutUnits = (self.userUnits(offsetInMicrons[0]),self.userUnits(offsetInMicrons[1]))
+        columnPitchInLayoutUnits = (self.userUnits(columnPitch[0]),self.userUnits(columnPitch[1]))
+        rowPitchInLayoutUnits = (self.userUnits(rowPitch[0]),self.userUnits(rowPitch[1]))
+        if self.debug:
+            debug.info(0,"DEBUG:  GdsMill vlsiLayout: addInstanceArray: type {0}, nameOfLayout {1}".format(type(layoutToAdd),nameOfLayout))
+            debug.info(0,"DEBUG: name={0} offset={1} mirror={2} rotate={3} columns={4} rows={5}".format(layoutToAdd.rootStructureName,offsetInMicrons, mirror, rotate, columns, rows))
+
+        StructureName = self.addStructures(layoutToAdd,nameOfLayout)
+
+        #the array is given by its reference point and the points one pitch past the last column and row
+        layoutToAddAref = GdsAref()
+        layoutToAddAref.aName = StructureName
+        layoutToAddAref.colRow = (columns,rows)
+        layoutToAddAref.coordinates = [offsetInLayoutUnits,
+                                       (offsetInLayoutUnits[0]+columns*columnPitchInLayoutUnits[0],
+                                        offsetInLayoutUnits[1]+columns*columnPitchInLayoutUnits[1]),
+                                       (offsetInLayoutUnits[0]+rows*rowPitchInLayoutUnits[0],
+                                        offsetInLayoutUnits[1]+rows*rowPitchInLayoutUnits[1])]
+        self.setTransformation(layoutToAddAref,mirror,rotate)
+
+        #add the aref to the root structure
+        self.structures[self.rootStructureName].arefs.append(layoutToAddAref)
+
+    def addStructures(self,layoutToAdd,nameOfLayout=0):
+        """
+        Method to add the structures of a layout that will be instantiated
+        and return the name of the instantiated structure.
+        """
         # Determine if we are instantiating the root design of
         #  layoutToAdd (default) or nameOfLayout
         if nameOfLayout == 0:
@@ -361,15 +463,15 @@ class VlsiLayout:
             for layerNumber in layoutToAdd.layerNumbersInUse:
                 if layerNumber not in self.layerNumbersInUse:
                     self.layerNumbersInUse.append(layerNumber)
+        return StructureName
 
-        #add a reference to the new layout structure in this layout's root
-        layoutToAddSref = GdsSref()
-        layoutToAddSref.sName = StructureName
-        layoutToAddSref.coordinates = offsetInLayoutUnits
-
+    def setTransformation(self,reference,mirror=None,rotate=None):
+        """
+        Method to set the mirror and rotation of a structure or array reference.
+        """
         if mirror or rotate:
 
-            layoutToAddSref.transFlags = [0,0,0]
+            reference.transFlags = [0,0,0]
             # transFlags = (mirror around x-axis, magnification, rotation)
             # If magnification or rotation is true, it is the flags are then
             # followed by an amount in the record
@@ -380,20 +482,17 @@ class VlsiLayout:
             if mirror=="R270":
                 rotate = 270.0
             if rotate:
-                #layoutToAddSref.transFlags[2] = 1
-                layoutToAddSref.rotateAngle = rotate
+                #reference.transFlags[2] = 1
+                reference.rotateAngle = rotate
             if mirror == "x" or mirror == "MX":
-                layoutToAddSref.transFlags[0] = 1
+                reference.transFlags[0] = 1
             if mirror == "y" or mirror == "MY": #NOTE: "MY" option will override specified rotate angle
-                layoutToAddSref.transFlags[0] = 1
-                #layoutToAddSref.transFlags[2] = 1
-                layoutToAddSref.rotateAngle = 180.0
+                reference.transFlags[0] = 1
+                #reference.transFlags[2] = 1
+                reference.rotateAngle = 180.0
             if mirror == "xy" or mirror == "XY": #NOTE: "XY" option will override specified rotate angle
-                #layoutToAddSref.transFlags[2] = 1
-                layoutToAddSref.rotateAngle = 180.0
-
-        #add the sref to the root structure
-        self.structures[self.rootStructureName].srefs.append(layoutToAddSref)
+                #reference.transFlags[2] = 1
+                reference.rotateAngle = 180.0
 
     def addBox(self,layerNumber=0, purposeNumber=0, offsetInMicrons=(0,0), width=1.0, height=1.0,center=False):
         """
@@ -813,26 +912,144 @@ class VlsiLayout:
 
         return blockages
 
-    def getAllShapes(self, lpp):
+    def getAllShapes(self, lpp, region=None):
         """
         Return all shapes on a given layer in [llx, lly, urx, ury]
         format and user units for rectangles
         and [coordinate 1, coordinate 2,...] format and user
-        units for polygons.
+        units for polygons. If a region [llx, lly, urx, ury] in
+        user units is given, only the shapes that overlap it are
+        returned.
         """
+        # Transform the shapes of each structure to all of its placements
+        placedShapes = {}
+        for structureName in self.getPlacements():
+            placedShapes[structureName] = self.getPlacedShapes(lpp, structureName, region)
+
+        # Add them in the order of the xyTree so that the shapes are
+        # returned in the same order as when each placement is transformed
         boundaries = set()
-        for TreeUnit in self.xyTree:
-            # print(TreeUnit[0])
-            boundaries.update(self.getShapesInStructure(lpp, TreeUnit))
+        for (structureName, index) in self.placements["order"]:
+            if placedShapes[structureName]:
+                boundaries.update(placedShapes[structureName][index])
 
         # Convert to user units
-        user_boundaries = []
-        for boundary in boundaries:
-            boundaries_list = []
-            for i in range(0, len(boundary)):
-                boundaries_list.append(boundary[i]*self.units[0])
-            user_boundaries.append(boundaries_list)
-        return user_boundaries
+        unit = self.units[0]
+        return [[x*unit for x in boundary] for boundary in boundaries]
+
+    def getPlacements(self):
+        """
+        Return the origins and basis vectors of all the placements of
+        each structure in the xyTree as (n, 2) arrays.
+        """
+        if self.placements is None:
+            self.placements = {"order": []}
+            treeUnits = {}
+            for (structureName, origin, uVector, vVector) in self.xyTree:
+                structureName = str(structureName)
+                if structureName not in treeUnits:
+                    treeUnits[structureName] = []
+                self.placements["order"].append((structureName, len(treeUnits[structureName])))
+                treeUnits[structureName].append((origin, uVector, vVector))
+            self.placements["structures"] = {}
+            for (structureName, units) in treeUnits.items():
+                origins = np.array([[x[0][0][0], x[0][1][0]] for x in units])
+                uVectors = np.array([[x[1][0][0], x[1][1][0]] for x in units])
+                vVectors = np.array([[x[2][0][0], x[2][1][0]] for x in units])
+                self.placements["structures"][structureName] = (origins, uVectors, vVectors)
+        return self.placements["structures"]
+
+    def getShapeTable(self, lpp, structureName):
+        """
+        Return the rectangles as an (n, 4) array of [llx, lly, urx, ury]
+        and the polygons as (n, 2) arrays of coordinates in the
+        coordinates of the structure. The order is the list of
+        (is polygon, index) of the shapes in the structure.
+        """
+        # Purposes can be a list of purposes
+        if isinstance(lpp[1], list):
+            key = (structureName, lpp[0], tuple(lpp[1]))
+        else:
+            key = (structureName, lpp[0], lpp[1])
+        if key not in self.shapeTables:
+            rectangles = []
+            polygons = []
+            order = []
+            for boundary in self.structures[structureName].boundaries:
+                if not sameLPP((boundary.drawingLayer, boundary.purposeLayer), lpp):
+                    continue
+                if len(boundary.coordinates) != 5:
+                    # if shape is a polygon (used in DFF)
+                    order.append((True, len(polygons)))
+                    polygons.append(np.array([coordinate[0:2] for coordinate in boundary.coordinates], dtype=float))
+                else:
+                    # else shape is a rectangle
+                    left_bottom = boundary.coordinates[0]
+                    right_top = boundary.coordinates[2]
+                    order.append((False, len(rectangles)))
+                    rectangles.append([left_bottom[0], left_bottom[1],
+                                       right_top[0], right_top[1]])
+            rectangles = np.array(rectangles, dtype=float).reshape(-1, 4)
+            self.shapeTables[key] = (rectangles, polygons, order)
+        return self.shapeTables[key]
+
+    def getPlacedShapes(self, lpp, structureName, region=None):
+        """
+        Return the shapes of a structure for each of its placements as
+        a list of tuples like getShapesInStructure. Each placement is
+        a row of the arrays so all of them are transformed at once.
+        """
+        (rectangles, polygons, order) = self.getShapeTable(lpp, structureName)
+        if not order:
+            return None
+        (origins, uVectors, vVectors) = self.placements["structures"][structureName]
+        (ux, uy) = (uVectors[:, 0:1], uVectors[:, 1:2])
+        (vx, vy) = (vVectors[:, 0:1], vVectors[:, 1:2])
+        (ox, oy) = (origins[:, 0:1], origins[:, 1:2])
+        unit = self.units[0]
+
+        # perform the rotation of the rectangle corners as in transformRectangle
+        x1 = rectangles[:, 0]*ux + rectangles[:, 1]*vx
+        y1 = rectangles[:, 0]*uy + rectangles[:, 1]*vy
+        x2 = rectangles[:, 2]*ux + rectangles[:, 3]*vx
+        y2 = rectangles[:, 2]*uy + rectangles[:, 3]*vy
+        # add the offset to the left, bottom, right and top
+        placedRectangles = np.stack([np.where(x2 < x1, x2, x1) + ox,
+                                     np.where(y2 < y1, y2, y1) + oy,
+                                     np.where(x2 > x1, x2, x1) + ox,
+                                     np.where(y2 > y1, y2, y1) + oy], axis=2)
+        if region:
+            rectanglesInRegion = (placedRectangles[:, :, 0]*unit <= region[2]) & (placedRectangles[:, :, 2]*unit >= region[0]) \
+                                 & (placedRectangles[:, :, 1]*unit <= region[3]) & (placedRectangles[:, :, 3]*unit >= region[1])
+        else:
+            rectanglesInRegion = np.ones(placedRectangles.shape[0:2], dtype=bool)
+        placedRectangles = placedRectangles.tolist()
+        rectanglesInRegion = rectanglesInRegion.tolist()
+
+        # perform the rotation of the polygon coordinates and add the offset
+        placedPolygons = []
+        polygonsInRegion = []
+        for polygon in polygons:
+            x = polygon[:, 0]*ux + polygon[:, 1]*vx + ox
+            y = polygon[:, 0]*uy + polygon[:, 1]*vy + oy
+            if region:
+                polygonsInRegion.append(((x.min(axis=1)*unit <= region[2]) & (x.max(axis=1)*unit >= region[0])
+                                         & (y.min(axis=1)*unit <= region[3]) & (y.max(axis=1)*unit >= region[1])).tolist())
+            else:
+                polygonsInRegion.append([True]*len(x))
+            placedPolygons.append(np.stack([x, y], axis=2).reshape(len(x), -1).tolist())
+
+        shapes = []
+        for index in range(len(origins)):
+            boundaries = []
+            for (isPolygon, shapeIndex) in order:
+                if isPolygon:
+                    if polygonsInRegion[shapeIndex][index]:
+                        boundaries.append(tuple(placedPolygons[shapeIndex][index]))
+                elif rectanglesInRegion[index][shapeIndex]:
+                    boundaries.append(tuple(placedRectangles[index][shapeIndex]))
+            shapes.append(boundaries)
+        return shapes
 
     def getShapesInStructure(self, lpp, structure):
         """
@@ -15,8 +15,10 @@ import re
 import shutil
 import optparse
 import copy
-import importlib
+import importlib.util
 import getpass
+import datetime
+import builtins
 import subprocess
 from openram import debug
 from openram import options
@@ -203,8 +205,13 @@ def init_openram(config_file, is_unit_test=False):
     setup_bitcell()
 
     # Import these to find the executables for checkpointing
-    from openram import characterizer
-    from openram import verify
+    start_import_timing()
+    try:
+        from openram import characterizer
+        from openram import verify
+    finally:
+        stop_import_timing()
+    print_import_times()
 
 
 def install_conda():
@@ -379,8 +386,16 @@ def read_config(config_file, is_unit_test=False):
 
 def end_openram():
     """ Clean up openram for a proper exit. """
+    if OPTS.check_lvsdrc:
+        # Finish the inline checks before their files are removed
+        from openram.verify import check_queue
+        check_queue.wait_for_drc_lvs()
+
     cleanup_paths()
 
+    from openram import profiling
+    profiling.report_trace()
+
     if OPTS.check_lvsdrc:
         from openram import verify
         verify.print_drc_stats()
@@ -614,10 +629,60 @@ def import_tech():
         tech.__path__.append(custom_mod_path)
 
 
+# The first import of each module while the import timing is enabled.
+# These are the start and end times like the cumulative column of
+# "python -X importtime".
+import_times = {}
+builtin_import = builtins.__import__
+
+
+def timed_import(name, globals=None, locals=None, fromlist=(), level=0):
+    """ Import a module and save the time if it wasn't imported before. """
+    if level > 0:
+        module_name = importlib.util.resolve_name("." * level + name, globals["__package__"])
+    else:
+        module_name = name
+    new_modules = [x for x in [module_name] + ["{0}.{1}".format(module_name, y) for y in fromlist or []]
+                   if x not in sys.modules]
+    if not new_modules:
+        return builtin_import(name, globals, locals, fromlist, level)
+
+    start_time = datetime.datetime.now()
+    try:
+        return builtin_import(name, globals, locals, fromlist, level)
+    finally:
+        # "from package import x" also tries to import x as a module, so
+        # only save the modules that exist
+        for new_module in new_modules:
+            if new_module in sys.modules and new_module not in import_times:
+                import_times[new_module] = (start_time, datetime.datetime.now())
+                break
+
+
+def start_import_timing():
+    """ Save the time of the following module imports. """
+    builtins.__import__ = timed_import
+
+
+def stop_import_timing():
+    builtins.__import__ = builtin_import
+
+
+def print_import_times(num_modules=10):
+    """ Print the modules that took the longest time to import. """
+    slowest = sorted(import_times.items(), key=lambda x: x[1][0] - x[1][1])
+    for (name, (start_time, end_time)) in slowest[:num_modules]:
+        print_time("Import {}".format(name), end_time, start_time, indentation=3)
+
+
 def print_time(name, now_time, last_time=None, indentation=2):
     """ Print a statement about the time delta. """
     global OPTS
 
+    if last_time:
+        from openram import profiling
+        profiling.add_span(name, "step", last_time.timestamp(), now_time.timestamp())
+
     # Don't print during testing
     if not OPTS.is_unit_test or OPTS.verbose_level > 0:
         if last_time:
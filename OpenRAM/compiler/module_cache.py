@@ -0,0 +1,251 @@
+# See LICENSE for licensing information.
+#
+# Copyright (c) 2016-2024 Regents of the University of California and The Board
+# of Regents for the Oklahoma Agricultural and Mechanical College
+# (acting for and on behalf of Oklahoma State University)
+# All rights reserved.
+#
+"""
+This is a persistent on-disk cache of the modules generated by the
+sram_factory. A module is identified by a hash of its type, its arguments,
+the options that can change its netlist or layout and the source code of
+the compiler and technology, so a later run (e.g. of a different memory
+size) can load the unchanged sub-blocks instead of generating them again.
+"""
+
+import os
+import types
+import pickle
+import hashlib
+from openram import debug
+from openram import OPTS
+from .globals import OPENRAM_HOME
+
+# These options don't change the generated modules. The size of the memory
+# only changes the modules through their arguments.
+ignored_options = {"openram_temp", "openram_tech", "output_path", "output_name",
+                   "config_file", "overridden", "is_unit_test", "verbose_level",
+                   "debug", "print_banner", "keep_temp", "coverage", "coverage_exe",
+                   "num_threads", "num_sim_threads", "top_process",
+                   "spice_exe", "drc_exe", "lvs_exe", "pex_exe", "magic_exe",
+                   "use_sim_cache", "sim_cache_path", "sim_cache_size",
+                   "use_model_cache", "model_cache_path", "use_module_cache", "module_cache_path",
+                   "module_cache_types", "use_verify_cache", "verify_cache_path",
+                   "output_extended_config",
+                   "output_datasheet_info", "write_graph", "write_trace", "use_raw_file",
+                   "num_words", "word_size", "write_size", "num_banks",
+                   "words_per_row", "num_spare_rows", "num_spare_cols"}
+
+# The hash of the compiler and technology files, which is computed once
+source_hash = None
+
+
+def get_module_cache_path():
+    """ Return the directory of the module cache. """
+    if OPTS.module_cache_path:
+        path = OPTS.module_cache_path
+    else:
+        path = os.path.join(OPTS.output_path, "module_cache")
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def is_cached_type(module_type):
+    """ Return whether the modules of this type are saved in the cache. """
+    return OPTS.use_module_cache and module_type in OPTS.module_cache_types
+
+
+def get_value_key(value):
+    """
+    Return a string that is equal for equal arguments in all runs.
+    Raises a TypeError for values without one (e.g. other modules).
+    """
+    from openram.base import hierarchy_design
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return repr(value)
+    elif isinstance(value, list):
+        return "[{}]".format(", ".join(get_value_key(x) for x in value))
+    elif isinstance(value, tuple):
+        return "({})".format(", ".join(get_value_key(x) for x in value))
+    elif isinstance(value, (set, frozenset)):
+        return "{{{}}}".format(", ".join(sorted(get_value_key(x) for x in value)))
+    elif isinstance(value, dict):
+        items = ["{0}: {1}".format(get_value_key(k), get_value_key(v)) for k, v in value.items()]
+        return "{{{}}}".format(", ".join(sorted(items)))
+    elif hasattr(value, "__dict__") and not isinstance(value, hierarchy_design):
+        # Configuration objects like sram_config are compared by their attributes
+        return "{0}({1})".format(type(value).__name__, get_value_key(vars(value)))
+    raise TypeError("No cache key for {}".format(type(value).__name__))
+
+
+def get_source_hash():
+    """ Return the hash of the compiler source and the technology files. """
+    global source_hash
+
+    if source_hash is None:
+        key = hashlib.sha256()
+        for (top, pattern) in [(OPENRAM_HOME, ".py"), (OPTS.openram_tech, "")]:
+            for (dirpath, dirnames, filenames) in os.walk(top):
+                dirnames[:] = sorted(x for x in dirnames if x not in ["tests", "__pycache__"])
+                for filename in sorted(filenames):
+                    if filename.endswith(pattern) and not filename.endswith(".pyc"):
+                        with open(os.path.join(dirpath, filename), "rb") as f:
+                            key.update(f.read())
+        source_hash = key.hexdigest()
+    return source_hash
+
+
+def get_options_key():
+    """
+    Return the options that can change the generated modules or None if
+    one of them can't be compared between runs.
+    """
+    values = []
+    for name in sorted(dir(OPTS)):
+        if name.startswith("_") or name in ignored_options:
+            continue
+        value = getattr(OPTS, name)
+        # The imports of the config file (e.g. OPTS itself) are copied to the options
+        if callable(value) or value is OPTS or isinstance(value, types.ModuleType):
+            continue
+        try:
+            values.append("{0}={1}".format(name, get_value_key(value)))
+        except TypeError:
+            debug.info(1, "Module cache skipped: option {} has no key".format(name))
+            return None
+    return ", ".join(values)
+
+
+def get_module_key(module_type, module_name, kwargs):
+    """
+    Return the key of a module from its type, name and arguments, the
+    options and the source code. Returns None if the arguments or the
+    options can't be compared between runs.
+    """
+    try:
+        kwargs_key = get_value_key(kwargs)
+    except TypeError:
+        debug.info(3, "Module cache skipped {}: the arguments have no key".format(module_type))
+        return None
+    options_key = get_options_key()
+    if options_key is None:
+        return None
+    key = hashlib.sha256()
+    key.update(get_source_hash().encode())
+    key.update(options_key.encode())
+    key.update(str((OPTS.tech_name, module_type, module_name)).encode())
+    key.update(kwargs_key.encode())
+    return key.hexdigest()
+
+
+def get_module_entry_filename(key):
+    return os.path.join(get_module_cache_path(), "{}.pickle".format(key))
+
+
+def get_submodules(obj):
+    """ Return the module and all the modules it instantiates. """
+    submodules = [obj]
+    visited = set([id(obj)])
+    for mod in submodules:
+        for submod in mod.mods:
+            if id(submod) not in visited:
+                visited.add(id(submod))
+                submodules.append(submod)
+    return submodules
+
+
+def load_module_entry(key):
+    """
+    Return the cached (module, output name, records) of the key or None if
+    the module hasn't been generated before. The records are the
+    (module type, kwargs, module) of the module and its submodules.
+    """
+    entry_filename = get_module_entry_filename(key)
+    try:
+        with open(entry_filename, "rb") as f:
+            entry = pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+        debug.info(2, "Module cache miss: {}".format(key))
+        return None
+    debug.info(2, "Module cache hit: {}".format(key))
+    return entry
+
+
+def store_module_entry(key, obj, records):
+    """ Save a module with the records of its submodules. """
+    entry_filename = get_module_entry_filename(key)
+    # Write a new file and rename it so that concurrent runs never
+    # read a partial entry
+    temp_filename = "{0}.{1}".format(entry_filename, os.getpid())
+    try:
+        with open(temp_filename, "wb") as f:
+            pickle.dump((obj, OPTS.output_name, records), f, protocol=pickle.HIGHEST_PROTOCOL)
+    except (pickle.PicklingError, TypeError, AttributeError, RecursionError) as e:
+        debug.info(2, "Module cache could not save {0}: {1}".format(obj.name, e))
+        os.remove(temp_filename)
+        return
+    os.replace(temp_filename, entry_filename)
+    debug.info(2, "Module cache saved {0}: {1}".format(obj.name, key))
+
+
+def rename_modules(submodules, output_name):
+    """ Change the output name prefix of modules generated by another run. """
+    if output_name == OPTS.output_name:
+        return
+    old_prefix = output_name + "_"
+    new_prefix = OPTS.output_name + "_"
+    for mod in submodules:
+        if mod.name.startswith(old_prefix):
+            mod.name = new_prefix + mod.name[len(old_prefix):]
+        if mod.cell_name.startswith(old_prefix):
+            mod.cell_name = new_prefix + mod.cell_name[len(old_prefix):]
+
+
+def replace_value(value, replacements):
+    """
+    Return the replacement of a module or the value with the replacements
+    of the modules in its lists, tuples and dicts (e.g. the replica columns
+    of each port).
+    """
+    if id(value) in replacements:
+        return replacements[id(value)]
+    elif isinstance(value, list):
+        value[:] = [replace_value(x, replacements) for x in value]
+    elif isinstance(value, dict):
+        for (key, item) in value.items():
+            value[key] = replace_value(item, replacements)
+    elif isinstance(value, tuple):
+        return tuple(replace_value(x, replacements) for x in value)
+    return value
+
+
+def replace_modules(submodules, replacements):
+    """
+    Make the modules instantiate (and refer to) the replacements of their
+    submodules. The replacements are indexed by the id of the old module.
+    """
+    for mod in submodules:
+        for inst in mod.insts:
+            if id(inst.mod) in replacements:
+                inst.mod = replacements[id(inst.mod)]
+                inst.gds = inst.mod.gds
+        mod.mods = set(replacements.get(id(x), x) for x in mod.mods)
+        for (name, value) in vars(mod).items():
+            if name not in ["insts", "mods"]:
+                setattr(mod, name, replace_value(value, replacements))
+
+
+def reset_layouts(submodules):
+    """
+    Clear the layouts of merged modules so that they are written again
+    with the names of the modules they instantiate in this run.
+    """
+    from openram.gdsMill import gdsMill
+    from openram.tech import GDS
+    for mod in submodules:
+        if not mod.is_library_cell:
+            mod.gds = gdsMill.VlsiLayout(name=mod.name, units=GDS["unit"])
+            mod.visited = []
+    for mod in submodules:
+        for inst in mod.insts:
+            inst.gds = inst.mod.gds
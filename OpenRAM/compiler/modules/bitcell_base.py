@@ -5,6 +5,7 @@
 # (acting for and on behalf of Oklahoma State University)
 # All rights reserved.
 #
+import numpy as np
 from openram import debug
 from openram.base import design
 from openram.base import logical_effort
@@ -258,11 +259,12 @@ class bitcell_base(design):
         m = vdd / inputramptime #v_wl = vdd for OpenRAM
         # vdd == V_b_pre in OpenRAM. Bitline swing is assumed 10% of vdd
         tstep = tf * math.log(vdd/(vdd - 0.1*vdd))
-        if tstep > 0.5*(vdd-spice["nom_threshold"])/m:
-            delay = tstep + (vdd-spice["nom_threshold"])/(2*m)
-        else:
-            delay = math.sqrt(2*tstep*(vdd-spice["nom_threshold"])/m)
-
+        # The ramp and time constant can be arrays of several loads and slews
+        delay = np.where(tstep > 0.5*(vdd-spice["nom_threshold"])/m,
+                         tstep + (vdd-spice["nom_threshold"])/(2*m),
+                         np.sqrt(2*tstep*(vdd-spice["nom_threshold"])/m))
+        if delay.ndim == 0:
+            return float(delay)
         return delay
 
     def build_graph(self, graph, inst_name, port_nets):
@@ -211,6 +211,8 @@ class bitcell_base_array(design):
                 yoffset += self.cell.height
             xoffset += self.cell.width
 
+        self.add_inst_array(self.cell_inst.values())
+
     def get_column_offsets(self):
         """
         Return an array of the x offsets of all the regular bits
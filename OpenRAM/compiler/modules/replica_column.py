@@ -136,6 +136,8 @@ class replica_column(bitcell_base_array):
             self.cell_inst[row].place(offset=offset,
                                       mirror=dir_key)
 
+        self.add_inst_array(self.cell_inst)
+
     def add_layout_pins(self):
         for port in self.all_ports:
             bl_pin = self.cell_inst[0].get_pin(self.cell.get_bl_name(port))
@@ -92,6 +92,8 @@ class row_cap_array(bitcell_base_array):
                 yoffset += self.cell.height
             xoffset += self.cell.width
 
+        self.add_inst_array(self.cell_inst.values())
+
     def add_layout_pins(self):
         """ Add the layout pins """
 
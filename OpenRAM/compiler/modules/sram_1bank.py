@@ -702,32 +702,27 @@ class sram_1bank(design, verilog, lef):
 
         return insts
 
-    def sp_write(self, sp_name, lvs=False, trim=False):
-        # Write the entire spice of the object to the file
+    def sp_header(self, lvs=False, trim=False):
+        """ Return the comment lines at the start of the spice file. """
         ############################################################
         # Spice circuit
         ############################################################
-        sp = open(sp_name, 'w')
-
-        sp.write("**************************************************\n")
-        sp.write("* OpenRAM generated memory.\n")
-        sp.write("* Words: {}\n".format(self.num_words))
-        sp.write("* Data bits: {}\n".format(self.word_size))
-        sp.write("* Banks: {}\n".format(self.num_banks))
-        sp.write("* Column mux: {}:1\n".format(self.words_per_row))
-        sp.write("* Trimmed: {}\n".format(trim))
-        sp.write("* LVS: {}\n".format(lvs))
-        sp.write("**************************************************\n")
+        header = "**************************************************\n"
+        header += "* OpenRAM generated memory.\n"
+        header += "* Words: {}\n".format(self.num_words)
+        header += "* Data bits: {}\n".format(self.word_size)
+        header += "* Banks: {}\n".format(self.num_banks)
+        header += "* Column mux: {}:1\n".format(self.words_per_row)
+        header += "* Trimmed: {}\n".format(trim)
+        header += "* LVS: {}\n".format(lvs)
+        header += "**************************************************\n"
         # This causes unit test mismatch
 
-        # sp.write("* Created: {0}\n".format(datetime.datetime.now()))
-        # sp.write("* User: {0}\n".format(getpass.getuser()))
-        # sp.write(".global {0} {1}\n".format(spice["vdd_name"],
-        #                                     spice["gnd_name"]))
-        usedMODS = list()
-        self.sp_write_file(sp, usedMODS, lvs=lvs, trim=trim)
-        del usedMODS
-        sp.close()
+        # header += "* Created: {0}\n".format(datetime.datetime.now())
+        # header += "* User: {0}\n".format(getpass.getuser())
+        # header += ".global {0} {1}\n".format(spice["vdd_name"],
+        #                                      spice["gnd_name"])
+        return header
 
     def graph_exclude_bits(self, targ_row, targ_col):
         """
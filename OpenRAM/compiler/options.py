@@ -128,6 +128,9 @@ class options(optparse.Values):
     # Whether we should do the final power routing
     route_supplies = True
     supply_pin_type = "ring"
+    # Run the router's A* search from both ends of each route. This is faster
+    # for long routes but may find slightly different paths.
+    route_bidirectional = False
     # This determines whether LVS and DRC is checked at all.
     check_lvsdrc = False
     # This determines whether LVS and DRC is checked for every submodule.
@@ -136,6 +139,27 @@ class options(optparse.Values):
     trim_netlist = True
     # Run with extracted parasitics
     use_pex = False
+    # Reuse the measurements of identical simulations from previous runs
+    use_sim_cache = False
+    # Directory of the simulation cache (defaults to sim_cache in the output path)
+    sim_cache_path = None
+    # Maximum size of the simulation cache in MB
+    sim_cache_size = 256
+    # Make the functional and delay measurements from the binary raw file
+    # of the simulator (ngspice or Xyce) instead of its text output
+    use_raw_file = False
+    # Reuse the modules generated by previous runs
+    use_module_cache = False
+    # Directory of the module cache (defaults to module_cache in the output path)
+    module_cache_path = None
+    # The types of the modules that are saved in the module cache
+    module_cache_types = ["bank", "port_data", "port_address", "hierarchical_decoder",
+                          "capped_replica_bitcell_array", "replica_bitcell_array",
+                          "bitcell_array", "local_bitcell_array", "global_bitcell_array"]
+    # Reuse the DRC and LVS results of unchanged modules from previous runs
+    use_verify_cache = False
+    # Directory of the verification cache (defaults to verify_cache in the output path)
+    verify_cache_path = None
     # Output config with all options
     output_extended_config = False
     # Output temporary file used to format HTML page
@@ -143,8 +167,15 @@ class options(optparse.Values):
     # Determines which analytical model to use.
     # Available Models: elmore, linear_regression
     model_name = "elmore"
+    # Reuse the trained regression models of previous runs
+    use_model_cache = False
+    # Directory of the trained regression models (defaults to model_cache in the output path)
+    model_cache_path = None
     # Write graph to a file
     write_graph = False
+    # Write a Chrome trace of the time and memory of each step to a file
+    # and print a summary at the end of the run
+    write_trace = False
 
     ###################
     # Tool options
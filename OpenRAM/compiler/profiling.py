@@ -0,0 +1,146 @@
+# See LICENSE for licensing information.
+#
+# Copyright (c) 2016-2024 Regents of the University of California and The Board
+# of Regents for the Oklahoma Agricultural and Mechanical College
+# (acting for and on behalf of Oklahoma State University)
+# All rights reserved.
+#
+"""
+This records the wall time and peak memory of the steps of a run (e.g. the
+creation of each module, the routing, the output files, the simulations and
+the verification runs) as nested spans. The spans are written as a Chrome
+trace (for chrome://tracing or Perfetto) and summarized in a table at the
+end of the run.
+"""
+
+import os
+import sys
+import json
+import time
+import resource
+import functools
+from openram import debug
+from openram import OPTS
+
+# The completed spans as (name, category, start time, end time, peak RSS, recursive)
+spans = []
+# The number of open spans of each name to find recursive spans
+open_spans = {}
+
+
+def get_peak_rss():
+    """ Return the peak resident memory of the process in MB. """
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # The size is in bytes on macOS and in KB elsewhere
+    if sys.platform == "darwin":
+        return peak_rss / (1024 * 1024)
+    return peak_rss / 1024
+
+
+class span():
+    """
+    A context manager that records the time of a step if tracing is enabled.
+        with span("supply_router.route", "router"):
+            ...
+    """
+
+    def __init__(self, name, category="openram"):
+        self.name = name
+        self.category = category
+        self.start_time = None
+
+    def __enter__(self):
+        if OPTS.write_trace:
+            open_spans[self.name] = open_spans.get(self.name, 0) + 1
+            self.start_time = time.time()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if self.start_time is not None:
+            open_spans[self.name] -= 1
+            add_span(self.name, self.category, self.start_time, time.time(),
+                     recursive=open_spans[self.name] > 0)
+        return False
+
+
+def traced(name=None, category="openram"):
+    """ A decorator that records each call of a function as a span. """
+    def decorator(function):
+        span_name = name or function.__qualname__
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            with span(span_name, category):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def add_span(name, category, start_time, end_time, recursive=False):
+    """ Record a step that started and ended at the given times (in seconds). """
+    if OPTS.write_trace:
+        spans.append((name, category, start_time, end_time, get_peak_rss(), recursive))
+
+
+def reset_spans():
+    del spans[:]
+    open_spans.clear()
+
+
+def write_trace(trace_name):
+    """ Write the spans as complete events of a Chrome trace. """
+    pid = os.getpid()
+    events = []
+    for (name, category, start_time, end_time, peak_rss, recursive) in spans:
+        events.append({"name": name,
+                       "cat": category,
+                       "ph": "X",
+                       "ts": round(start_time * 1e6),
+                       "dur": round((end_time - start_time) * 1e6),
+                       "pid": pid,
+                       "tid": 0,
+                       "args": {"peak_rss_mb": round(peak_rss, 1)}})
+    with open(trace_name, "w") as f:
+        json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+
+
+def get_span_stats():
+    """
+    Return the (name, calls, recursive calls, total time, peak RSS) of each
+    span name sorted by the total time. The calls are only the outermost ones
+    because the time of recursive spans is included in the outer one.
+    """
+    stats = {}
+    for (name, category, start_time, end_time, peak_rss, recursive) in spans:
+        (calls, recursive_calls, total_time, max_rss) = stats.get(name, (0, 0, 0, 0))
+        if recursive:
+            recursive_calls += 1
+        else:
+            calls += 1
+            total_time += end_time - start_time
+        stats[name] = (calls, recursive_calls, total_time, max(max_rss, peak_rss))
+    return sorted(((name,) + x for (name, x) in stats.items()), key=lambda x: -x[3])
+
+
+def print_span_stats(num_spans=40):
+    """ Print the spans with the longest total time. """
+    debug.print_raw("{0:<48} {1:>8} {2:>10} {3:>12} {4:>12} {5:>12}".format("Span", "Calls", "Recursive",
+                                                                           "Total (s)", "Average (s)",
+                                                                           "Peak RSS (MB)"))
+    for (name, calls, recursive_calls, total_time, peak_rss) in get_span_stats()[:num_spans]:
+        debug.print_raw("{0:<48} {1:>8} {2:>10} {3:>12.3f} {4:>12.4f} {5:>12.1f}".format(name[:48],
+                                                                                       calls,
+                                                                                       recursive_calls,
+                                                                                       total_time,
+                                                                                       total_time / calls,
+                                                                                       peak_rss))
+
+
+def report_trace():
+    """ Write the trace file of the run and print the summary. """
+    if not OPTS.write_trace or not spans:
+        return
+    trace_name = OPTS.output_path + OPTS.output_name + ".trace.json"
+    debug.print_raw("Trace: Writing to {0}".format(trace_name))
+    write_trace(trace_name)
+    print_span_stats()
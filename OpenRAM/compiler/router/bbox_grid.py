@@ -0,0 +1,166 @@
+# See LICENSE for licensing information.
+#
+# Copyright (c) 2016-2024 Regents of the University of California, Santa Cruz
+# All rights reserved.
+#
+import math
+
+
+class bbox_grid:
+    """
+    This class is a persistent spatial index of router shapes. Shapes are
+    stored in uniform grid bins so that point and region queries only check
+    the shapes around them. The grid is built once for all routes of a router
+    and updated as new shapes are added or removed.
+    """
+
+    def __init__(self, shapes=None, bin_size=None):
+
+        # Bins are keyed by their (column, row) indices
+        self.bins = {}
+        self.bin_size = bin_size
+        # This keeps the insertion order of the shapes that are in the grid so
+        # that queries can return them in the same order as the router's lists
+        self.order = {}
+        self.next_order = 0
+        # Bin keys of each shape so that it can be removed later
+        self.keys = {}
+        if shapes:
+            self.bulk_load(shapes)
+
+
+    def __len__(self):
+        """ Return the number of shapes in the grid. """
+
+        return len(self.order)
+
+
+    def bulk_load(self, shapes):
+        """ Build the grid from scratch with the given shapes. """
+
+        self.bins = {}
+        self.order = {}
+        self.next_order = 0
+        self.keys = {}
+        if self.bin_size is None:
+            self.bin_size = self.find_bin_size(shapes)
+        for shape in shapes:
+            self.insert(shape)
+
+
+    def find_bin_size(self, shapes):
+        """
+        Return a bin size so that the grid has about as many bins as the number
+        of shapes over the area covered by the shapes.
+        """
+
+        min_x = min(shape.rect[0].x for shape in shapes)
+        min_y = min(shape.rect[0].y for shape in shapes)
+        max_x = max(shape.rect[1].x for shape in shapes)
+        max_y = max(shape.rect[1].y for shape in shapes)
+        area = (max_x - min_x) * (max_y - min_y)
+        if area <= 0:
+            return max(max_x - min_x, max_y - min_y, 1)
+        return math.sqrt(area / len(shapes))
+
+
+    def get_range(self, lx, by, rx, uy):
+        """ Return the bin index ranges that the rectangle covers. """
+
+        size = self.bin_size
+        return (math.floor(lx / size), math.floor(by / size),
+                math.floor(rx / size), math.floor(uy / size))
+
+
+    def insert(self, shape):
+        """ Insert a new shape to the grid. """
+
+        if self.bin_size is None:
+            self.bin_size = self.find_bin_size([shape])
+        ll, ur = shape.rect
+        min_i, min_j, max_i, max_j = self.get_range(ll.x, ll.y, ur.x, ur.y)
+        keys = []
+        for i in range(min_i, max_i + 1):
+            for j in range(min_j, max_j + 1):
+                self.bins.setdefault((i, j), []).append(shape)
+                keys.append((i, j))
+        self.order[id(shape)] = self.next_order
+        self.next_order += 1
+        self.keys[id(shape)] = keys
+
+
+    def remove(self, shape):
+        """ Remove a shape from the grid. """
+
+        if id(shape) not in self.order:
+            return
+        for key in self.keys.pop(id(shape)):
+            bin_shapes = self.bins[key]
+            for i in range(len(bin_shapes)):
+                if bin_shapes[i] is shape:
+                    del bin_shapes[i]
+                    break
+        del self.order[id(shape)]
+
+
+    def contains(self, shape):
+        """ Return if the shape (not an equal one) is in the grid. """
+
+        return id(shape) in self.order
+
+
+    def iterate_point(self, point):
+        """ Iterate over shapes in the grid that overlap the given point. """
+
+        if self.bin_size is None:
+            return
+        px, py = point.x, point.y
+        size = self.bin_size
+        key = (math.floor(px / size), math.floor(py / size))
+        for shape in self.bins.get(key, []):
+            ll, ur = shape.rect
+            if ll.x <= px and px <= ur.x and ll.y <= py and py <= ur.y:
+                yield shape
+
+
+    def iterate_shape(self, shape):
+        """ Iterate over shapes in the grid that overlap the given shape. """
+
+        sll, sur = shape.rect
+        return self.iterate_rect(sll.x, sll.y, sur.x, sur.y)
+
+
+    def iterate_rect(self, lx, by, rx, uy):
+        """ Iterate over shapes in the grid that overlap the given rectangle. """
+
+        if self.bin_size is None:
+            return
+        min_i, min_j, max_i, max_j = self.get_range(lx, by, rx, uy)
+        # Only the bins that exist need to be checked for large rectangles
+        if (max_i - min_i + 1) * (max_j - min_j + 1) > len(self.bins):
+            keys = [key for key in self.bins if min_i <= key[0] <= max_i and min_j <= key[1] <= max_j]
+        else:
+            keys = [(i, j) for i in range(min_i, max_i + 1) for j in range(min_j, max_j + 1)]
+        single = len(keys) == 1
+        seen = set()
+        for key in keys:
+            for shape in self.bins.get(key, []):
+                # Shapes that span multiple bins are only returned once
+                if not single:
+                    if id(shape) in seen:
+                        continue
+                    seen.add(id(shape))
+                ll, ur = shape.rect
+                if ll.x <= rx and lx <= ur.x and ll.y <= uy and by <= ur.y:
+                    yield shape
+
+
+    def get_overlapping(self, shape):
+        """
+        Return the shapes that overlap the given shape in the order they were
+        inserted.
+        """
+
+        shapes = list(self.iterate_shape(shape))
+        shapes.sort(key=lambda x: self.order[id(x)])
+        return shapes
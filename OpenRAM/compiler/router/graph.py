@@ -5,13 +5,12 @@
 #
 import heapq
 from copy import deepcopy
+import numpy as np
 from openram import debug
+from openram import OPTS
 from openram.base.vector import vector
 from openram.tech import drc
-from .bbox import bbox
-from .bbox_node import bbox_node
 from .graph_node import graph_node
-from .graph_probe import graph_probe
 from .graph_utils import snap
 
 
@@ -32,17 +31,6 @@ class graph:
         return shape.name == self.source.name
 
 
-    def inside_shape(self, point, shape):
-        """ Return if the point is inside the shape. """
-
-        # Check if they're on the same layer
-        if point.z != self.router.get_zindex(shape.lpp):
-            return False
-        # Check if the point is inside the shape
-        ll, ur = shape.rect
-        return shape.on_segment(ll, point, ur)
-
-
     def get_safe_pin_values(self, pin):
         """ Get the safe x and y values of the given pin. """
 
@@ -71,119 +59,6 @@ class graph:
         return x_values, y_values
 
 
-    def is_probe_blocked(self, p1, p2):
-        """
-        Return if a probe sent from p1 to p2 encounters a blockage.
-        The probe must be sent vertically or horizontally.
-        This function assumes that p1 and p2 are on the same layer.
-        """
-
-        probe_shape = graph_probe(p1, p2, self.router.get_lpp(p1.z))
-        pll, pur = probe_shape.rect
-        # Check if any blockage blocks this probe
-        for blockage in self.blockage_bbox_tree.iterate_shape(probe_shape):
-            bll, bur = blockage.rect
-            # Not on the same layer
-            if not blockage.same_lpp(blockage.lpp, probe_shape.lpp):
-                continue
-            # Probe is blocked if the shape isn't routable
-            if not self.is_routable(blockage):
-                return True
-            blockage = blockage.get_core()
-            bll, bur = blockage.rect
-            # Not overlapping
-            if bll.x > pur.x or pll.x > bur.x or bll.y > pur.y or pll.y > bur.y:
-                return True
-        return False
-
-
-    def is_node_blocked(self, node):
-        """ Return if a node is blocked by a blockage. """
-
-        p = node.center
-        x = p.x
-        y = p.y
-        z = p.z
-
-        def closest(value, checklist):
-            """ Return the distance of the closest value in the checklist. """
-            diffs = [abs(value - other) for other in checklist]
-            return snap(min(diffs))
-
-        wide = self.router.track_wire
-        half_wide = self.router.half_wire
-        spacing = snap(self.router.track_space + half_wide + drc["grid"])
-        blocked = False
-        for blockage in self.blockage_bbox_tree.iterate_point(p):
-            ll, ur = blockage.rect
-            # Not on the same layer
-            if self.router.get_zindex(blockage.lpp) != z:
-                continue
-            # Blocked if not routable
-            if not self.is_routable(blockage):
-                blocked = True
-                continue
-            blockage = blockage.get_core()
-            ll, ur = blockage.rect
-            # Not overlapping
-            if ll.x > x or x > ur.x or ll.y > y or y > ur.y:
-                blocked = True
-                continue
-            # Check if the node is too close to one edge of the shape
-            lengths = [blockage.width(), blockage.height()]
-            centers = blockage.center()
-            ll, ur = blockage.rect
-            safe = [True, True]
-            for i in range(2):
-                if lengths[i] >= wide:
-                    min_diff = closest(p[i], [ll[i], ur[i]])
-                    if min_diff < half_wide:
-                        safe[i] = False
-                elif centers[i] != p[i]:
-                    safe[i] = False
-            if not all(safe):
-                blocked = True
-                continue
-            # Check if the node is in a safe region of the shape
-            xs, ys = self.get_safe_pin_values(blockage)
-            xdiff = closest(p.x, xs)
-            ydiff = closest(p.y, ys)
-            if xdiff == 0 and ydiff == 0:
-                if blockage in [self.source, self.target]:
-                    return False
-            elif xdiff < spacing and ydiff < spacing:
-                blocked = True
-        return blocked
-
-
-    def is_via_blocked(self, nodes):
-        """ Return if a via on the given point is blocked by another via. """
-
-        # If the nodes are blocked by a blockage other than a via
-        for node in nodes:
-            if self.is_node_blocked(node):
-                return True
-
-        # Skip if no via is present
-        if len(self.graph_vias) == 0:
-            return False
-
-        # If the nodes are blocked by a via
-        x = node.center.x
-        y = node.center.y
-        z = node.center.z
-        for via in self.via_bbox_tree.iterate_point(node.center):
-            ll, ur = via.rect
-            # Not overlapping
-            if ll.x > x or x > ur.x or ll.y > y or y > ur.y:
-                continue
-            center = via.center()
-            # If not in the center
-            if center.x != x or center.y != y:
-                return True
-        return False
-
-
     def create_graph(self, source, target):
         """ Create the graph to run routing on later. """
         debug.info(3, "Creating the graph for source '{}' and target'{}'.".format(source, target))
@@ -200,10 +75,12 @@ class graph:
 
         # Find the blockages that are in the routing area
         self.graph_blockages = []
+        self.graph_blockage_set = set()
         self.find_graph_blockages(region)
 
         # Find the vias that are in the routing area
         self.graph_vias = []
+        self.graph_via_set = set()
         self.find_graph_vias(region)
 
         # Generate the cartesian values from shapes in the area
@@ -212,29 +89,28 @@ class graph:
         region.bbox(self.graph_blockages)
         # Find and include edge shapes to prevent DRC errors
         self.find_graph_blockages(region)
-        # Build the bbox tree
-        self.build_bbox_trees()
         # Generate the graph nodes from cartesian values
         self.generate_graph_nodes(x_values, y_values)
         # Save the graph nodes that lie in source and target shapes
         self.save_end_nodes()
         debug.info(4, "Number of blockages detected in the routing region: {}".format(len(self.graph_blockages)))
         debug.info(4, "Number of vias detected in the routing region: {}".format(len(self.graph_vias)))
-        debug.info(4, "Number of nodes in the routing graph: {}".format(len(self.nodes)))
+        debug.info(4, "Number of nodes in the routing graph: {}".format(np.count_nonzero(~self.blocked)))
 
 
     def find_graph_blockages(self, region):
         """ Find blockages that overlap the routing region. """
 
-        for blockage in self.router.blockages:
+        # Only check the blockages around the region using the router's grid
+        for blockage in self.router.blockage_grid.get_overlapping(region):
             # Skip if already included
-            if blockage in self.graph_blockages:
+            if blockage in self.graph_blockage_set:
                 continue
             # Set the region's lpp to current blockage's lpp so that the
             # overlaps method works
             region.lpp = blockage.lpp
             if region.overlaps(blockage):
-                self.graph_blockages.append(blockage)
+                self.add_graph_blockage(blockage)
         # Make sure that the source or target fake pins are included as blockage
         for shape in [self.source, self.target]:
             for blockage in self.graph_blockages:
@@ -242,36 +118,30 @@ class graph:
                 if shape == blockage:
                     break
             else:
-                self.graph_blockages.append(shape)
+                self.add_graph_blockage(shape)
+
+
+    def add_graph_blockage(self, blockage):
+        """ Add a blockage to the routing region. """
+
+        self.graph_blockages.append(blockage)
+        self.graph_blockage_set.add(blockage)
 
 
     def find_graph_vias(self, region):
         """ Find vias that overlap the routing region. """
 
-        for via in self.router.vias:
+        # Only check the vias around the region using the router's grid
+        for via in self.router.via_grid.get_overlapping(region):
             # Skip if already included
-            if via in self.graph_vias:
+            if via in self.graph_via_set:
                 continue
             # Set the regions's lpp to current via's lpp so that the
             # overlaps method works
             region.lpp = via.lpp
             if region.overlaps(via):
                 self.graph_vias.append(via)
-
-
-    def build_bbox_trees(self):
-        """ Build bbox trees for blockages and vias in the routing region. """
-
-        # Bbox tree for blockages
-        self.blockage_bbox_tree = bbox_node(bbox(self.graph_blockages[0]))
-        for i in range(1, len(self.graph_blockages)):
-            self.blockage_bbox_tree.insert(bbox(self.graph_blockages[i]))
-        # Bbox tree for vias
-        if len(self.graph_vias) == 0:
-            return
-        self.via_bbox_tree = bbox_node(bbox(self.graph_vias[0]))
-        for i in range(1, len(self.graph_vias)):
-            self.via_bbox_tree.insert(bbox(self.graph_vias[i]))
+                self.graph_via_set.add(via)
 
 
     def generate_cartesian_values(self):
@@ -323,70 +193,274 @@ class graph:
         orthogonal neighbors.
         """
 
-        # Generate all nodes
-        self.nodes = []
-        for x in x_values:
-            for y in y_values:
-                for z in [0, 1]:
-                    self.nodes.append(graph_node([x, y, z]))
-
-        # Mark nodes that will be removed
-        self.mark_blocked_nodes()
-
-        # Connect closest nodes that won't be removed
-        def search(index, condition, shift):
-            """ Search and connect neighbor nodes. """
-            base_nodes = self.nodes[index:index+2]
-            found = [base_nodes[0].remove,
-                     base_nodes[1].remove]
-            while condition(index) and not all(found):
-                nodes = self.nodes[index - shift:index - shift + 2]
-                for k in range(2):
-                    if not found[k] and not nodes[k].remove:
-                        found[k] = True
-                        if not self.is_probe_blocked(base_nodes[k].center, nodes[k].center):
-                            base_nodes[k].add_neighbor(nodes[k])
-                index -= shift
-        y_len = len(y_values)
-        for i in range(0, len(self.nodes), 2):
-            search(i, lambda count: (count / 2) % y_len, 2) # Down
-            search(i, lambda count: (count / 2) >= y_len, y_len * 2) # Left
-            if not self.nodes[i].remove and \
-               not self.nodes[i + 1].remove and \
-               not self.is_via_blocked(self.nodes[i:i+2]):
-                self.nodes[i].add_neighbor(self.nodes[i + 1])
-
-        # Remove marked nodes
-        self.remove_blocked_nodes()
-
-
-    def mark_blocked_nodes(self):
-        """ Mark graph nodes to be removed that are blocked by a blockage. """
-
-        for i in range(len(self.nodes) - 1, -1, -1):
-            node = self.nodes[i]
-            if self.is_node_blocked(node):
-                node.remove = True
-
-
-    def remove_blocked_nodes(self):
-        """ Remove graph nodes that are marked to be removed. """
-
-        for i in range(len(self.nodes) - 1, -1, -1):
-            node = self.nodes[i]
-            if node.remove:
-                node.remove_all_neighbors()
-                self.nodes.remove(node)
+        # Nodes aren't created as objects. Each node is an integer id that
+        # points to its coordinates as (x index, y index, z) in row-major
+        # order, so the ids are in the same order as the cartesian values.
+        self.x_values = np.array(x_values, dtype=float)
+        self.y_values = np.array(y_values, dtype=float)
+        self.x_list = list(x_values)
+        self.y_list = list(y_values)
+        self.y_len = len(y_values)
+
+        # Mark nodes that are blocked
+        self.blocked = self.find_blocked_nodes()
+        valid = ~self.blocked
+
+        # Connect closest nodes that aren't blocked
+        edges = []
+        for z in [0, 1]:
+            # Down (probes are sent along the y axis)
+            edges.append(self.find_neighbor_edges(valid[:, :, z], 1, z))
+            # Left (probes are sent along the x axis)
+            edges.append(self.find_neighbor_edges(valid[:, :, z].T, 0, z))
+        # Connect both layers with vias
+        via_ok = valid[:, :, 0] & valid[:, :, 1] & ~self.find_blocked_vias()
+        xs, ys = np.nonzero(via_ok)
+        ids = (xs * self.y_len + ys) * 2
+        edges.append((ids, ids + 1))
+
+        # Save the neighbors of each node as index arrays
+        u = np.concatenate([e[0] for e in edges] + [e[1] for e in edges])
+        v = np.concatenate([e[1] for e in edges] + [e[0] for e in edges])
+        order = np.argsort(u, kind="stable")
+        counts = np.bincount(u, minlength=self.blocked.size)
+        self.neighbor_index = np.concatenate([[0], np.cumsum(counts)]).tolist()
+        self.neighbor_ids = v[order].tolist()
+
+
+    def get_index_range(self, values, low, high):
+        """ Return the index range of the values between low and high. """
+
+        return (np.searchsorted(values, low, "left"),
+                np.searchsorted(values, high, "right"))
+
+
+    def find_blocked_nodes(self):
+        """ Return the mask of graph nodes that are blocked by a blockage. """
+
+        def closest(value, checklist):
+            """ Return the distance of the closest value in the checklist. """
+            diffs = [abs(value - other) for other in checklist]
+            return snap(min(diffs))
+
+        wide = self.router.track_wire
+        half_wide = self.router.half_wire
+        spacing = snap(self.router.track_space + half_wide + drc["grid"])
+        shape = (len(self.x_list), self.y_len, 2)
+        blocked = np.zeros(shape, dtype=bool)
+        # Nodes in the safe region of the source and target are never blocked
+        free = np.zeros(shape, dtype=bool)
+        for blockage in self.graph_blockages:
+            z = self.router.get_zindex(blockage.lpp)
+            ll, ur = blockage.rect
+            x_low, x_high = self.get_index_range(self.x_values, ll.x, ur.x)
+            y_low, y_high = self.get_index_range(self.y_values, ll.y, ur.y)
+            if x_low >= x_high or y_low >= y_high:
+                continue
+            area = (slice(x_low, x_high), slice(y_low, y_high), z)
+            # Blocked if not routable
+            if not self.is_routable(blockage):
+                blocked[area] = True
+                continue
+            blockage = blockage.get_core()
+            ll, ur = blockage.rect
+            lengths = [blockage.width(), blockage.height()]
+            centers = blockage.center()
+            safe_values = self.get_safe_pin_values(blockage)
+            # Conditions below only depend on one axis, so find them for each
+            # axis separately and combine them for the area
+            axes = []
+            for i, values in enumerate([self.x_list[x_low:x_high],
+                                        self.y_list[y_low:y_high]]):
+                inside = []
+                safe = []
+                exact = []
+                close = []
+                for value in values:
+                    inside.append(ll[i] <= value <= ur[i])
+                    # Check if the node is too close to one edge of the shape
+                    if lengths[i] >= wide:
+                        safe.append(closest(value, [ll[i], ur[i]]) >= half_wide)
+                    else:
+                        safe.append(centers[i] == value)
+                    # Check if the node is in a safe region of the shape
+                    diff = closest(value, safe_values[i])
+                    exact.append(diff == 0)
+                    close.append(diff < spacing)
+                axes.append([np.array(inside), np.array(safe),
+                             np.array(exact), np.array(close)])
+            (x_inside, x_safe, x_exact, x_close), (y_inside, y_safe, y_exact, y_close) = axes
+            inside = np.outer(x_inside, y_inside)
+            safe = np.outer(x_safe, y_safe)
+            exact = np.outer(x_exact, y_exact)
+            close = np.outer(x_close, y_close)
+            blocked[area] |= ~inside | ~safe | (~exact & close)
+            if blockage in [self.source, self.target]:
+                free[area] |= inside & safe & exact
+        return blocked & ~free
+
+
+    def find_neighbor_edges(self, valid, axis, z):
+        """
+        Return the edges between each valid node and the closest valid node
+        before it along the given axis. The mask is indexed as (lane, position)
+        where the position is along the axis.
+        """
+
+        # Find the position of the previous valid node in each lane
+        positions = np.where(valid, np.arange(valid.shape[1]), -1)
+        positions = np.maximum.accumulate(positions, axis=1)
+        prev = np.full(valid.shape, -1)
+        prev[:, 1:] = positions[:, :-1]
+        connect = valid & (prev >= 0) & ~self.find_blocked_probes(prev, axis, z)
+        lanes, ends = np.nonzero(connect)
+        starts = prev[lanes, ends]
+        if axis == 1:
+            return (self.get_node_ids(lanes, ends, z),
+                    self.get_node_ids(lanes, starts, z))
+        return (self.get_node_ids(ends, lanes, z),
+                self.get_node_ids(starts, lanes, z))
+
+
+    def find_blocked_probes(self, prev, axis, z):
+        """
+        Return the mask of probes sent from each node to the previous node
+        along the given axis that encounter a blockage.
+        """
+
+        probe_values = [self.x_values, self.y_values][axis]
+        lane_values = [self.x_values, self.y_values][1 - axis]
+        lpp = self.router.get_lpp(z)
+        blocked = np.zeros(prev.shape, dtype=bool)
+        for blockage in self.graph_blockages:
+            # Not on the same layer
+            if not blockage.same_lpp(blockage.lpp, lpp):
+                continue
+            ll, ur = blockage.rect
+            lane_low, lane_high = self.get_index_range(lane_values, ll[1 - axis], ur[1 - axis])
+            start = np.searchsorted(probe_values, ll[axis], "left")
+            if lane_low >= lane_high or start >= len(probe_values):
+                continue
+            area = (slice(lane_low, lane_high), slice(start, None))
+            starts = prev[area]
+            start_values = probe_values[starts]
+            # Probes that overlap this blockage
+            overlap = (starts >= 0) & (start_values <= ur[axis])
+            # Probe is blocked if the shape isn't routable or the probe doesn't
+            # overlap the routable core of the shape
+            if self.is_routable(blockage):
+                ll, ur = blockage.get_core().rect
+                lanes = lane_values[lane_low:lane_high, None]
+                ends = probe_values[None, start:]
+                overlap &= (ll[1 - axis] > lanes) | (lanes > ur[1 - axis]) | \
+                           (ll[axis] > ends) | (start_values > ur[axis])
+            blocked[area] |= overlap
+        return blocked
+
+
+    def find_blocked_vias(self):
+        """ Return the mask of via positions that are blocked by another via. """
+
+        blocked = np.zeros((len(self.x_list), self.y_len), dtype=bool)
+        for via in self.graph_vias:
+            ll, ur = via.rect
+            x_low, x_high = self.get_index_range(self.x_values, ll.x, ur.x)
+            y_low, y_high = self.get_index_range(self.y_values, ll.y, ur.y)
+            center = via.center()
+            # Blocked if not in the center
+            xs = self.x_values[x_low:x_high, None]
+            ys = self.y_values[None, y_low:y_high]
+            blocked[x_low:x_high, y_low:y_high] |= (xs != center.x) | (ys != center.y)
+        return blocked
+
+
+    def get_node_ids(self, x_index, y_index, z):
+        """ Return the node ids of the given coordinate indices. """
+
+        return (x_index * self.y_len + y_index) * 2 + z
+
+
+    def get_center(self, node):
+        """ Return the center (x, y, z) values of a node. """
+
+        x_index, z = divmod(node, 2)
+        x_index, y_index = divmod(x_index, self.y_len)
+        return (self.x_list[x_index], self.y_list[y_index], z)
+
+
+    def get_nodes(self):
+        """ Return the graph nodes that aren't blocked as objects. """
+
+        return [graph_node(self.get_center(node)) for node in np.flatnonzero(~self.blocked).tolist()]
 
 
     def save_end_nodes(self):
         """ Save graph nodes that are inside source and target pins. """
 
-        for node in self.nodes:
-            if self.inside_shape(node.center, self.source):
-                self.source_nodes.append(node)
-            elif self.inside_shape(node.center, self.target):
-                self.target_nodes.append(node)
+        self.source_nodes = []
+        self.target_nodes = []
+        found = np.zeros(self.blocked.shape, dtype=bool)
+        for shape, end_nodes in [(self.source, self.source_nodes),
+                                 (self.target, self.target_nodes)]:
+            ll, ur = shape.rect
+            inside = np.zeros(self.blocked.shape, dtype=bool)
+            x_low, x_high = self.get_index_range(self.x_values, ll.x, ur.x)
+            y_low, y_high = self.get_index_range(self.y_values, ll.y, ur.y)
+            inside[x_low:x_high, y_low:y_high, self.router.get_zindex(shape.lpp)] = True
+            inside &= ~self.blocked & ~found
+            found |= inside
+            end_nodes.extend(np.flatnonzero(inside).tolist())
+
+
+    def get_heuristic(self, end_nodes):
+        """
+        Return the heuristic function that estimates the distance to the
+        closest node in end_nodes.
+        """
+
+        # Precompute the coordinates of the end nodes so that each estimate is
+        # a single vectorized pass, and cache the estimates since nodes are
+        # usually scored more than once
+        centers = np.array([self.get_center(node) for node in end_nodes], dtype=float).reshape(-1, 3)
+        xs, ys, zs = centers[:, 0], centers[:, 1], centers[:, 2]
+        scores = {}
+
+        def h(node):
+            """ Return the estimated distance to the closest end node. """
+            if node not in scores:
+                if len(end_nodes) == 0:
+                    scores[node] = float("inf")
+                else:
+                    x, y, z = self.get_center(node)
+                    scores[node] = float((np.abs(xs - x) + np.abs(ys - y) + np.abs(zs - z)).min())
+            return scores[node]
+
+        return h
+
+
+    def get_edge_cost(self, current, node, prev_node=None):
+        """ Return the cost of going from current node to its neighbor. """
+
+        cx, cy, cz = self.get_center(current)
+        nx, ny, nz = self.get_center(node)
+        is_vertical = cx == nx
+        layer_dist = abs(cx - nx) + abs(cy - ny)
+        # Double the cost if the edge is in non-preferred direction
+        if is_vertical != bool(cz):
+            layer_dist *= 4
+        # Add a constant wire cost to prevent dog-legs
+        if prev_node is not None:
+            px, py, _ = self.get_center(prev_node)
+            if (cx == px, cy == py) != (cx == nx, cy == ny):
+                layer_dist += drc["grid"]
+        via_dist = abs(cz - nz) * 2
+        return layer_dist + via_dist
+
+
+    def get_neighbors(self, node):
+        """ Return the neighbor node ids of a node. """
+
+        return self.neighbor_ids[self.neighbor_index[node]:self.neighbor_index[node + 1]]
 
 
     def find_shortest_path(self):
@@ -395,15 +469,11 @@ class graph:
         A* algorithm.
         """
 
-        # Heuristic function to calculate the scores
-        def h(node):
-            """ Return the estimated distance to the closest target. """
-            min_dist = float("inf")
-            for t in self.target_nodes:
-                dist = t.center.distance(node.center) + abs(t.center.z - node.center.z)
-                if dist < min_dist:
-                    min_dist = dist
-            return min_dist
+        if OPTS.route_bidirectional:
+            return self.find_shortest_path_bidirectional()
+
+        h = self.get_heuristic(self.target_nodes)
+        target_set = set(self.target_nodes)
 
         # Initialize data structures to be used for A* search
         queue = []
@@ -414,43 +484,106 @@ class graph:
 
         # Initialize score values for the source nodes
         for node in self.source_nodes:
-            g_scores[node.id] = 0
-            f_scores[node.id] = h(node)
-            heapq.heappush(queue, (f_scores[node.id], node.id, node))
+            g_scores[node] = 0
+            f_scores[node] = h(node)
+            heapq.heappush(queue, (f_scores[node], node))
 
         # Run the A* algorithm
         while len(queue) > 0:
             # Get the closest node from the queue
-            current = heapq.heappop(queue)[2]
+            f_score, current = heapq.heappop(queue)
 
-            # Skip this node if already discovered
-            if current in close_set:
+            # Skip this node if already discovered or if this entry is stale
+            # since its score was decreased later (lazy decrease-key)
+            if f_score > f_scores[current] or current in close_set:
                 continue
             close_set.add(current)
 
             # Check if we've reached the target
-            if current in self.target_nodes:
-                path = []
-                while current.id in came_from:
-                    path.append(current)
-                    current = came_from[current.id]
-                path.append(current)
-                path.reverse()
-                return path
+            if current in target_set:
+                return self.get_path(came_from, current)[::-1]
 
             # Get the previous node to better calculate the next costs
-            prev_node = None
-            if current.id in came_from:
-                prev_node = came_from[current.id]
+            prev_node = came_from.get(current)
 
             # Update neighbor scores
-            for node in current.neighbors:
-                tentative_score = current.get_edge_cost(node, prev_node) + g_scores[current.id]
-                if node.id not in g_scores or tentative_score < g_scores[node.id]:
-                    came_from[node.id] = current
-                    g_scores[node.id] = tentative_score
-                    f_scores[node.id] = tentative_score + h(node)
-                    heapq.heappush(queue, (f_scores[node.id], node.id, node))
+            for node in self.get_neighbors(current):
+                tentative_score = self.get_edge_cost(current, node, prev_node) + g_scores[current]
+                if node not in g_scores or tentative_score < g_scores[node]:
+                    came_from[node] = current
+                    g_scores[node] = tentative_score
+                    f_scores[node] = tentative_score + h(node)
+                    heapq.heappush(queue, (f_scores[node], node))
 
         # Return None if not connected
         return None
+
+
+    def find_shortest_path_bidirectional(self):
+        """
+        Find a path from the source node to target node by running A*
+        searches from both ends until they meet.
+        NOTE: The dog-leg cost isn't added where the searches meet, so the path
+        may be slightly different than the one found by `find_shortest_path`.
+        """
+
+        # Search 0 goes from the sources and search 1 goes from the targets
+        starts = [self.source_nodes, self.target_nodes]
+        h = [self.get_heuristic(self.target_nodes),
+             self.get_heuristic(self.source_nodes)]
+        queues = [[], []]
+        close_sets = [set(), set()]
+        came_froms = [{}, {}]
+        g_scores = [{}, {}]
+        f_scores = [{}, {}]
+        for i in range(2):
+            for node in starts[i]:
+                g_scores[i][node] = 0
+                f_scores[i][node] = h[i](node)
+                heapq.heappush(queues[i], (f_scores[i][node], node))
+
+        # Best path found so far and the node where the searches meet
+        best_score = float("inf")
+        meet = None
+        while len(queues[0]) > 0 and len(queues[1]) > 0:
+            # Stop if neither search can find a better path
+            if queues[0][0][0] >= best_score or queues[1][0][0] >= best_score:
+                break
+            # Expand the search with the smaller frontier
+            i = 0 if len(queues[0]) <= len(queues[1]) else 1
+            f_score, current = heapq.heappop(queues[i])
+            if f_score > f_scores[i][current] or current in close_sets[i]:
+                continue
+            close_sets[i].add(current)
+            prev_node = came_froms[i].get(current)
+            for node in self.get_neighbors(current):
+                if node in close_sets[i]:
+                    continue
+                tentative_score = self.get_edge_cost(current, node, prev_node) + g_scores[i][current]
+                if node not in g_scores[i] or tentative_score < g_scores[i][node]:
+                    came_froms[i][node] = current
+                    g_scores[i][node] = tentative_score
+                    f_scores[i][node] = tentative_score + h[i](node)
+                    heapq.heappush(queues[i], (f_scores[i][node], node))
+                    # Check if the other search has reached this node
+                    if node in g_scores[1 - i]:
+                        score = tentative_score + g_scores[1 - i][node]
+                        if score < best_score:
+                            best_score = score
+                            meet = node
+
+        # Return None if not connected
+        if meet is None:
+            return None
+        path = self.get_path(came_froms[0], meet)[::-1]
+        return path + self.get_path(came_froms[1], meet)[1:]
+
+
+    def get_path(self, came_from, node):
+        """ Return the path from the given node back to its start node. """
+
+        path = [node]
+        while node in came_from:
+            node = came_from[node]
+            path.append(node)
+        return [graph_node(self.get_center(node)) for node in path]
@@ -3,13 +3,15 @@
 # Copyright (c) 2016-2024 Regents of the University of California, Santa Cruz
 # All rights reserved.
 #
+import heapq
+import math
 from openram import debug
 from openram.base.vector import vector
 from openram.gdsMill import gdsMill
 from openram.tech import GDS
 from openram.tech import drc
 from openram.tech import layer as tech_layer
-from openram import OPTS
+from .bbox_grid import bbox_grid
 from .graph_shape import graph_shape
 from .graph_utils import snap
 from .router_tech import router_tech
@@ -29,8 +31,6 @@ class router(router_tech):
         self.layers = layers
         # This is the `hierarchy_layout` object
         self.design = design
-        # Temporary GDSII file name to find pins and blockages
-        self.gds_filename = OPTS.openram_temp + "temp.gds"
         # Calculate the bounding box for routing around the perimeter
         # FIXME: We wouldn't do this if `rom_bank` wasn't behaving weird
         if bbox is None:
@@ -48,6 +48,13 @@ class router(router_tech):
         self.blockages = []
         # This is all the vias between routing layers
         self.vias = []
+        # Spatial indices of the blockages, vias, and pins. These are used to
+        # find blockages and vias without scanning all shapes, built again
+        # before routing, and updated as new paths are added so that the
+        # graphs don't need to rescan all shapes for each route.
+        self.blockage_grid = None
+        self.via_grid = None
+        self.pin_grid = None
         # Fake pins are imaginary pins on the side supply pins to route other
         # pins to them
         self.fake_pins = []
@@ -56,35 +63,85 @@ class router(router_tech):
         self.half_wire = snap(self.track_wire / 2)
 
 
-    def prepare_gds_reader(self):
-        """ Write the current layout to a temporary file to read the layout. """
+    def prepare_layout(self):
+        """ Prepare the current layout in memory to find pins and shapes. """
 
-        # NOTE: Avoid using this function if possible since it is too slow to
-        # write/read these files
-        self.design.gds_write(self.gds_filename)
+        # NOTE: The layout is shared with the design instead of being written
+        # to a temporary GDS file and read back
+        self.design.gds_prepare()
         self.layout = gdsMill.VlsiLayout(units=GDS["unit"])
-        self.reader = gdsMill.Gds2reader(self.layout)
-        self.reader.loadFromFile(self.gds_filename)
+        self.layout.initializeFromLayout(self.design.gds)
 
 
-    def merge_shapes(self, merger, shape_list):
+    def merge_shapes(self, merger, shape_list, grid=None):
         """
         Merge shapes in the list into the merger if they are contained or
-        aligned by the merger.
+        aligned by the merger. Return the shapes removed from the list.
+        If the bbox grid of the list is given, only the shapes around the
+        merger are checked.
         """
 
+        if grid is not None:
+            return self.merge_grid_shapes(merger, shape_list, grid)
         merger_core = merger.get_core()
+        removed = []
         for shape in list(shape_list):
             shape_core = shape.get_core()
             # If merger contains the shape, remove it from the list
             if merger_core.contains(shape_core):
                 shape_list.remove(shape)
+                removed.append(shape)
             # If the merger aligns with the shape, expand the merger and remove
             # the shape from the list
             elif merger_core.aligns(shape_core):
                 merger.bbox([shape])
                 merger_core.bbox([shape_core])
                 shape_list.remove(shape)
+                removed.append(shape)
+        return removed
+
+
+    def merge_grid_shapes(self, merger, shape_list, grid):
+        """
+        Merge shapes in the list into the merger using the bbox grid of the
+        list. Shapes are checked in the same order as `merge_shapes` does, and
+        the grid is searched again each time the merger expands.
+        """
+
+        merger_core = merger.get_core()
+        removed = []
+        candidates = []
+        seen = set()
+        # Order of the last shape checked
+        last = -1
+
+        def find_candidates():
+            """ Queue the shapes around the merger that haven't been checked. """
+            ll, ur = merger_core.rect
+            for shape in grid.iterate_rect(ll.x, ll.y, ur.x, ur.y):
+                order = grid.order[id(shape)]
+                if order > last and id(shape) not in seen:
+                    seen.add(id(shape))
+                    heapq.heappush(candidates, (order, id(shape), shape))
+
+        find_candidates()
+        while candidates:
+            last, _, shape = heapq.heappop(candidates)
+            shape_core = shape.get_core()
+            # If merger contains the shape, remove it from the list
+            if merger_core.contains(shape_core):
+                removed.append(shape)
+            # If the merger aligns with the shape, expand the merger and remove
+            # the shape from the list
+            elif merger_core.aligns(shape_core):
+                merger.bbox([shape])
+                merger_core.bbox([shape_core])
+                removed.append(shape)
+                find_candidates()
+        if removed:
+            removed_ids = set(id(x) for x in removed)
+            shape_list[:] = [x for x in shape_list if id(x) not in removed_ids]
+        return removed
 
 
     def find_pins(self, pin_name):
@@ -109,18 +166,29 @@ class router(router_tech):
         # Add these pins to the 'pins' dict
         self.pins[pin_name] = pin_set
         self.all_pins.update(pin_set)
+        # The pin grid needs to be built again with the new pins
+        self.pin_grid = None
 
 
     def find_blockages(self, name="blockage", shape_list=None):
         """ Find all blockages in the routing layers. """
         debug.info(4, "Finding blockages...")
 
-        for lpp in [self.vert_lpp, self.horiz_lpp]:
-            # If the list of shapes is given, don't get them from gdsMill
-            if shape_list is None:
-                shapes = self.layout.getAllShapes(lpp)
-            else:
-                shapes = shape_list
+        lpps = [self.vert_lpp, self.horiz_lpp]
+        # If the list of shapes is given, don't get them from gdsMill
+        if shape_list is None:
+            all_shapes = [self.layout.getAllShapes(lpp) for lpp in lpps]
+        else:
+            all_shapes = [shape_list] * len(lpps)
+        # Index the blockages so that only the shapes around a new blockage
+        # are checked for containment and merging
+        if self.blockage_grid is None:
+            count = len(self.blockages) + sum(len(x) for x in all_shapes)
+            self.blockage_grid = self.create_bbox_grid(count)
+            self.blockage_grid.bulk_load(self.blockages)
+        if self.pin_grid is None:
+            self.pin_grid = bbox_grid(self.all_pins)
+        for lpp, shapes in zip(lpps, all_shapes):
             for boundary in shapes:
                 if shape_list is not None:
                     if boundary.lpp != lpp:
@@ -136,12 +204,16 @@ class router(router_tech):
                 new_shape = self.inflate_shape(new_shape)
                 # Skip this blockage if it's contained by a pin or an existing
                 # blockage
-                if new_shape.core_contained_by_any(self.all_pins) or \
-                   new_shape.core_contained_by_any(self.blockages):
+                new_core = new_shape.get_core()
+                if new_shape.core_contained_by_any(self.pin_grid.iterate_shape(new_core)) or \
+                   new_shape.core_contained_by_any(self.blockage_grid.iterate_shape(new_core)):
                     continue
                 # Merge previous blockages into this one if possible
-                self.merge_shapes(new_shape, self.blockages)
+                removed = self.merge_shapes(new_shape, self.blockages, self.blockage_grid)
                 self.blockages.append(new_shape)
+                for shape in removed:
+                    self.blockage_grid.remove(shape)
+                self.blockage_grid.insert(new_shape)
 
 
     def find_vias(self, shape_list=None):
@@ -158,6 +230,10 @@ class router(router_tech):
             shapes = self.layout.getAllShapes(via_lpp)
         else:
             shapes = shape_list
+        # Index the vias so that only the vias around a new via are checked
+        if self.via_grid is None:
+            self.via_grid = self.create_bbox_grid(len(self.vias) + len(shapes))
+            self.via_grid.bulk_load(self.vias)
         for boundary in shapes:
             if shape_list is not None:
                 ll = boundary.ll()
@@ -169,9 +245,11 @@ class router(router_tech):
             rect = [ll, ur]
             new_shape = graph_shape("via", rect, valid_lpp)
             # Skip this via if it's contained by an existing via blockage
-            if new_shape.contained_by_any(self.vias):
+            if new_shape.contained_by_any(self.via_grid.iterate_shape(new_shape)):
                 continue
-            self.vias.append(self.inflate_shape(new_shape))
+            new_via = self.inflate_shape(new_shape)
+            self.vias.append(new_via)
+            self.via_grid.insert(new_via)
 
 
     def convert_vias(self):
@@ -214,6 +292,27 @@ class router(router_tech):
                         break
 
 
+    def create_bbox_grid(self, count):
+        """
+        Create an empty bbox grid with bins sized for about `count` shapes in
+        the routing area.
+        """
+
+        ll, ur = self.bbox
+        area = (ur.x - ll.x) * (ur.y - ll.y)
+        return bbox_grid(bin_size=math.sqrt(area / max(count, 1)))
+
+
+    def build_bbox_grids(self):
+        """
+        Build the bbox grids for all blockages and vias. The grids are used by
+        all graphs created by this router.
+        """
+
+        self.blockage_grid = bbox_grid(self.blockages)
+        self.via_grid = bbox_grid(self.vias)
+
+
     def inflate_shape(self, shape):
         """ Inflate a given shape with spacing rules. """
 
@@ -326,7 +425,7 @@ class router(router_tech):
                     self.add_object_info(blockage, "blockage{}++[{}]".format(self.get_zindex(blockage.lpp), blockage.name))
                 else:
                     self.add_object_info(blockage, "blockage{}[{}]".format(self.get_zindex(blockage.lpp), blockage.name))
-            for node in g.nodes:
+            for node in g.get_nodes():
                 offset = (node.center.x, node.center.y)
                 self.design.add_label(text="n{}".format(node.center.z),
                                       layer="text",
@@ -7,6 +7,7 @@ from openram import debug
 from openram.base.vector import vector
 from openram.base.vector3d import vector3d
 from openram import OPTS
+from openram import profiling
 from .graph import graph
 from .graph_shape import graph_shape
 from .router import router
@@ -26,12 +27,13 @@ class signal_escape_router(router):
         self.new_pins = {}
 
 
+    @profiling.traced(category="router")
     def route(self, pin_names):
         """ Route the given pins to the perimeter. """
         debug.info(1, "Running signal escape router...")
 
         # Prepare gdsMill to find pins and blockages
-        self.prepare_gds_reader()
+        self.prepare_layout()
 
         # Find pins to be routed
         for name in pin_names:
@@ -53,17 +55,21 @@ class signal_escape_router(router):
         for pin in self.all_pins:
             self.blockages.append(self.inflate_shape(pin))
 
+        # Build the spatial indices once for all routes
+        self.build_bbox_grids()
+
         # Route vdd and gnd
         routed_count = 0
         routed_max = len(pin_names)
         for source, target, _ in self.get_route_pairs(pin_names):
             # Change fake pin's name so the graph will treat it as routable
             target.name = source.name
-            # Create the graph
-            g = graph(self)
-            g.create_graph(source, target)
-            # Find the shortest path from source to target
-            path = g.find_shortest_path()
+            with profiling.span("signal_escape_router pair", "router"):
+                # Create the graph
+                g = graph(self)
+                g.create_graph(source, target)
+                # Find the shortest path from source to target
+                path = g.find_shortest_path()
             # If no path is found, throw an error
             if path is None:
                 self.write_debug_gds(gds_name="{}error.gds".format(OPTS.openram_temp), g=g, source=source, target=target)
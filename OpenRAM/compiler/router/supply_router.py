@@ -6,6 +6,7 @@
 from openram import debug
 from openram.base.vector import vector
 from openram import OPTS
+from openram import profiling
 from .graph import graph
 from .graph_shape import graph_shape
 from .router import router
@@ -28,6 +29,7 @@ class supply_router(router):
         self.new_pins = {}
 
 
+    @profiling.traced(category="router")
     def route(self, vdd_name="vdd", gnd_name="gnd"):
         """ Route the given pins in the given order. """
         debug.info(1, "Running router for {} and {}...".format(vdd_name, gnd_name))
@@ -37,7 +39,7 @@ class supply_router(router):
         self.gnd_name = gnd_name
 
         # Prepare gdsMill to find pins and blockages
-        self.prepare_gds_reader()
+        self.prepare_layout()
 
         # Find pins to be routed
         self.find_pins(vdd_name)
@@ -66,6 +68,9 @@ class supply_router(router):
         for pin in self.all_pins:
             self.blockages.append(self.inflate_shape(pin))
 
+        # Build the spatial indices once for all routes
+        self.build_bbox_grids()
+
         # Route vdd and gnd
         routed_count = 0
         routed_max = len(self.pins[vdd_name]) + len(self.pins[gnd_name])
@@ -73,11 +78,12 @@ class supply_router(router):
             pins = self.pins[pin_name]
             # Route closest pins according to the minimum spanning tree
             for source, target in self.get_mst_pairs(list(pins)):
-                # Create the graph
-                g = graph(self)
-                g.create_graph(source, target)
-                # Find the shortest path from source to target
-                path = g.find_shortest_path()
+                with profiling.span("supply_router pair", "router"):
+                    # Create the graph
+                    g = graph(self)
+                    g.create_graph(source, target)
+                    # Find the shortest path from source to target
+                    path = g.find_shortest_path()
                 # If no path is found, throw an error
                 if path is None:
                     self.write_debug_gds(gds_name="{}error.gds".format(OPTS.openram_temp), g=g, source=source, target=target)
@@ -11,6 +11,7 @@ import datetime
 from openram import debug
 from openram import sram_config as config
 from . import globals
+from openram.sram_factory import factory
 OPTS = globals.OPTS
 print_time = globals.print_time
 
@@ -61,6 +62,8 @@ class sram():
 
         if not OPTS.is_unit_test:
             print_time("SRAM creation", datetime.datetime.now(), start_time)
+        factory.print_stats(2)
+        self.s.print_instance_stats(2)
 
     def get_sp_name(self):
         if OPTS.use_pex:
@@ -73,6 +76,9 @@ class sram():
     def sp_write(self, name, lvs=False, trim=False):
         self.s.sp_write(name, lvs, trim)
 
+    def sp_write_all(self, netlists):
+        self.s.sp_write_all(netlists)
+
     def lef_write(self, name):
         self.s.lef_write(name)
 
@@ -107,11 +113,16 @@ class sram():
         from openram.characterizer import functional
         from openram.characterizer import delay
 
-        # Save the spice file
+        # Save the spice, trimmed spice and LVS files in one pass
         start_time = datetime.datetime.now()
         spname = OPTS.output_path + self.s.name + ".sp"
+        temp_trim_sp = "{0}trimmed.sp".format(OPTS.output_path)
+        lvsname = OPTS.output_path + self.s.name + ".lvs.sp"
         debug.print_raw("SP: Writing to {0}".format(spname))
-        self.sp_write(spname)
+        debug.print_raw("LVS: Writing to {0}".format(lvsname))
+        self.sp_write_all([(spname, False, False),
+                           (temp_trim_sp, False, True),
+                           (lvsname, True, False)])
 
         # Save a functional simulation file with default period
         functional(self.s,
@@ -135,10 +146,6 @@ class sram():
         d.write_delay_stimulus()
         print_time("DELAY", datetime.datetime.now(), start_time)
 
-        # Save trimmed spice file
-        temp_trim_sp = "{0}trimmed.sp".format(OPTS.output_path)
-        self.sp_write(temp_trim_sp, lvs=False, trim=True)
-
         if not OPTS.netlist_only:
             # Write the layout
             start_time = datetime.datetime.now()
@@ -160,11 +167,8 @@ class sram():
             self.lef_write(lefname)
             print_time("LEF", datetime.datetime.now(), start_time)
 
-        # Save the LVS file
+        # Save the LVS script (the LVS file was written with the spice file)
         start_time = datetime.datetime.now()
-        lvsname = OPTS.output_path + self.s.name + ".lvs.sp"
-        debug.print_raw("LVS: Writing to {0}".format(lvsname))
-        self.sp_write(lvsname, lvs=True)
         if not OPTS.netlist_only and OPTS.check_lvsdrc:
             verify.write_lvs_script(cell_name=self.s.name,
                                     gds_name=os.path.basename(gdsname),
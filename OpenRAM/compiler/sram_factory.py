@@ -6,7 +6,29 @@
 # All rights reserved.
 #
 import importlib
+from openram import debug
 from . import globals
+from . import module_cache
+from . import profiling
+
+
+def freeze_kwargs(value):
+    """
+    Return a hashable key that is equal for equal arguments. Lists, dicts
+    and sets are tagged so they don't match tuples with the same items.
+    """
+    if isinstance(value, dict):
+        return ("dict", frozenset((k, freeze_kwargs(v)) for k, v in value.items()))
+    elif isinstance(value, list):
+        return ("list", tuple(freeze_kwargs(x) for x in value))
+    elif isinstance(value, tuple):
+        return ("tuple", tuple(freeze_kwargs(x) for x in value))
+    elif isinstance(value, (set, frozenset)):
+        return ("set", frozenset(freeze_kwargs(x) for x in value))
+    else:
+        # Raises a TypeError for unhashable values
+        hash(value)
+        return value
 
 
 class sram_factory:
@@ -26,6 +48,20 @@ class sram_factory:
         self.module_indices = {}
         # A dictionary of instance lists indexed by module type
         self.objects = {}
+        # A dictionary of instances indexed by module type and then by
+        # the hashable (frozen) kwargs
+        self.object_index = {}
+        # Instances with unhashable kwargs indexed by module type which
+        # are compared one by one
+        self.unhashable_objects = {}
+        # The instances indexed by name
+        self.names = {}
+        # The module type and kwargs of each instance indexed by its id
+        self.object_records = {}
+        # The number of reused, cached and created instances indexed by module type
+        self.hits = {}
+        self.loads = {}
+        self.misses = {}
 
     def reset(self):
         """
@@ -71,11 +107,25 @@ class sram_factory:
         return (module_type, overridden)
 
     def is_duplicate_name(self, name):
-        for mods in self.objects.values():
-            for insts in mods:
-                if insts[1].name == name:
-                    return True
-        return False
+        return name in self.names
+
+    def find_object(self, module_type, kwargs):
+        """
+        Return the previous object of the type with the same kwargs and
+        the frozen kwargs (or None if they are unhashable).
+        """
+        try:
+            key = freeze_kwargs(kwargs)
+        except TypeError:
+            key = None
+            for (obj_kwargs, obj_item) in self.unhashable_objects[module_type]:
+                # Must have the same dictionary exactly (conservative)
+                if obj_kwargs == kwargs:
+                    return (key, obj_item)
+        else:
+            if key in self.object_index[module_type]:
+                return (key, self.object_index[module_type][key])
+        return (key, None)
 
     def create(self, module_type, module_name=None, **kwargs):
         """
@@ -97,6 +147,64 @@ class sram_factory:
         else:
             real_module_type = user_module_type
 
+        mod = self.load_module_type(real_module_type)
+
+        # Either retreive a previous object or create a new one
+        (key, obj_item) = self.find_object(real_module_type, kwargs)
+        if obj_item is not None:
+            self.hits[real_module_type] += 1
+            return obj_item
+
+        # Or load it from the module cache of previous runs
+        cache_key = None
+        if module_cache.is_cached_type(real_module_type):
+            cache_key = module_cache.get_module_key(real_module_type, module_name, kwargs)
+        if cache_key:
+            obj = self.load_cached_object(cache_key, kwargs)
+            if obj:
+                self.loads[real_module_type] += 1
+                return obj
+        self.misses[real_module_type] += 1
+
+        # If no prefered module name is provided, we generate one.
+        if not module_name:
+            # Use the default name for the first cell.
+            # This is especially for library cells so that the
+            # spice and gds files can be found.
+            # Subsequent objects will get unique names to help with GDS limitation.
+            if len(self.objects[real_module_type]) > 0:
+                # Create a unique name and increment the index
+                # (skipping the names of cached objects with or without the output name)
+                while True:
+                    module_name = "{0}_{1}".format(real_module_type,
+                                                   self.module_indices[real_module_type])
+                    self.module_indices[real_module_type] += 1
+                    prefixed_name = "{0}_{1}".format(globals.OPTS.output_name, module_name)
+                    if not self.is_duplicate_name(module_name) and not self.is_duplicate_name(prefixed_name):
+                        break
+            else:
+                module_name = real_module_type
+        else:
+            if self.is_duplicate_name(module_name):
+                raise ValueError("Modules with duplicate name are not allowed."
+                                 " '{}'".format(module_name))
+
+        # type_str = "type={}".format(real_module_type)
+        # name_str = "name={}".format(module_name)
+        # kwargs_str = "kwargs={}".format(str(kwargs))
+        # import debug
+        # debug.info(0, "New module:" + type_str + name_str + kwargs_str)
+        with profiling.span("create " + real_module_type, "module"):
+            obj = mod(name=module_name, **kwargs)
+        self.add_object(real_module_type, kwargs, key, obj)
+        if cache_key:
+            self.store_cached_object(cache_key, obj)
+        return obj
+
+    def load_module_type(self, real_module_type):
+        """
+        Return the class of the module type and load it the first time.
+        """
         # Either retrieve the already loaded module or load it
         try:
             # Load a cached version from previous usage
@@ -119,41 +227,99 @@ class sram_factory:
             self.modules[real_module_type] = mod
             self.module_indices[real_module_type] = 0
             self.objects[real_module_type] = []
+            self.object_index[real_module_type] = {}
+            self.unhashable_objects[real_module_type] = []
+            self.hits[real_module_type] = 0
+            self.loads[real_module_type] = 0
+            self.misses[real_module_type] = 0
+        return mod
 
-        # Either retreive a previous object or create a new one
-        for obj in self.objects[real_module_type]:
-            (obj_kwargs, obj_item) = obj
-            # Must have the same dictionary exactly (conservative)
-            if obj_kwargs == kwargs:
-                return obj_item
+    def add_object(self, real_module_type, kwargs, key, obj):
+        """ Add a new instance so that it is reused for the same kwargs. """
+        self.objects[real_module_type].append((kwargs, obj))
+        if key is None:
+            self.unhashable_objects[real_module_type].append((kwargs, obj))
+        else:
+            self.object_index[real_module_type][key] = obj
+        self.names[obj.name] = obj
+        self.object_records[id(obj)] = (real_module_type, kwargs)
 
-        # If no prefered module name is provided, we generate one.
-        if not module_name:
-            # Use the default name for the first cell.
-            # This is especially for library cells so that the
-            # spice and gds files can be found.
-            # Subsequent objects will get unique names to help with GDS limitation.
-            if len(self.objects[real_module_type]) > 0:
-                # Create a unique name and increment the index
-                module_name = "{0}_{1}".format(real_module_type,
-                                               self.module_indices[real_module_type])
-                self.module_indices[real_module_type] += 1
+    def get_records(self, obj):
+        """
+        Return the (module type, kwargs, module) of the module and its
+        submodules. The modules that weren't created by the factory (e.g.
+        the transistors of pbitcell) have no type and kwargs and are only
+        shared with the module that created them.
+        """
+        records = []
+        for submod in module_cache.get_submodules(obj):
+            if id(submod) in self.object_records:
+                (real_module_type, kwargs) = self.object_records[id(submod)]
             else:
-                module_name = real_module_type
-        else:
-            if self.is_duplicate_name(module_name):
-                raise ValueError("Modules with duplicate name are not allowed."
-                                 " '{}'".format(module_name))
+                debug.info(3, "{0} has a module that is not a factory module: {1}".format(obj.name, submod.name))
+                (real_module_type, kwargs) = (None, None)
+            records.append((real_module_type, kwargs, submod))
+        return records
 
-        # type_str = "type={}".format(real_module_type)
-        # name_str = "name={}".format(module_name)
-        # kwargs_str = "kwargs={}".format(str(kwargs))
-        # import debug
-        # debug.info(0, "New module:" + type_str + name_str + kwargs_str)
-        obj = mod(name=module_name, **kwargs)
-        self.objects[real_module_type].append((kwargs, obj))
+    def merge_object(self, obj, records, module_kwargs):
+        """
+        Add a module of another run. Its submodules are replaced by the
+        instances of this run with the same kwargs and the others are added
+        to the factory. The module itself is indexed by the kwargs of this
+        run. The module isn't merged and None is returned when a name is
+        already used.
+        """
+        replacements = {}
+        new_records = []
+        private_mods = []
+        for (index, (real_module_type, kwargs, submod)) in enumerate(records):
+            if real_module_type is None:
+                # The module isn't in the factory, but its submodules can be
+                private_mods.append(submod)
+                continue
+            if index == 0:
+                kwargs = module_kwargs
+            self.load_module_type(real_module_type)
+            (key, obj_item) = self.find_object(real_module_type, kwargs)
+            if obj_item is not None:
+                if index == 0:
+                    # An earlier module is the same
+                    return obj_item
+                replacements[id(submod)] = obj_item
+                continue
+            new_records.append((real_module_type, kwargs, key, submod))
+
+        new_names = set()
+        for (real_module_type, kwargs, key, submod) in new_records:
+            if self.is_duplicate_name(submod.name) or submod.name in new_names:
+                # A different module of this run has the name
+                debug.info(2, "Module {0} has duplicate name {1}".format(obj.name, submod.name))
+                return None
+            new_names.add(submod.name)
+
+        module_cache.replace_modules([x[2] for x in records], replacements)
+        # The layouts include the structures of the replaced and renamed modules
+        module_cache.reset_layouts([x[3] for x in new_records] + private_mods)
+        # Like create, the module is added after the modules it created
+        for (real_module_type, kwargs, key, submod) in new_records[1:] + new_records[:1]:
+            self.add_object(real_module_type, kwargs, key, submod)
         return obj
 
+    def load_cached_object(self, cache_key, module_kwargs):
+        """
+        Return the cached instance of a previous run or None.
+        """
+        entry = module_cache.load_module_entry(cache_key)
+        if not entry:
+            return None
+        (obj, output_name, records) = entry
+        module_cache.rename_modules(module_cache.get_submodules(obj), output_name)
+        return self.merge_object(obj, records, module_kwargs)
+
+    def store_cached_object(self, cache_key, obj):
+        """ Save a new instance and the records of its submodules in the module cache. """
+        module_cache.store_module_entry(cache_key, obj, self.get_records(obj))
+
     def get_mods(self, module_type):
         """Returns list of all objects of module name's type."""
         if hasattr(globals.OPTS, module_type):
@@ -167,6 +333,17 @@ class sram_factory:
             mods = []
         return mods
 
+    def print_stats(self, level=1):
+        """ Print the number of reused and created modules of each type. """
+        debug.info(level, "Module factory: {0} reused, {1} cached, {2} created".format(sum(self.hits.values()),
+                                                                                       sum(self.loads.values()),
+                                                                                       sum(self.misses.values())))
+        for module_type in sorted(self.misses, key=lambda x: -(self.hits[x] + self.loads[x] + self.misses[x])):
+            debug.info(level, "  {0}: {1} reused, {2} cached, {3} created".format(module_type,
+                                                                                self.hits[module_type],
+                                                                                self.loads[module_type],
+                                                                                self.misses[module_type]))
+
 
 # Make a factory
 factory = sram_factory()
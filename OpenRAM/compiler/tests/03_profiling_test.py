@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+# See LICENSE for licensing information.
+#
+# Copyright (c) 2016-2024 Regents of the University of California and The Board
+# of Regents for the Oklahoma Agricultural and Mechanical College
+# (acting for and on behalf of Oklahoma State University)
+# All rights reserved.
+#
+import sys, os
+import json
+import unittest
+from testutils import *
+
+import openram
+from openram import debug
+from openram.sram_factory import factory
+from openram import OPTS
+
+
+class profiling_test(openram_test):
+
+    def runTest(self):
+        config_file = "{}/tests/configs/config".format(os.getenv("OPENRAM_HOME"))
+        openram.init_openram(config_file, is_unit_test=True)
+        from openram import profiling
+
+        debug.info(2, "Testing that no spans are recorded without tracing")
+        profiling.reset_spans()
+        with profiling.span("disabled"):
+            pass
+        self.assertEqual(profiling.spans, [])
+
+        debug.info(2, "Testing the spans of nested and recursive steps")
+        OPTS.write_trace = True
+
+        @profiling.traced("count_down", "test")
+        def count_down(n):
+            if n > 0:
+                count_down(n - 1)
+
+        with profiling.span("outer", "test"):
+            count_down(2)
+            a = factory.create(module_type="pinv")
+            a.gds_write(OPTS.openram_temp + "pinv.gds")
+
+        stats = {x[0]: x for x in profiling.get_span_stats()}
+        self.assertEqual(stats["outer"][1], 1)
+        # Only the outermost call is counted and the recursive calls are included in it
+        self.assertEqual(stats["count_down"][1:3], (1, 2))
+        self.assertEqual(stats["create pinv"][1], 1)
+        self.assertEqual(stats["gds_write"][1], 1)
+        count_down_spans = [x for x in profiling.spans if x[0] == "count_down"]
+        self.assertAlmostEqual(stats["count_down"][3], count_down_spans[-1][3] - count_down_spans[-1][2])
+        self.assertGreaterEqual(stats["outer"][3], stats["create pinv"][3] + stats["gds_write"][3])
+
+        debug.info(2, "Testing the trace file")
+        trace_name = OPTS.openram_temp + "test.trace.json"
+        profiling.write_trace(trace_name)
+        with open(trace_name, "r") as f:
+            events = json.load(f)["traceEvents"]
+        self.assertEqual(len(events), len(profiling.spans))
+        self.assertTrue(all(x["ph"] == "X" and x["dur"] >= 0 for x in events))
+        self.assertIn("peak_rss_mb", events[0]["args"])
+
+        OPTS.write_trace = False
+        profiling.reset_spans()
+        openram.end_openram()
+
+
+# run the test from the command line
+if __name__ == "__main__":
+    (OPTS, args) = openram.parse_args()
+    del sys.argv[1:]
+    header(__file__, OPTS.tech_name)
+    unittest.main(testRunner=debugTestRunner())
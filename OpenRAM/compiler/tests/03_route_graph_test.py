@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+# See LICENSE for licensing information.
+#
+# Copyright (c) 2016-2024 Regents of the University of California and The Board
+# of Regents for the Oklahoma Agricultural and Mechanical College
+# (acting for and on behalf of Oklahoma State University)
+# All rights reserved.
+#
+import sys, os
+import random
+import unittest
+from testutils import *
+
+import openram
+from openram import debug
+from openram import OPTS
+
+
+class route_graph_test(openram_test):
+
+    def make_graph(self, x_list, y_list, blocked):
+        """ Return a routing graph of the grid without the blocked node ids. """
+        from openram.router.graph import graph
+        g = graph(None)
+        g.x_list = x_list
+        g.y_list = y_list
+        g.y_len = len(y_list)
+        g.neighbor_index = [0]
+        g.neighbor_ids = []
+        for x_index in range(len(x_list)):
+            for y_index in range(len(y_list)):
+                for z in range(2):
+                    neighbors = []
+                    if g.get_node_ids(x_index, y_index, z) not in blocked:
+                        neighbors = [g.get_node_ids(x_index + dx, y_index + dy, z)
+                                     for (dx, dy) in [(-1, 0), (1, 0), (0, -1), (0, 1)]
+                                     if 0 <= x_index + dx < len(x_list) and 0 <= y_index + dy < len(y_list)]
+                        neighbors.append(g.get_node_ids(x_index, y_index, 1 - z))
+                    g.neighbor_ids.extend(x for x in neighbors if x not in blocked)
+                    g.neighbor_index.append(len(g.neighbor_ids))
+        return g
+
+    def get_path_cost(self, g, path):
+        """ Return the cost of a path like the search computes it. """
+        nodes = [g.get_node_ids(g.x_list.index(x.center.x), g.y_list.index(x.center.y), int(x.center.z))
+                 for x in path]
+        for (prev, node) in zip(nodes, nodes[1:]):
+            self.assertIn(node, g.get_neighbors(prev))
+        return sum(g.get_edge_cost(nodes[i], nodes[i + 1], nodes[i - 1] if i > 0 else None)
+                   for i in range(len(nodes) - 1))
+
+    def runTest(self):
+        config_file = "{}/tests/configs/config".format(os.getenv("OPENRAM_HOME"))
+        openram.init_openram(config_file, is_unit_test=True)
+        from openram.tech import drc
+
+        random.seed(1)
+        for trial in range(20):
+            debug.info(2, "Testing the bidirectional search of random graph {}".format(trial))
+            x_list = sorted(random.sample(range(100), 10))
+            y_list = sorted(random.sample(range(100), 8))
+            num_nodes = len(x_list) * len(y_list) * 2
+            blocked = set(random.sample(range(num_nodes), num_nodes // 5))
+            g = self.make_graph(x_list, y_list, blocked)
+            open_nodes = [x for x in range(num_nodes) if x not in blocked]
+            g.source_nodes = random.sample(open_nodes, 2)
+            g.target_nodes = random.sample([x for x in open_nodes if x not in g.source_nodes], 2)
+
+            OPTS.route_bidirectional = False
+            path = g.find_shortest_path()
+            OPTS.route_bidirectional = True
+            bidirectional_path = g.find_shortest_path()
+            if path is None:
+                self.assertIsNone(bidirectional_path)
+                continue
+            # The paths go from a source to a target
+            for p in [path, bidirectional_path]:
+                self.assertIn(g.get_node_ids(x_list.index(p[0].center.x), y_list.index(p[0].center.y), int(p[0].center.z)),
+                              g.source_nodes)
+                self.assertIn(g.get_node_ids(x_list.index(p[-1].center.x), y_list.index(p[-1].center.y), int(p[-1].center.z)),
+                              g.target_nodes)
+            # The costs only differ by the dog-leg cost where the searches meet
+            self.assertAlmostEqual(self.get_path_cost(g, bidirectional_path),
+                                   self.get_path_cost(g, path),
+                                   delta=drc["grid"] + 1e-9)
+
+        OPTS.route_bidirectional = False
+        openram.end_openram()
+
+
+# run the test from the command line
+if __name__ == "__main__":
+    (OPTS, args) = openram.parse_args()
+    del sys.argv[1:]
+    header(__file__, OPTS.tech_name)
+    unittest.main(testRunner=debugTestRunner())
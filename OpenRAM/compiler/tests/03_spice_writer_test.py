@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+# See LICENSE for licensing information.
+#
+# Copyright (c) 2016-2024 Regents of the University of California and The Board
+# of Regents for the Oklahoma Agricultural and Mechanical College
+# (acting for and on behalf of Oklahoma State University)
+# All rights reserved.
+#
+import sys, os
+import unittest
+import textwrap
+from testutils import *
+
+import openram
+from openram import debug
+from openram.sram_factory import factory
+from openram import OPTS
+
+
+class spice_writer_test(openram_test):
+
+    def runTest(self):
+        config_file = "{}/tests/configs/config".format(os.getenv("OPENRAM_HOME"))
+        openram.init_openram(config_file, is_unit_test=True)
+        from openram.base.hierarchy_spice import wrap_words
+
+        debug.info(2, "Testing the spice line wrapping")
+        words = ["bl_{}".format(i) for i in range(40)] + ["x" * 70, "y" * 75, "z"]
+        for i in range(len(words)):
+            self.assertEqual(wrap_words(words[:i]), textwrap.wrap(" ".join(words[:i])))
+
+        debug.info(2, "Testing several netlists written in one pass")
+        a = factory.create(module_type="bitcell_array", cols=4, rows=4)
+        netlists = [("{0}{1}.sp".format(OPTS.openram_temp, name), lvs, trim)
+                    for (name, lvs, trim) in [("sim", False, False), ("trim", False, True), ("lvs", True, False)]]
+        a.sp_write_all([(name + ".all", lvs, trim) for (name, lvs, trim) in netlists])
+        for (name, lvs, trim) in netlists:
+            a.sp_write(name, lvs=lvs, trim=trim)
+            self.assertTrue(self.isdiff(name, name + ".all"))
+
+        openram.end_openram()
+
+
+# run the test from the command line
+if __name__ == "__main__":
+    (OPTS, args) = openram.parse_args()
+    del sys.argv[1:]
+    header(__file__, OPTS.tech_name)
+    unittest.main(testRunner=debugTestRunner())
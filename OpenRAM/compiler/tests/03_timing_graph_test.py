@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+# See LICENSE for licensing information.
+#
+# Copyright (c) 2016-2024 Regents of the University of California and The Board
+# of Regents for the Oklahoma Agricultural and Mechanical College
+# (acting for and on behalf of Oklahoma State University)
+# All rights reserved.
+#
+import sys, os
+import unittest
+from testutils import *
+
+import openram
+
+
+class timing_graph_test(openram_test):
+
+    def runTest(self):
+        config_file = "{}/tests/configs/config".format(os.getenv("OPENRAM_HOME"))
+        openram.init_openram(config_file, is_unit_test=True)
+        from openram.base import timing_graph
+
+        # A chain of stages with a reconvergent branch, a latch feedback
+        # loop and a dead end
+        g = timing_graph()
+        stage_delays = {("clk", "a"): 1,
+                        ("a", "b"): 2,
+                        ("a", "c"): 5,
+                        ("b", "d"): 2,
+                        ("c", "d"): 1,
+                        ("d", "q"): 1,
+                        ("q", "qb"): 1,
+                        ("qb", "q"): 1,
+                        ("q", "dout"): 3,
+                        ("b", "dead"): 7,
+                        ("vdd", "a"): 1}
+        for (src, dest), delay in stage_delays.items():
+            g.add_edge(src, dest, delay)
+
+        paths = g.get_all_paths("CLK", "DOUT", reduce_paths=False)
+        self.assertEqual(sorted(paths), [["clk", "a", "b", "d", "q", "dout"],
+                                         ["clk", "a", "c", "d", "q", "dout"]])
+
+        edge_weight = lambda src, dest, edge_mod: edge_mod
+        (path, weight) = g.get_critical_path("clk", "dout", edge_weight)
+        self.assertEqual(path, ["clk", "a", "c", "d", "q", "dout"])
+        self.assertEqual(weight, 11)
+
+        worst_paths = g.get_worst_paths("clk", "dout", 5, edge_weight)
+        self.assertEqual(worst_paths, [(["clk", "a", "c", "d", "q", "dout"], 11),
+                                       (["clk", "a", "b", "d", "q", "dout"], 9)])
+
+        # Without weights, the path with the most stages is the longest
+        self.assertEqual(len(g.get_critical_path("clk", "dout")[0]), 6)
+        self.assertEqual(g.get_worst_paths("clk", "dead", 2), [(["clk", "a", "b", "dead"], 3)])
+        self.assertEqual(g.get_worst_paths("dout", "clk", 2), [])
+
+        openram.end_openram()
+
+
+# run the test from the command line
+if __name__ == "__main__":
+    (OPTS, args) = openram.parse_args()
+    del sys.argv[1:]
+    header(__file__, OPTS.tech_name)
+    unittest.main(testRunner=debugTestRunner())
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+# See LICENSE for licensing information.
+#
+# Copyright (c) 2016-2024 Regents of the University of California and The Board
+# of Regents for the Oklahoma Agricultural and Mechanical College
+# (acting for and on behalf of Oklahoma State University)
+# All rights reserved.
+#
+import sys, os
+import time
+import unittest
+from testutils import *
+
+import openram
+from openram import debug
+from openram.sram_factory import factory
+from openram import OPTS
+
+
+class verify_cache_test(openram_test):
+
+    def runTest(self):
+        config_file = "{}/tests/configs/config".format(os.getenv("OPENRAM_HOME"))
+        openram.init_openram(config_file, is_unit_test=True)
+        OPTS.use_verify_cache = True
+        OPTS.verify_cache_path = OPTS.openram_temp + "verify_cache"
+        from openram.verify import verify_cache
+        from openram.verify import check_queue
+
+        debug.info(2, "Testing the cached DRC/LVS results of an inverter")
+        a = factory.create(module_type="pinv")
+        a.sp_write(OPTS.openram_temp + "pinv.sp", lvs=True)
+        a.gds_write(OPTS.openram_temp + "pinv.gds")
+
+        key = verify_cache.get_verify_key(a.cell_name, "pinv.gds", "pinv.sp", False)
+        self.assertIsNone(verify_cache.load_verify_entry(key))
+        # Failures are always checked again
+        verify_cache.store_verify_entry(key, 1, 0)
+        self.assertIsNone(verify_cache.load_verify_entry(key))
+        verify_cache.store_verify_entry(key, 0, 0)
+        self.assertEqual(verify_cache.load_verify_entry(key), (0, 0))
+        self.assertNotEqual(verify_cache.get_verify_key(a.cell_name, "pinv.gds", "pinv.sp", True), key)
+
+        # A clean module doesn't run the tools
+        self.assertEqual(check_queue.run_drc_lvs(a.cell_name, "pinv.gds", "pinv.sp"), (0, 0))
+
+        # The GDS of a later run has different dates
+        with open(OPTS.openram_temp + "pinv.gds", "rb") as f:
+            gds_data = f.read()
+        time.sleep(1.1)
+        a.gds_write(OPTS.openram_temp + "pinv.gds")
+        with open(OPTS.openram_temp + "pinv.gds", "rb") as f:
+            self.assertNotEqual(f.read(), gds_data)
+        self.assertEqual(verify_cache.get_verify_key(a.cell_name, "pinv.gds", "pinv.sp", False), key)
+        self.assertEqual(check_queue.run_drc_lvs(a.cell_name, "pinv.gds", "pinv.sp"), (0, 0))
+
+        # The same check in a worker process with its own directory
+        OPTS.num_threads = 2
+        self.assertTrue(check_queue.use_check_queue())
+        temp_path = check_queue.get_check_path(a.cell_name)
+        a.sp_write(temp_path + "pinv.sp", lvs=True)
+        a.gds_write(temp_path + "pinv.gds")
+        check_queue.submit_drc_lvs(a, temp_path, "pinv.gds", "pinv.sp")
+        check_queue.wait_for_drc_lvs()
+        self.assertEqual((a.drc_errors, a.lvs_errors), (0, 0))
+        self.assertIsNone(check_queue.check_pool)
+
+        openram.end_openram()
+
+
+# run the test from the command line
+if __name__ == "__main__":
+    (OPTS, args) = openram.parse_args()
+    del sys.argv[1:]
+    header(__file__, OPTS.tech_name)
+    unittest.main(testRunner=debugTestRunner())
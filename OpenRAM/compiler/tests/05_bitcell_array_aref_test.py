@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+# See LICENSE for licensing information.
+#
+# Copyright (c) 2016-2024 Regents of the University of California and The Board
+# of Regents for the Oklahoma Agricultural and Mechanical College
+# (acting for and on behalf of Oklahoma State University)
+# All rights reserved.
+#
+import sys, os
+import unittest
+from testutils import *
+
+import openram
+from openram import debug
+from openram.sram_factory import factory
+from openram import OPTS
+
+
+class bitcell_array_aref_test(openram_test):
+
+    def runTest(self):
+        config_file = "{}/tests/configs/config".format(os.getenv("OPENRAM_HOME"))
+        openram.init_openram(config_file, is_unit_test=True)
+        from openram.gdsMill import gdsMill
+        from openram.tech import GDS
+
+        debug.info(2, "Testing the GDS arrays of a 4x4 array")
+        a = factory.create(module_type="bitcell_array", cols=4, rows=4)
+
+        def read_placements(filename):
+            layout = gdsMill.VlsiLayout(units=GDS["unit"])
+            reader = gdsMill.Gds2reader(layout)
+            reader.loadFromFile(filename)
+            placements = sorted((name.rstrip("\x00"),
+                                 tuple(origin.flatten().round(3)),
+                                 tuple(u.flatten()),
+                                 tuple(v.flatten())) for (name, origin, u, v) in layout.xyTree)
+            return (layout, placements)
+
+        a.gds_write(OPTS.openram_temp + "aref.gds")
+        (layout, aref_placements) = read_placements(OPTS.openram_temp + "aref.gds")
+        structure = layout.structures[layout.rootStructureName]
+        self.assertEqual(len(structure.srefs), 0)
+        self.assertEqual(sum(x.colRow[0] * x.colRow[1] for x in structure.arefs), 16)
+
+        # The cells are placed like the references of each instance
+        a.inst_arrays = []
+        a.gds_write(OPTS.openram_temp + "sref.gds")
+        (layout, sref_placements) = read_placements(OPTS.openram_temp + "sref.gds")
+        self.assertEqual(len(layout.structures[layout.rootStructureName].srefs), 16)
+        self.assertEqual(aref_placements, sref_placements)
+
+        openram.end_openram()
+
+
+# run the test from the command line
+if __name__ == "__main__":
+    (OPTS, args) = openram.parse_args()
+    del sys.argv[1:]
+    header(__file__, OPTS.tech_name)
+    unittest.main(testRunner=debugTestRunner())
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+# See LICENSE for licensing information.
+#
+# Copyright (c) 2016-2024 Regents of the University of California and The Board
+# of Regents for the Oklahoma Agricultural and Mechanical College
+# (acting for and on behalf of Oklahoma State University)
+# All rights reserved.
+#
+import sys, os
+import unittest
+from testutils import *
+
+import openram
+from openram import debug
+from openram.sram_factory import factory
+from openram import OPTS
+
+
+class gds_load_structures_test(openram_test):
+
+    def runTest(self):
+        config_file = "{}/tests/configs/config".format(os.getenv("OPENRAM_HOME"))
+        openram.init_openram(config_file, is_unit_test=True)
+        from openram.gdsMill import gdsMill
+        from openram.tech import GDS
+
+        def get_elements(structure):
+            """ Return the elements of a structure to compare them. """
+            return [[vars(x) for x in elements]
+                    for elements in [structure.boundaries, structure.paths, structure.srefs,
+                                     structure.arefs, structure.texts, structure.nodes,
+                                     structure.boxes]]
+
+        def get_references(layout, name):
+            """ Return the structure and all the structures it references. """
+            names = set()
+            to_visit = [name]
+            while to_visit:
+                name = to_visit.pop()
+                if name not in names:
+                    names.add(name)
+                    structure = layout.structures[name]
+                    to_visit += [x.sName for x in structure.srefs] + [x.aName for x in structure.arefs]
+            return names
+
+        debug.info(2, "Testing the GDS load of the structures of a buffer")
+        a = factory.create(module_type="pbuf", size=4)
+        filename = OPTS.openram_temp + "pbuf.gds"
+        a.gds_write(filename)
+
+        full_layout = gdsMill.VlsiLayout(units=GDS["unit"])
+        gdsMill.Gds2reader(full_layout).loadFromFile(filename)
+        # Every structure is indexed by its name
+        reader = gdsMill.Gds2reader(gdsMill.VlsiLayout(units=GDS["unit"]))
+        self.assertEqual(sorted(reader.indexFile(filename)), sorted(full_layout.structures))
+
+        # A structure with references and one without them
+        root_structure = full_layout.structures[full_layout.rootStructureName]
+        sub_name = root_structure.srefs[0].sName
+        self.assertGreater(len(get_references(full_layout, sub_name)), 1)
+        leaf_name = [x for x in full_layout.structures
+                     if len(get_references(full_layout, x)) == 1][0]
+        for name in [full_layout.rootStructureName, sub_name, leaf_name]:
+            layout = gdsMill.VlsiLayout(units=GDS["unit"])
+            gdsMill.Gds2reader(layout).loadFromFile(filename, structureNames=[name])
+            # Only the structure and the structures that it references are read
+            self.assertEqual(set(layout.structures), get_references(full_layout, name))
+            self.assertEqual(layout.rootStructureName, name)
+            for structure_name in layout.structures:
+                self.assertEqual(get_elements(layout.structures[structure_name]),
+                                 get_elements(full_layout.structures[structure_name]))
+            # The pins of the structure are found like in a full load
+            if name == full_layout.rootStructureName:
+                self.assertEqual(layout.pins, full_layout.pins)
+
+        openram.end_openram()
+
+
+# run the test from the command line
+if __name__ == "__main__":
+    (OPTS, args) = openram.parse_args()
+    del sys.argv[1:]
+    header(__file__, OPTS.tech_name)
+    unittest.main(testRunner=debugTestRunner())
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+# See LICENSE for licensing information.
+#
+# Copyright (c) 2016-2024 Regents of the University of California and The Board
+# of Regents for the Oklahoma Agricultural and Mechanical College
+# (acting for and on behalf of Oklahoma State University)
+# All rights reserved.
+#
+import sys, os
+import random
+import unittest
+from testutils import *
+
+import openram
+from openram import debug
+from openram import OPTS
+
+
+class gds_region_shapes_test(openram_test):
+
+    def runTest(self):
+        config_file = "{}/tests/configs/config".format(os.getenv("OPENRAM_HOME"))
+        openram.init_openram(config_file, is_unit_test=True)
+        from openram.gdsMill import gdsMill
+        lpp = (1, 0)
+
+        debug.info(2, "Testing the shapes of rotated and mirrored placements")
+        # A cell with two rectangles and an L shaped polygon
+        cell = gdsMill.VlsiLayout(name="cell")
+        cell.addBox(layerNumber=lpp[0], purposeNumber=lpp[1], offsetInMicrons=(0, 0), width=1, height=2)
+        cell.addBox(layerNumber=lpp[0], purposeNumber=lpp[1], offsetInMicrons=(3, 1), width=2, height=0.5)
+        polygon = gdsMill.GdsBoundary()
+        polygon.drawingLayer = lpp[0]
+        polygon.purposeLayer = lpp[1]
+        polygon.coordinates = [(0, 3000), (2000, 3000), (2000, 3500), (500, 3500), (500, 5000), (0, 5000), (0, 3000)]
+        cell.structures[cell.rootStructureName].boundaries.append(polygon)
+
+        # A rotated cell in a block that is placed with each transformation
+        block = gdsMill.VlsiLayout(name="block")
+        block.addInstance(cell, offsetInMicrons=(1, 1), rotate=90)
+        top = gdsMill.VlsiLayout(name="top")
+        transformations = [(None, None), ("MX", None), ("MY", None), ("XY", None),
+                           (None, 90), (None, 270), ("MX", 90), ("MX", 270)]
+        for (index, (mirror, rotate)) in enumerate(transformations):
+            offset = (20 * (index % 4), 20 * (index // 4))
+            top.addInstance(cell, offsetInMicrons=offset, mirror=mirror, rotate=rotate)
+            top.addInstance(block, offsetInMicrons=(offset[0] + 10, offset[1] + 10), mirror=mirror, rotate=rotate)
+        top.initialize()
+
+        # The shapes are the same as transforming each placement
+        shapes = top.getAllShapes(lpp)
+        placed_shapes = set()
+        for tree_unit in top.xyTree:
+            placed_shapes.update(top.getShapesInStructure(lpp, tree_unit))
+        self.assertEqual(sorted(shapes), sorted([x * top.units[0] for x in shape] for shape in placed_shapes))
+        self.assertEqual(len(shapes), 3 * 2 * len(transformations))
+
+        debug.info(2, "Testing the shapes in regions")
+
+        def overlaps(shape, region):
+            """ Return whether the bounding box of a shape overlaps the region. """
+            xs = shape[0::2]
+            ys = shape[1::2]
+            return min(xs) <= region[2] and max(xs) >= region[0] and min(ys) <= region[3] and max(ys) >= region[1]
+
+        random.seed(1)
+        regions = [[-100, -100, 100, 100], [1000, 1000, 2000, 2000], [0, 0, 0, 0]]
+        # Small regions near the shapes
+        for shape in random.sample(shapes, 30):
+            (x, y) = (random.choice(shape[0::2]) - 1, random.choice(shape[1::2]) - 1)
+            regions.append([x, y, x + random.uniform(0, 2), y + random.uniform(0, 2)])
+        num_partial = 0
+        for region in regions:
+            region_shapes = top.getAllShapes(lpp, region)
+            self.assertEqual(sorted(region_shapes), sorted(x for x in shapes if overlaps(x, region)))
+            if 0 < len(region_shapes) < len(shapes):
+                num_partial += 1
+        # The regions include some of the shapes
+        self.assertGreater(num_partial, 20)
+
+        openram.end_openram()
+
+
+# run the test from the command line
+if __name__ == "__main__":
+    (OPTS, args) = openram.parse_args()
+    del sys.argv[1:]
+    header(__file__, OPTS.tech_name)
+    unittest.main(testRunner=debugTestRunner())
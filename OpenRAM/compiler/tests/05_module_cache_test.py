@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+# See LICENSE for licensing information.
+#
+# Copyright (c) 2016-2024 Regents of the University of California and The Board
+# of Regents for the Oklahoma Agricultural and Mechanical College
+# (acting for and on behalf of Oklahoma State University)
+# All rights reserved.
+#
+import sys, os
+import unittest
+from testutils import *
+
+import openram
+from openram import debug
+from openram.sram_factory import factory
+from openram import OPTS
+
+
+class module_cache_test(openram_test):
+
+    def runTest(self):
+        config_file = "{}/tests/configs/config".format(os.getenv("OPENRAM_HOME"))
+        openram.init_openram(config_file, is_unit_test=True)
+        OPTS.use_module_cache = True
+        OPTS.module_cache_path = OPTS.openram_temp + "module_cache"
+
+        debug.info(2, "Testing a 4x4 array from the module cache")
+
+        a = factory.create(module_type="bitcell_array", cols=4, rows=4)
+        a.sp_write(OPTS.openram_temp + "generated.sp")
+
+        # A new factory, like in a later run, loads the array instead
+        factory.reset()
+        b = factory.create(module_type="bitcell_array", cols=4, rows=4)
+        b.sp_write(OPTS.openram_temp + "cached.sp")
+        self.assertEqual(factory.loads["bitcell_array"], 1)
+        self.assertEqual(factory.misses["bitcell_array"], 0)
+        self.assertIsNot(a, b)
+        self.assertTrue(self.isnetlistdiff(OPTS.openram_temp + "generated.sp",
+                                           OPTS.openram_temp + "cached.sp"))
+
+        # The submodules are shared with the rest of the run
+        self.assertIs(factory.create(module_type=OPTS.bitcell), b.cell)
+
+        debug.info(2, "Testing a replica array whose replica column already exists")
+        c = factory.create(module_type="replica_bitcell_array", cols=4, rows=4, rbl=[1, 0], left_rbl=[0])
+        factory.reset()
+        column = factory.create(module_type="replica_column", rows=4, rbl=[1, 0], column_offset=1, replica_bit=0)
+        d = factory.create(module_type="replica_bitcell_array", cols=4, rows=4, rbl=[1, 0], left_rbl=[0])
+        self.assertEqual(factory.loads["replica_bitcell_array"], 1)
+        self.assertIsNot(c, d)
+        # The modules of the dict of replica columns are the ones of the instances
+        self.assertIs(d.replica_columns[0], column)
+        self.assertIn(column, [x.mod for x in d.insts])
+
+        debug.info(2, "Testing the keys of the module options")
+        from openram import module_cache
+        self.assertIsNotNone(module_cache.get_module_key("bitcell_array", None, dict(cols=4, rows=4)))
+        # An option that can't be compared between runs disables the cache
+        OPTS.unkeyed_option = bytearray(b"unkeyed")
+        self.assertIsNone(module_cache.get_module_key("bitcell_array", None, dict(cols=4, rows=4)))
+        del OPTS.unkeyed_option
+
+        openram.end_openram()
+
+
+# run the test from the command line
+if __name__ == "__main__":
+    (OPTS, args) = openram.parse_args()
+    del sys.argv[1:]
+    header(__file__, OPTS.tech_name)
+    unittest.main(testRunner=debugTestRunner())
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+# See LICENSE for licensing information.
+#
+# Copyright (c) 2016-2024 Regents of the University of California and The Board
+# of Regents for the Oklahoma Agricultural and Mechanical College
+# (acting for and on behalf of Oklahoma State University)
+# All rights reserved.
+#
+import sys, os
+import unittest
+from testutils import *
+
+import openram
+from openram import debug
+from openram.sram_factory import factory, freeze_kwargs
+from openram import OPTS
+
+
+class unhashable_value():
+    __hash__ = None
+
+    def __eq__(self, other):
+        return isinstance(other, unhashable_value)
+
+
+class sram_factory_test(openram_test):
+
+    def runTest(self):
+        config_file = "{}/tests/configs/config".format(os.getenv("OPENRAM_HOME"))
+        openram.init_openram(config_file, is_unit_test=True)
+
+        debug.info(2, "Testing the keys of the kwargs")
+        self.assertEqual(freeze_kwargs({"a": [1, 2], "b": {"c": 3}}),
+                         freeze_kwargs({"b": {"c": 3}, "a": [1, 2]}))
+        self.assertNotEqual(freeze_kwargs({"a": [1, 2]}), freeze_kwargs({"a": (1, 2)}))
+        self.assertNotEqual(freeze_kwargs({"a": [1, 2]}), freeze_kwargs({"a": [2, 1]}))
+        self.assertEqual(freeze_kwargs({"a": {1, 2}}), freeze_kwargs({"a": {2, 1}}))
+        with self.assertRaises(TypeError):
+            freeze_kwargs({"a": [unhashable_value()]})
+
+        debug.info(2, "Testing the reuse of modules")
+        factory.reset()
+        a = factory.create(module_type="pinv", size=2)
+        self.assertIs(factory.create(module_type="pinv", size=2), a)
+        self.assertIsNot(factory.create(module_type="pinv", size=4), a)
+        self.assertEqual((factory.hits["pinv"], factory.misses["pinv"], factory.loads["pinv"]), (1, 2, 0))
+
+        # A list is compared by its items
+        b = factory.create(module_type="delay_chain", fanout_list=[2, 2])
+        self.assertIs(factory.create(module_type="delay_chain", fanout_list=[2, 2]), b)
+        self.assertIsNot(factory.create(module_type="delay_chain", fanout_list=[2, 2, 2]), b)
+        self.assertEqual((factory.hits["delay_chain"], factory.misses["delay_chain"]), (1, 2))
+
+        # Unhashable kwargs are compared one by one
+        kwargs = {"size": unhashable_value()}
+        self.assertEqual(factory.find_object("pinv", kwargs), (None, None))
+        factory.add_object("pinv", kwargs, None, a)
+        self.assertEqual(factory.find_object("pinv", {"size": unhashable_value()}), (None, a))
+        self.assertEqual(len(factory.unhashable_objects["pinv"]), 1)
+
+        openram.end_openram()
+
+
+# run the test from the command line
+if __name__ == "__main__":
+    (OPTS, args) = openram.parse_args()
+    del sys.argv[1:]
+    header(__file__, OPTS.tech_name)
+    unittest.main(testRunner=debugTestRunner())
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+# See LICENSE for licensing information.
+#
+# Copyright (c) 2016-2024 Regents of the University of California and The Board
+# of Regents for the Oklahoma Agricultural and Mechanical College
+# (acting for and on behalf of Oklahoma State University)
+# All rights reserved.
+#
+import sys, os
+import unittest
+from unittest import mock
+from testutils import *
+
+import openram
+from openram import debug
+from openram import OPTS
+
+
+class min_period_search_test(openram_test):
+
+    def runTest(self):
+        config_file = "{}/tests/configs/config".format(os.getenv("OPENRAM_HOME"))
+        openram.init_openram(config_file, is_unit_test=True)
+        from openram.characterizer import delay
+        from openram.characterizer.charutils import relative_compare
+
+        # Instead of simulating, a period works if it isn't below the minimum
+        min_period = 3.37
+        tried_periods = []
+
+        def try_period(self, feasible_delays):
+            tried_periods.append(self.period)
+            return self.period >= min_period
+
+        # Only the parts of a delay characterizer that the search uses
+        d = delay.__new__(delay)
+        d.write_ports = [0]
+        with mock.patch.object(delay, "try_period", try_period):
+            for num_threads in [1, 2, 3]:
+                debug.info(2, "Testing the min period search with {} threads".format(num_threads))
+                OPTS.num_threads = num_threads
+                del tried_periods[:]
+                period = d.find_min_period_one_port({}, 0, 0.0, 10.0, 5.0)
+                if num_threads == 1:
+                    serial_period = period
+                    # The serial search tries one period at a time in this process
+                    self.assertGreater(len(tried_periods), 1)
+                else:
+                    # The worker processes tried the periods
+                    self.assertEqual(tried_periods, [])
+                    self.assertTrue(relative_compare(period, serial_period, error_tolerance=0.05))
+                self.assertGreaterEqual(period, min_period)
+                self.assertTrue(relative_compare(period, min_period, error_tolerance=0.05))
+        self.assertIsNone(sys.modules[delay.__module__].min_period_delay)
+
+        OPTS.num_threads = 1
+        openram.end_openram()
+
+
+# run the test from the command line
+if __name__ == "__main__":
+    (OPTS, args) = openram.parse_args()
+    del sys.argv[1:]
+    header(__file__, OPTS.tech_name)
+    unittest.main(testRunner=debugTestRunner())
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+# See LICENSE for licensing information.
+#
+# Copyright (c) 2016-2024 Regents of the University of California and The Board
+# of Regents for the Oklahoma Agricultural and Mechanical College
+# (acting for and on behalf of Oklahoma State University)
+# All rights reserved.
+#
+import sys, os
+import io
+import unittest
+from testutils import *
+
+import openram
+from openram import debug
+from openram import OPTS
+
+
+class raw_file_test(openram_test):
+
+    def runTest(self):
+        config_file = "{}/tests/configs/config".format(os.getenv("OPENRAM_HOME"))
+        openram.init_openram(config_file, is_unit_test=True)
+        from openram.characterizer import raw_file
+        from openram.characterizer import stimuli
+        from openram.characterizer import delay_measure, slew_measure, power_measure
+        from openram.characterizer import voltage_at_measure, voltage_when_measure
+        from openram.characterizer import functional
+
+        # The waveforms of an inverter with a 0.1ns input slew and 0.2ns output
+        # slew and delay 0.1ns (an operating point comes first). The outputs
+        # dout0_0 and dout0_1 are the out and in of the inverter.
+        raw_name = "{}/tests/golden/ngspice_inverter.raw".format(os.getenv("OPENRAM_HOME"))
+
+        debug.info(2, "Testing the waveforms of the raw file")
+        raw = raw_file.raw_file(raw_name)
+        self.assertEqual(raw.plotname, "Transient Analysis")
+        self.assertEqual(len(raw.time), 501)
+        self.assertAlmostEqual(raw.time[-1], 5e-9)
+        self.assertTrue(raw.has_signal("v(out)"))
+        self.assertTrue(raw.has_signal("OUT"))
+        self.assertTrue(raw.has_signal("i(vvdd)"))
+        self.assertEqual(raw.get_values_at("out", [0, 2e-9, 3.15e-9, 4e-9]).tolist(), [1, 0, 0.5, 1])
+        self.assertEqual(len(raw.get_crossing_times("in", 0.5)), 2)
+        self.assertAlmostEqual(raw.get_crossing_time("in", 0.5, "FALL"), 3.05e-9)
+        self.assertIsNone(raw.get_crossing_time("in", 0.5, "RISE", 2e-9))
+        self.assertAlmostEqual(raw.get_average(raw.get_signal("out"), 2e-9, 3.05e-9), 0)
+
+        debug.info(2, "Testing the measurements from the raw file")
+        stim = stimuli(io.StringIO(), io.StringIO(), ("TT", 1.0, 25))
+        measures = [(delay_measure("delay_hl", "in", "out", "RISE", "FALL"), (0, 0, 1.0), 0.1e-9),
+                    (delay_measure("delay_lh", "in", "out", "FALL", "RISE"), (2, 2, 1.0), 0.1e-9),
+                    (slew_measure("slew_hl", "out", "FALL"), (0, 0, 1.0), 0.16e-9),
+                    (power_measure("leakage_power"), (1.5, 2.5), 1e-6),
+                    (voltage_at_measure("vout", "out"), (2.0,), 0),
+                    (voltage_when_measure("vout_when", "in", "out", "FALL", 0.5), (2, 1.0), 0)]
+        for (meas, input_tuple, value) in measures:
+            meas.has_port = False
+            meas.write_measure(stim, input_tuple)
+
+        # The measurements are made from the raw file of the last simulation
+        raw_file.set_raw_file(raw_name)
+        for (meas, input_tuple, value) in measures:
+            self.assertAlmostEqual(meas.retrieve_measure(), value)
+
+        # A measurement that doesn't happen fails like in the text output
+        meas = delay_measure("delay_never", "in", "out", "RISE", "FALL")
+        meas.has_port = False
+        meas.write_measure(stim, (4, 4, 1.0))
+        self.assertEqual(meas.retrieve_measure(), "Failed")
+
+        debug.info(2, "Testing the saved signals of the raw file")
+        spice_name = OPTS.spice_name
+        OPTS.use_raw_file = True
+        OPTS.spice_name = "ngspice"
+        stim.write_control(5)
+        self.assertIn(".save v(in) v(out) v(vdd) i(vvdd)\n", stim.sf.getvalue())
+        OPTS.use_raw_file = False
+        OPTS.spice_name = spice_name
+
+        debug.info(2, "Testing the functional read values from the raw file")
+        # Only the parts of a functional simulation that read the values
+        sim = functional.__new__(functional)
+        sim.word_size = 2
+        sim.num_spare_cols = 0
+        sim.v_high = 0.8
+        sim.v_low = 0.2
+        sim.read_results = []
+        sim.read_check = [("10", "dout0", 2.0, 0), ("01", "dout0", 4.0, 1)]
+        sim.measures = {}
+        sim_stim = stimuli(io.StringIO(), io.StringIO(), ("TT", 1.0, 25))
+        for (word, dout_port, eo_period, cycle) in sim.read_check:
+            for bit in range(sim.word_size):
+                signal_name = "{0}_{1}".format(dout_port, bit)
+                measure_name = "v{0}ck{1}".format(signal_name, cycle)
+                sim.measures[measure_name] = voltage_at_measure(measure_name, signal_name)
+                sim.measures[measure_name].write_measure(sim_stim, (eo_period, 0))
+        self.assertEqual(sim.read_stim_results(), (1, "SUCCESS"))
+        self.assertEqual([x[0] for x in sim.read_results], ["10", "01"])
+        # All the bits are sampled at once like the measurements one at a time
+        raw_values = sim.read_raw_values(raw_file.get_raw_file())
+        for (measure_name, meas) in sim.measures.items():
+            self.assertEqual(raw_values[measure_name], meas.retrieve_measure(port=0))
+
+        raw_file.clear_raw_file()
+        openram.end_openram()
+
+
+# run the test from the command line
+if __name__ == "__main__":
+    (OPTS, args) = openram.parse_args()
+    del sys.argv[1:]
+    header(__file__, OPTS.tech_name)
+    unittest.main(testRunner=debugTestRunner())
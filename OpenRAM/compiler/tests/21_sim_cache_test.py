@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+# See LICENSE for licensing information.
+#
+# Copyright (c) 2016-2024 Regents of the University of California and The Board
+# of Regents for the Oklahoma Agricultural and Mechanical College
+# (acting for and on behalf of Oklahoma State University)
+# All rights reserved.
+#
+import sys, os
+import time
+import unittest
+from testutils import *
+
+import openram
+from openram import debug
+from openram import OPTS
+
+
+class sim_cache_test(openram_test):
+
+    def write_stimulus(self, temp_path, netlist="M1 d g s b nmos\n"):
+        """ Write a stimulus that includes a netlist of the temp directory. """
+        os.makedirs(temp_path, exist_ok=True)
+        with open(temp_path + "netlist.sp", "w") as f:
+            f.write("* {0}netlist.sp\n{1}".format(temp_path, netlist))
+        with open(temp_path + "stim.sp", "w") as f:
+            f.write(".include \"{0}netlist.sp\"\n.tran 10p 10n\n.end\n".format(temp_path))
+        return temp_path + "stim.sp"
+
+    def runTest(self):
+        config_file = "{}/tests/configs/config".format(os.getenv("OPENRAM_HOME"))
+        openram.init_openram(config_file, is_unit_test=True)
+        OPTS.use_sim_cache = True
+        OPTS.sim_cache_path = OPTS.openram_temp + "sim_cache"
+        from openram.characterizer import sim_cache
+        corner = ("TT", 1.0, 25)
+        temp_path = OPTS.openram_temp
+
+        debug.info(2, "Testing the simulation keys")
+        OPTS.openram_temp = temp_path + "run1/"
+        key = sim_cache.get_sim_key(self.write_stimulus(OPTS.openram_temp), corner)
+        # The same simulation in the temp directory of another run
+        OPTS.openram_temp = temp_path + "run2/"
+        self.assertEqual(sim_cache.get_sim_key(self.write_stimulus(OPTS.openram_temp), corner), key)
+        self.assertNotEqual(sim_cache.get_sim_key(OPTS.openram_temp + "stim.sp", ("SS", 1.0, 25)), key)
+        # An upgrade of the simulator executable
+        spice_exe = OPTS.spice_exe
+        OPTS.spice_exe = temp_path + "spice"
+        with open(OPTS.spice_exe, "w") as f:
+            f.write("version 1\n")
+        exe_key = sim_cache.get_sim_key(OPTS.openram_temp + "stim.sp", corner)
+        self.assertNotEqual(exe_key, key)
+        with open(OPTS.spice_exe, "w") as f:
+            f.write("version 2 \n")
+        self.assertNotEqual(sim_cache.get_sim_key(OPTS.openram_temp + "stim.sp", corner), exe_key)
+        OPTS.spice_exe = spice_exe
+        # The included files are part of the key
+        self.assertNotEqual(sim_cache.get_sim_key(self.write_stimulus(OPTS.openram_temp, "M1 d g s b pmos\n"), corner),
+                            key)
+        # A worker including a file of its parent's temp directory
+        OPTS.openram_temp = temp_path + "run3/"
+        self.write_stimulus(OPTS.openram_temp)
+        worker_stim = self.write_stimulus(OPTS.openram_temp + "period0/")
+        with open(worker_stim, "w") as f:
+            f.write(".include \"{0}netlist.sp\"\n.tran 10p 10n\n.end\n".format(OPTS.openram_temp))
+        sim_cache.parent_temp_paths.append(OPTS.openram_temp)
+        OPTS.openram_temp += "period0/"
+        self.assertEqual(sim_cache.get_sim_key(worker_stim, corner), key)
+        sim_cache.parent_temp_paths.clear()
+        OPTS.openram_temp = temp_path
+
+        debug.info(2, "Testing the simulation entries")
+        sim_cache.reset_sim_cache_stats()
+        self.assertIsNone(sim_cache.load_sim_entry(key))
+        sim_cache.store_sim_entry(key, "delay = 1.0e-9\n", [("delay", "1.0e-9")])
+        self.assertEqual(sim_cache.load_sim_entry(key), ("delay = 1.0e-9\n", [("delay", "1.0e-9")]))
+        self.assertEqual((sim_cache.sim_cache_hits, sim_cache.sim_cache_misses), (1, 1))
+
+        debug.info(2, "Testing the eviction of the least recently used entries")
+        cache_path = sim_cache.get_sim_cache_path()
+        os.remove(sim_cache.get_sim_entry_filename(key))
+        start_time = time.time() - 100
+        for (i, name) in enumerate(["a", "b", "c"]):
+            sim_cache.store_sim_entry(name, "delay = 1.0e-9\n", [("delay", "1.0e-9")])
+            os.utime(sim_cache.get_sim_entry_filename(name), (start_time + i, start_time + i))
+        # Using the oldest entry makes it the most recent one
+        self.assertIsNotNone(sim_cache.load_sim_entry("a"))
+        entry_size = max(os.path.getsize(os.path.join(cache_path, x)) for x in os.listdir(cache_path))
+        OPTS.sim_cache_size = 3.5 * entry_size / (1024 * 1024)
+        sim_cache.store_sim_entry("d", "delay = 1.0e-9\n", [("delay", "1.0e-9")])
+        self.assertEqual(sorted(os.listdir(cache_path)), ["a.json.gz", "c.json.gz", "d.json.gz"])
+
+        openram.end_openram()
+
+
+# run the test from the command line
+if __name__ == "__main__":
+    (OPTS, args) = openram.parse_args()
+    del sys.argv[1:]
+    header(__file__, OPTS.tech_name)
+    unittest.main(testRunner=debugTestRunner())
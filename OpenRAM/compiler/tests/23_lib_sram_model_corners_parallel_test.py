@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+# See LICENSE for licensing information.
+#
+# Copyright (c) 2016-2024 Regents of the University of California and The Board
+# of Regents for the Oklahoma Agricultural and Mechanical College
+# (acting for and on behalf of Oklahoma State University)
+# All rights reserved.
+#
+import sys, os
+import unittest
+from testutils import *
+
+import openram
+from openram import debug
+from openram import OPTS
+
+
+#@unittest.skip("SKIPPING 23_lib_sram_model_corners_parallel_test")
+class lib_model_corners_parallel_lib_test(openram_test):
+
+    def runTest(self):
+        config_file = "{}/tests/configs/config".format(os.getenv("OPENRAM_HOME"))
+        openram.init_openram(config_file, is_unit_test=True)
+        OPTS.nominal_corner_only = False
+        OPTS.netlist_only = True
+        OPTS.only_use_config_corners = True
+
+        if OPTS.tech_name == "sky130":
+            num_spare_rows = 1
+            num_spare_cols = 1
+        else:
+            num_spare_rows = 0
+            num_spare_cols = 0
+
+        from openram.characterizer import lib
+        from openram import sram
+        from openram import sram_config
+        c = sram_config(word_size=2,
+                        num_words=16,
+                        num_banks=1,
+                        num_spare_cols=num_spare_cols,
+                        num_spare_rows=num_spare_rows)
+        c.words_per_row=1
+        c.recompute_sizes()
+        debug.info(1, "Testing parallel analytical timing for sample 2 bit, 16 words SRAM with 1 bank")
+
+        # This doesn't have to use the factory since worst case
+        # it will just replaece the top-level module of the same name
+        s = sram(c, name="sram_2_16_1_{0}".format(OPTS.tech_name))
+        tempspice = OPTS.openram_temp + "temp.sp"
+        s.sp_write(tempspice)
+
+        #Set the corners. Lib will create a power set of the lists.
+        if OPTS.tech_name == "scn4m_subm":
+            OPTS.process_corners = ["TT", "SS", "FF"]
+            OPTS.supply_voltages = [5.0]
+            OPTS.temperatures = [25]
+        elif OPTS.tech_name == "freepdk45":
+            OPTS.process_corners = ["TT", "SS", "FF"]
+            OPTS.supply_voltages = [1.0]
+            OPTS.temperatures = [25]
+
+        # Characterize the corners serially and then in worker processes
+        serial_dir = OPTS.openram_temp + "serial/"
+        parallel_dir = OPTS.openram_temp + "parallel/"
+        os.makedirs(serial_dir, exist_ok=True)
+        os.makedirs(parallel_dir, exist_ok=True)
+        OPTS.num_threads = 1
+        serial_lib = lib(out_dir=serial_dir, sram=s.s, sp_file=tempspice, use_model=True)
+        # A worker characterizes more than one corner
+        OPTS.num_threads = 2
+        parallel_lib = lib(out_dir=parallel_dir, sram=s.s, sp_file=tempspice, use_model=True)
+        OPTS.num_threads = 1
+
+        # Each corner has its own temp directory
+        corner_dirs = ["corner{}".format(i) for i in range(3)]
+        self.assertEqual(sorted(x for x in os.listdir(OPTS.openram_temp) if x.startswith("corner")), corner_dirs)
+        for corner_dir in corner_dirs:
+            self.assertFalse(any(x.startswith("corner") for x in os.listdir(OPTS.openram_temp + corner_dir)))
+
+        # The corners must be the same and in the same order
+        self.assertEqual(serial_lib.corners, parallel_lib.corners)
+        self.assertEqual(len(parallel_lib.lib_files), 3)
+
+        # and the libs must not depend on how they were characterized
+        for (serial_name, parallel_name) in zip(serial_lib.lib_files, parallel_lib.lib_files):
+            self.assertTrue(self.isapproxdiff(serial_name, parallel_name, 0.0))
+
+        openram.end_openram()
+
+
+# run the test from the command line
+if __name__ == "__main__":
+    (OPTS, args) = openram.parse_args()
+    del sys.argv[1:]
+    header(__file__, OPTS.tech_name)
+    unittest.main(testRunner=debugTestRunner())
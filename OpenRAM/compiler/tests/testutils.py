@@ -321,6 +321,39 @@ class openram_test(unittest.TestCase):
             debug.info(2, "MATCH {0} {1}".format(filename1, filename2))
         return True
 
+    def get_netlist_subckts(self, filename):
+        """ Return the subcircuits of a netlist by name and the sorted lines outside of them. """
+        subckts = {}
+        other_lines = []
+        subckt_lines = None
+        with open(filename, "r") as f:
+            for line in f:
+                if line.upper().startswith(".SUBCKT"):
+                    subckt_lines = []
+                    subckts[line.split()[1]] = subckt_lines
+                if subckt_lines is None:
+                    other_lines.append(line)
+                else:
+                    subckt_lines.append(line)
+                if line.upper().startswith(".ENDS"):
+                    subckt_lines = None
+        return (subckts, sorted(other_lines))
+
+    def isnetlistdiff(self, filename1, filename2):
+        """
+        This is used to compare two netlists whose subcircuits can be written
+        in a different order (e.g. the order of the set of modules).
+        """
+        from openram import debug
+        (subckts1, other_lines1) = self.get_netlist_subckts(filename1)
+        (subckts2, other_lines2) = self.get_netlist_subckts(filename2)
+        mismatches = [x for x in sorted(set(subckts1) | set(subckts2)) if subckts1.get(x) != subckts2.get(x)]
+        if mismatches or other_lines1 != other_lines2:
+            debug.error("MISMATCH file1={0} file2={1} subcircuits={2}".format(filename1, filename2, mismatches))
+            return False
+        debug.info(2, "MATCH {0} {1}".format(filename1, filename2))
+        return True
+
     def dbg():
         import pdb; pdb.set_trace()
 
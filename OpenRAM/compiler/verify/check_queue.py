@@ -0,0 +1,102 @@
+# See LICENSE for licensing information.
+#
+# Copyright (c) 2016-2024 Regents of the University of California and The Board
+# of Regents for the Oklahoma Agricultural and Mechanical College
+# (acting for and on behalf of Oklahoma State University)
+# All rights reserved.
+#
+"""
+This runs the inline DRC and LVS of the modules in worker processes while
+the generation of the memory continues. Each check has its own directory
+since the tool scripts are written to (and run in) the temp directory.
+"""
+
+import os
+import multiprocessing
+from openram import OPTS
+from . import verify_cache
+
+# The worker processes, which are started by the first submitted check
+check_pool = None
+# The (module, result) of the submitted checks
+pending_checks = []
+# Number of submitted checks to name their directories
+num_checks = 0
+
+
+def run_drc_lvs(cell_name, gds_name, sp_name, final_verification=False):
+    """
+    Run DRC and LVS of a module with the GDS and netlist in the temp
+    directory and return the (DRC errors, LVS errors). The results of
+    unchanged modules are reused from the verification cache.
+    """
+    from openram import verify
+
+    if OPTS.use_verify_cache:
+        key = verify_cache.get_verify_key(cell_name, gds_name, sp_name, final_verification)
+        entry = verify_cache.load_verify_entry(key)
+        if entry:
+            return entry
+
+    drc_errors = verify.run_drc(cell_name, gds_name, sp_name, extract=True, final_verification=final_verification)
+    lvs_errors = verify.run_lvs(cell_name, gds_name, sp_name, final_verification=final_verification)
+
+    if OPTS.use_verify_cache:
+        verify_cache.store_verify_entry(key, drc_errors, lvs_errors)
+    return (drc_errors, lvs_errors)
+
+
+def run_drc_lvs_worker(check):
+    """ Run DRC and LVS of a module in its own temp directory. """
+    (cell_name, temp_path, gds_name, sp_name) = check
+    OPTS.openram_temp = temp_path
+    return run_drc_lvs(cell_name, gds_name, sp_name)
+
+
+def use_check_queue():
+    """ Return whether the inline checks run in worker processes. """
+    # The workers of a parallel module generation can't start processes
+    return OPTS.num_threads > 1 and not multiprocessing.current_process().daemon
+
+
+def get_check_path(cell_name):
+    """ Return a new temp directory for the files of a check. """
+    global num_checks
+
+    num_checks += 1
+    path = "{0}check{1}_{2}/".format(OPTS.openram_temp, num_checks, cell_name)
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def submit_drc_lvs(mod, temp_path, gds_name, sp_name):
+    """
+    Start DRC and LVS of a module with the GDS and netlist in temp_path.
+    The errors are checked by wait_for_drc_lvs.
+    """
+    global check_pool
+
+    if not check_pool:
+        context = multiprocessing.get_context("fork")
+        check_pool = context.Pool(processes=OPTS.num_threads)
+    result = check_pool.apply_async(run_drc_lvs_worker, ((mod.cell_name, temp_path, gds_name, sp_name),))
+    pending_checks.append((mod, result))
+
+
+def wait_for_drc_lvs():
+    """ Wait for the submitted checks and fail if a module has errors. """
+    global check_pool
+
+    checked_mods = []
+    for (mod, result) in pending_checks:
+        (mod.drc_errors, mod.lvs_errors) = result.get()
+        checked_mods.append(mod)
+    del pending_checks[:]
+
+    if check_pool:
+        check_pool.close()
+        check_pool.join()
+        check_pool = None
+
+    for mod in checked_mods:
+        mod.check_drc_lvs_errors()
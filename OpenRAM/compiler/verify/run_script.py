@@ -14,6 +14,7 @@ import subprocess
 import time
 from openram import debug
 from openram import OPTS
+from openram import profiling
 
 
 def run_script(cell_name, script="lvs"):
@@ -85,6 +86,7 @@ def run_script(cell_name, script="lvs"):
         taile.wait()
 
     debug.info(2, "Finished {} with {}".format(scriptpath, p.returncode))
+    profiling.add_span("run_script {}".format(script), "verify", start, time.time())
 
     os.chdir(cwd)
 
@@ -0,0 +1,126 @@
+# See LICENSE for licensing information.
+#
+# Copyright (c) 2016-2024 Regents of the University of California and The Board
+# of Regents for the Oklahoma Agricultural and Mechanical College
+# (acting for and on behalf of Oklahoma State University)
+# All rights reserved.
+#
+"""
+This is a persistent on-disk cache of the DRC and LVS results of modules.
+A check is identified by a hash of the GDS and netlist of the module, the
+DRC and LVS tools and the technology files, so the unchanged modules of a
+later run don't invoke the tools again. Only clean results are saved so
+that a failing module is always checked again.
+"""
+
+import os
+import json
+import struct
+import hashlib
+from openram import debug
+from openram import OPTS
+
+# The hash of the tools and technology files, which is computed once
+tool_hash = None
+
+
+def get_verify_cache_path():
+    """ Return the directory of the verification cache. """
+    if OPTS.verify_cache_path:
+        path = OPTS.verify_cache_path
+    else:
+        path = os.path.join(OPTS.output_path, "verify_cache")
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def get_tool_hash():
+    """
+    Return the hash of the DRC and LVS tools and the technology files (e.g.
+    the rule decks). A tool is identified by its executable so that an
+    upgrade of the tool invalidates the results.
+    """
+    global tool_hash
+
+    if tool_hash is None:
+        key = hashlib.sha256()
+        for tool in [OPTS.drc_exe, OPTS.lvs_exe]:
+            key.update(str(tool).encode())
+            if tool and os.path.isfile(tool[1]):
+                stat = os.stat(tool[1])
+                key.update(str((stat.st_size, stat.st_mtime_ns)).encode())
+        for (dirpath, dirnames, filenames) in os.walk(OPTS.openram_tech):
+            dirnames[:] = sorted(x for x in dirnames if x not in ["gds_lib", "sp_lib", "__pycache__"])
+            for filename in sorted(filenames):
+                if not filename.endswith(".pyc"):
+                    with open(os.path.join(dirpath, filename), "rb") as f:
+                        key.update(f.read())
+        tool_hash = key.hexdigest()
+    return tool_hash
+
+
+def hash_gds_file(filename):
+    """
+    Return the hash of a GDS file without the dates of the library and the
+    structures, which are the time of each write.
+    """
+    with open(filename, "rb") as f:
+        data = bytearray(f.read())
+    offset = 0
+    while offset + 4 <= len(data):
+        (length, record_type) = struct.unpack(">HH", data[offset:offset + 4])
+        # The file can be padded with zeros after the end of the library
+        if length < 4:
+            break
+        # BGNLIB and BGNSTR have the modification and access dates
+        if record_type in [0x0102, 0x0502]:
+            data[offset + 4:offset + length] = bytes(length - 4)
+        offset += length
+    return hashlib.sha256(data).digest()
+
+
+def get_verify_key(cell_name, gds_name, sp_name, final_verification):
+    """
+    Return the key of the DRC and LVS of a module from its GDS and netlist
+    files (in the temp directory), the tools and the type of check.
+    """
+    key = hashlib.sha256()
+    key.update(get_tool_hash().encode())
+    key.update(str((OPTS.tech_name, cell_name, final_verification)).encode())
+    key.update(hash_gds_file(os.path.join(OPTS.openram_temp, gds_name)))
+    with open(os.path.join(OPTS.openram_temp, sp_name), "rb") as f:
+        key.update(hashlib.sha256(f.read()).digest())
+    return key.hexdigest()
+
+
+def get_verify_entry_filename(key):
+    return os.path.join(get_verify_cache_path(), "{}.json".format(key))
+
+
+def load_verify_entry(key):
+    """
+    Return the cached (DRC errors, LVS errors) of the key or None if the
+    module hasn't been checked before.
+    """
+    entry_filename = get_verify_entry_filename(key)
+    try:
+        with open(entry_filename, "r") as f:
+            entry = json.load(f)
+    except (OSError, ValueError):
+        debug.info(2, "Verification cache miss: {}".format(key))
+        return None
+    debug.info(2, "Verification cache hit: {}".format(key))
+    return (entry["drc_errors"], entry["lvs_errors"])
+
+
+def store_verify_entry(key, drc_errors, lvs_errors):
+    """ Save the results of a clean module. """
+    if drc_errors != 0 or lvs_errors != 0:
+        return
+    entry_filename = get_verify_entry_filename(key)
+    # Write a new file and rename it so that concurrent checks never
+    # read a partial entry
+    temp_filename = "{0}.{1}".format(entry_filename, os.getpid())
+    with open(temp_filename, "w") as f:
+        json.dump({"drc_errors": drc_errors, "lvs_errors": lvs_errors}, f)
+    os.replace(temp_filename, entry_filename)